@@ -33,5 +33,4 @@
 ::978f952a14a936cc963da21a135fa983
 
 @echo off
-python "%~dp0teklif_app.py"
-pause
\ No newline at end of file
+python "%~dp0teklif_app.py" || pause
\ No newline at end of file
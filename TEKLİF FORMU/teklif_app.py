@@ -1,799 +1,1299 @@
-# -*- coding: utf-8 -*-
-"""
-teklif_app.py
-Excel (XLSX) çıktı üreten Teklif Uygulaması
-- Malzeme tablosu (satır ekle/sil, inline edit)
-- Ödeme planı tablosu (satır ekle/sil, inline edit)
-- Excel çıktısı A4'e göre hizalanmış, firma bilgileri, müşteri kutusu, toplamlar, imza alanı
-- Logo üstte ortalı (varsa ef.png / logo.png kullanılır)
-Requires: openpyxl, pillow (optional for image embedding)
-"""
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
-import os
-import sys
-from pathlib import Path
-import json
-import webbrowser
-import tempfile
-import subprocess
-
-# Excel imports (must be installed)
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
-
-# Optional: image embedding in Excel (requires Pillow)
-try:
-    from openpyxl.drawing.image import Image as XLImage
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
-
-class TeklifApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("EF Yapı Dekorasyon - Teklif Uygulaması (Excel)")
-        try:
-            self.root.state('zoomed')
-        except Exception:
-            pass
-        self.root.configure(bg='#f0f0f0')
-
-        # Ayarlar dosyası
-        self.config_file = Path(__file__).parent /"setup"/ "teklif_ayarlari.json"
-        self.settings = self.load_settings()
-
-        # Uygulama dosyasının bulunduğu klasör
-        app_dir = os.path.dirname(os.path.abspath(__file__))
-
-        # Logo: aranan dosyalar
-        self.logo_path = None
-        for lf in ("ef.png","logo.png"):
-            p = os.path.join(app_dir, lf)
-            if os.path.exists(p):
-                self.logo_path = p
-                break
-
-        # Ana frame
-        main_frame = tk.Frame(root, bg='#f0f0f0', padx=10, pady=10)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Başlık (UI başlığı)
-        title_frame = tk.Frame(main_frame, bg='#f0f0f0')
-        title_frame.pack(fill=tk.X, pady=(0, 10))
-
-        title_label = tk.Label(title_frame, text="EF YAPI DEKORASYON",
-                               font=('Arial', 26, 'bold'), bg='#f0f0f0', fg='#2c3e50')
-        title_label.pack()
-
-        subtitle_label = tk.Label(title_frame, text="Fiyat Teklif Uygulaması (Excel Çıktısı)",
-                                  font=('Arial', 18), bg='#f0f0f0', fg='#7f8c8d')
-        subtitle_label.pack()
-
-        # Müşteri bilgileri frame
-        customer_frame = tk.LabelFrame(main_frame, text="Müşteri Bilgileri",
-                                       font=('Arial', 10, 'bold'), bg='#f0f0f0', padx=10, pady=10)
-        customer_frame.pack(fill=tk.X, pady=(0, 10))
-
-        tk.Label(customer_frame, text="Ad Soyad:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=0, sticky='w', padx=6, pady=4)
-        self.customer_name = tk.Entry(customer_frame, width=30, font=('Arial', 9))
-        self.customer_name.grid(row=0, column=1, padx=6, pady=4)
-
-        tk.Label(customer_frame, text="T.C. Kimlik No:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=2, sticky='w', padx=6, pady=4)
-        self.customer_tc = tk.Entry(customer_frame, width=25, font=('Arial', 9))
-        self.customer_tc.grid(row=0, column=3, padx=6, pady=4)
-
-        tk.Label(customer_frame, text="Telefon:", bg='#f0f0f0', font=('Arial', 9)).grid(row=1, column=0, sticky='w', padx=6, pady=4)
-        self.customer_phone = tk.Entry(customer_frame, width=30, font=('Arial', 9))
-        self.customer_phone.grid(row=1, column=1, padx=6, pady=4)
-
-        tk.Label(customer_frame, text="Adres:", bg='#f0f0f0', font=('Arial', 9)).grid(row=2, column=0, sticky='w', padx=6, pady=4)
-        self.customer_address = tk.Entry(customer_frame, width=60, font=('Arial', 9))
-        self.customer_address.grid(row=2, column=1, columnspan=3, padx=6, pady=4)
-
-
-        # Menü çubuğu
-        self.menubar = tk.Menu(root)
-        root.config(menu=self.menubar)
-        self.create_menu()
-
-        # Butonlar frame
-        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
-        button_frame.pack(fill=tk.X, pady=(0, 6))
-
-        preview_btn = tk.Button(button_frame, text="Excel Önizleme", command=self.preview_excel,
-                                bg='#3498db', fg='white', font=('Arial', 10, 'bold'),
-                                padx=18, pady=5, cursor='hand2')
-        preview_btn.pack(side=tk.LEFT, padx=5)
-
-        save_btn = tk.Button(button_frame, text="Excel Kaydet (Yazdırma için Excel'den yazdırın)", command=self.save_excel,
-                              bg='#27ae60', fg='white', font=('Arial', 10, 'bold'),
-                              padx=18, pady=5, cursor='hand2')
-        save_btn.pack(side=tk.LEFT, padx=5)
-
-        # Tablolar container
-        tables_container = tk.Frame(main_frame, bg='#f0f0f0')
-        tables_container.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-
-        # Sol taraf - Malzeme tablosu
-        material_container = tk.LabelFrame(tables_container, text="MALZEME TABLOSU",
-                                           font=('Arial', 11, 'bold'), bg='#f0f0f0', padx=5, pady=5)
-        material_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        self.setup_table(material_container, "material")
-
-        # Sağ taraf - Ödeme planı
-        payment_container = tk.LabelFrame(tables_container, text="ÖDEME PLANI",
-                                          font=('Arial', 11, 'bold'), bg='#f0f0f0', padx=5, pady=5)
-        payment_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        self.setup_table(payment_container, "payment")
-
-        # Genel toplam frame
-        total_frame = tk.LabelFrame(main_frame, text="Genel Toplam", font=('Arial', 10, 'bold'), bg='#f0f0f0', padx=10, pady=10)
-        total_frame.pack(fill=tk.X)
-        self.total_without_vat_label = tk.Label(total_frame, text="KDV Hariç Toplam: 0.00 ₺",
-                                                font=('Arial', 11, 'bold'), bg='#f0f0f0', fg='#2c3e50')
-        self.total_without_vat_label.pack(side=tk.LEFT, padx=20)
-        self.total_with_vat_label = tk.Label(total_frame, text="KDV Dahil Toplam: 0.00 ₺",
-                                             font=('Arial', 11, 'bold'), bg='#f0f0f0', fg='#27ae60')
-        self.total_with_vat_label.pack(side=tk.LEFT, padx=20)
-
-    # ---------------- Settings ----------------
-    def load_settings(self):
-        """Ayarları yükle"""
-        default_settings = {'save_folder': None}
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    s = json.load(f)
-                    default_settings.update(s)
-        except Exception:
-            pass
-        return default_settings
-
-    def save_settings(self):
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            messagebox.showerror("Hata", f"Ayarlar kaydedilirken hata oluştu:\n{e}")
-
-    def get_save_folder(self):
-        if self.settings.get('save_folder'):
-            return Path(self.settings['save_folder'])
-        else:
-            return Path(__file__).parent / "Teklifler"
-
-    def get_save_folder_display(self):
-        folder = self.get_save_folder()
-        try:
-            return str(folder)
-        except:
-            return "Varsayılan (Uygulama Klasörü)"
-
-    def select_save_folder(self):
-        current_folder = self.get_save_folder()
-        folder = filedialog.askdirectory(title="Tekliflerin Kaydedileceği Klasörü Seçin",
-                                         initialdir=str(current_folder) if current_folder.exists() else None)
-        if folder:
-            self.settings['save_folder'] = str(Path(folder))
-            self.save_settings()
-            messagebox.showinfo("Başarılı", f"Kayıt klasörü güncellendi:\n{folder}")
-            self.root.after(100, self.update_menu)
-
-    def reset_save_folder(self):
-        self.settings['save_folder'] = None
-        self.save_settings()
-        messagebox.showinfo("Başarılı", "Varsayılan klasöre dönüldü.")
-        self.root.after(100, self.update_menu)
-
-    def create_menu(self):
-        try:
-            self.menubar.delete(0, tk.END)
-        except Exception:
-            pass
-        ayarlar_menu = tk.Menu(self.menubar, tearoff=0)
-        self.menubar.add_cascade(label="Ayarlar", menu=ayarlar_menu)
-        ayarlar_menu.add_command(label="Kayıt Klasörü Seç", command=self.select_save_folder)
-        ayarlar_menu.add_command(label="Varsayılan Klasöre Dön", command=self.reset_save_folder)
-        ayarlar_menu.add_separator()
-        current_folder = self.get_save_folder_display()
-        if len(current_folder) > 50:
-            current_folder = "..." + current_folder[-47:]
-        ayarlar_menu.add_command(label=f"Mevcut: {current_folder}", state='disabled')
-
-    def update_menu(self):
-        self.create_menu()
-
-    # ----------------- Table UI -----------------
-    def setup_table(self, parent, table_type):
-        """Tablo yapısını oluştur (material veya payment)"""
-        table_frame = tk.Frame(parent, bg='#f0f0f0')
-        table_frame.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
-        scrollbar = tk.Scrollbar(table_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        if table_type == "material":
-            columns = ('Ürün/İşçilik Adı', 'Birim', 'Miktar', 'Birim Fiyat', 'Toplam')
-        else:
-            columns = ('Tarih', 'Genel Toplam', 'Alınacak Tutar', 'Kalan Tutar')
-
-        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=12, yscrollcommand=scrollbar.set)
-        scrollbar.config(command=tree.yview)
-
-        for col in columns:
-            tree.heading(col, text=col)
-        # column widths
-        if table_type == "material":
-            tree.column('Ürün/İşçilik Adı', width=220, anchor='w')
-            tree.column('Birim', width=70, anchor='center')
-            tree.column('Miktar', width=70, anchor='center')
-            tree.column('Birim Fiyat', width=100, anchor='e')
-            tree.column('Toplam', width=100, anchor='e')
-        else:
-            tree.column('Tarih', width=90, anchor='center')
-            tree.column('Genel Toplam', width=110, anchor='e')
-            tree.column('Alınacak Tutar', width=110, anchor='e')
-            tree.column('Kalan Tutar', width=110, anchor='e')
-
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Buttons
-        btn_frame = tk.Frame(parent, bg='#f0f0f0')
-        btn_frame.pack(fill=tk.X, padx=6, pady=6)
-        if table_type == "material":
-            add_btn = tk.Button(btn_frame, text="Satır Ekle", command=lambda: self.add_row(tree, table_type),
-                                bg='#3498db', fg='white', font=('Arial', 9), padx=8, pady=3)
-            add_btn.pack(side=tk.LEFT, padx=5)
-            delete_btn = tk.Button(btn_frame, text="Satır Sil", command=lambda: self.delete_row(tree, table_type),
-                                   bg='#e74c3c', fg='white', font=('Arial', 9), padx=8, pady=3)
-            delete_btn.pack(side=tk.LEFT, padx=5)
-        else:
-            add_btn = tk.Button(btn_frame, text="Ödeme Satırı Ekle", command=lambda: self.add_row(tree, table_type),
-                                bg='#3498db', fg='white', font=('Arial', 9), padx=8, pady=3)
-            add_btn.pack(side=tk.LEFT, padx=5)
-            delete_btn = tk.Button(btn_frame, text="Satır Sil", command=lambda: self.delete_row(tree, table_type),
-                                   bg='#e74c3c', fg='white', font=('Arial', 9), padx=8, pady=3)
-            delete_btn.pack(side=tk.LEFT, padx=5)
-
-        # Totals area for material
-        if table_type == "material":
-            total_frame = tk.Frame(parent, bg='#f0f0f0')
-            total_frame.pack(fill=tk.X, padx=6, pady=(4,6))
-            tk.Label(total_frame, text="Ara Toplam:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=0, sticky='w', padx=3)
-            subtotal_value = tk.Label(total_frame, text="0.00 ₺", bg='#f0f0f0', font=('Arial', 9))
-            subtotal_value.grid(row=0, column=1, sticky='e', padx=3)
-            tk.Label(total_frame, text="KDV (%20):", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=2, sticky='w', padx=30)
-            vat_value = tk.Label(total_frame, text="0.00 ₺", bg='#f0f0f0', font=('Arial', 9))
-            vat_value.grid(row=0, column=3, sticky='e', padx=3)
-            self.material_subtotal = subtotal_value
-            self.material_vat = vat_value
-
-        # Save tree refs
-        if table_type == "material":
-            self.material_tree = tree
-        else:
-            self.payment_tree = tree
-
-        # Inline editing support (simple)
-        tree.bind('<Double-1>', lambda e: self.start_edit(tree, table_type, e))
-        tree.bind('<Button-1>', lambda e: self.on_click(tree, e))
-        tree.bind('<Return>', lambda e: self.finish_edit(tree, table_type))
-        tree.bind('<Escape>', lambda e: self.cancel_edit(tree))
-        tree.bind('<Delete>', lambda e: self.delete_row(tree, table_type))
-        tree.bind('<KeyRelease>', lambda e: self.update_totals())
-
-    def add_row(self, tree, table_type):
-        if table_type == "material":
-            item = tree.insert('', 'end', values=('', 'Adet', '1', '0.00', '0.00'))
-        else:
-            # payment default columns: Tarih, Genel Toplam, Alınacak, Kalan
-            item = tree.insert('', 'end', values=(datetime.now().strftime('%d.%m.%Y'), '0.00', '0.00', '0.00'))
-        self.update_totals()
-
-    def delete_row(self, tree, table_type):
-        sel = tree.selection()
-        if sel:
-            for s in sel:
-                tree.delete(s)
-            self.update_totals()
-        else:
-            messagebox.showwarning("Uyarı", "Lütfen silmek için bir satır seçin.")
-
-    def start_edit(self, tree, table_type, event):
-        # End previous edit
-        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
-            self.finish_edit(tree, table_type)
-
-        region = tree.identify_region(event.x, event.y)
-        if region != "cell":
-            return
-        item = tree.identify_row(event.y)
-        column = tree.identify_column(event.x)
-        col_index = int(column.replace('#','')) - 1
-        if not item:
-            return
-        bbox = tree.bbox(item, column)
-        if not bbox:
-            return
-        x, y, width, height = bbox
-        values = list(tree.item(item, 'values'))
-        current_value = values[col_index] if col_index < len(values) else ''
-        entry = tk.Entry(tree, font=('Arial', 9))
-        entry.place(x=x, y=y, width=width, height=height)
-        entry.insert(0, str(current_value))
-        entry.select_range(0, tk.END)
-        entry.focus()
-        if not hasattr(self, 'editing_cells'):
-            self.editing_cells = {}
-        self.editing_cells[tree] = {'entry': entry, 'item': item, 'col_index': col_index, 'table_type': table_type}
-        entry.bind('<Return>', lambda e: self.finish_edit(tree, table_type))
-        entry.bind('<Escape>', lambda e: self.cancel_edit(tree))
-
-    def on_click(self, tree, event):
-        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
-            self.finish_edit(tree, self.editing_cells[tree]['table_type'])
-
-    def finish_edit(self, tree, table_type):
-        if not hasattr(self, 'editing_cells') or tree not in self.editing_cells:
-            return
-        info = self.editing_cells[tree]
-        entry = info['entry']
-        item = info['item']
-        col_index = info['col_index']
-        new_value = entry.get()
-        entry.destroy()
-        values = list(tree.item(item, 'values'))
-        # ensure list length
-        if col_index >= len(values):
-            values += [''] * (col_index - len(values) + 1)
-        values[col_index] = new_value
-        # If numeric fields, try to sanitize
-        if tree == getattr(self, 'material_tree', None):
-            if col_index in (2,3):  # Miktar veya Birim Fiyat changed
-                try:
-                    miktar = float(values[2]) if values[2] else 0.0
-                    birim = float(values[3]) if values[3] else 0.0
-                    values[4] = f"{miktar * birim:.2f}"
-                except Exception:
-                    values[4] = "0.00"
-        else:
-    # Payment table otomatik Kalan Tutar ve alt satır ekleme
-            try:
-             # Alınacak Tutar mevcut ve 0'dan farklıysa işlem yap
-                alinacak_str = values[2] if len(values) > 2 else ''
-                alinacak = float(alinacak_str) if alinacak_str.strip() != '' else 0.0
-                if alinacak != 0.0:
-                    genel_toplam = float(values[1]) if len(values) > 1 and values[1] else 0.0
-                    kalan = genel_toplam - alinacak
-
-                    if kalan < 0:
-                        from tkinter import messagebox
-                        messagebox.showwarning("Uyarı", "Alınacak tutar Genel Toplamdan büyük olamaz!")
-                        kalan = 0.0  # kalan sıfır olarak kalır
-                    if len(values) < 4:
-                        values += ['0.00'] * (4 - len(values))
-                    values[3] = f"{kalan:.2f}"
-
-            # Eğer kalan > 0 ve bu son satırsa alt satır ekle
-                    last_item = tree.get_children()[-1] if tree.get_children() else None
-                    if kalan > 0 and item == last_item:
-                        tree.insert('', 'end', values=(
-                            datetime.now().strftime('%d.%m.%Y'),
-                            f"{kalan:.2f}",
-                            "0.00",
-                            f"{kalan:.2f}"
-                        ))
-            except Exception as e:
-                print("Payment row update error:", e)
-
-
-
-        tree.item(item, values=values)
-        del self.editing_cells[tree]
-        self.update_totals()
-
-    def cancel_edit(self, tree):
-        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
-            entry = self.editing_cells[tree]['entry']
-            try:
-                entry.destroy()
-            except:
-                pass
-            del self.editing_cells[tree]
-
-    def calculate_table_totals(self, tree):
-        subtotal = 0.0
-        for item in tree.get_children():
-            values = tree.item(item, 'values')
-            try:
-                # material: total at index 4
-                if tree == getattr(self, 'material_tree', None):
-                    total = float(str(values[4]).replace('₺','').strip()) if len(values) > 4 and values[4] else 0.0
-                else:
-                    # payment not included in totals
-                    total = 0.0
-                subtotal += total
-            except Exception:
-                pass
-        without_vat = subtotal
-        vat_amount = round(without_vat * 0.20, 2)
-        with_vat = round(without_vat + vat_amount, 2)
-        return round(subtotal,2), round(without_vat,2), round(vat_amount,2), round(with_vat,2)
-
-    def update_totals(self):
-        try:
-            m_sub, m_without, m_vat, m_with = self.calculate_table_totals(self.material_tree)
-            self.material_subtotal.config(text=f"{m_sub:.2f} ₺")
-            self.material_vat.config(text=f"{m_vat:.2f} ₺")
-            self.total_without_vat_label.config(text=f"KDV Hariç Toplam: {m_without:.2f} ₺")
-            self.total_with_vat_label.config(text=f"KDV Dahil Toplam: {m_with:.2f} ₺")
-        except Exception:
-            pass
-
-    def get_table_data(self, tree):
-        data = []
-        for item in tree.get_children():
-            values = tree.item(item, 'values')
-            data.append(values)
-        return data
-
-    # ---------------- EXCEL Generation ----------------
-    def create_excel(self, output_path):
-        """
-        Creates a styled Excel file resembling the provided layout with:
-        - Ürün/İşçilik Adı ve Müşteri Adres hücrelerinde wrap text (30 karakterde alt satır)
-        - Malzeme ve ödeme planı tabloları
-        - KDV ve toplam hesaplamaları
-        """
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-        from openpyxl.utils import get_column_letter
-        import tempfile
-        from openpyxl.drawing.image import Image as XLImage
-
-        def wrap_text_by_n(text, n=45):
-            """Metni her n karakterde alt satıra geçir"""
-            if not text:
-                return ""
-            lines = []
-            while len(text) > n:
-                split_at = text.rfind(" ", 0, n)
-                if split_at == -1:
-                    split_at = n
-                lines.append(text[:split_at])
-                text = text[split_at:].lstrip()
-            lines.append(text)
-            return "\n".join(lines)
-
-        wb = Workbook()
-        ws = wb.active
-        # Sütun genişlikleri
-        ws.column_dimensions['A'].width = 6     # Sıra No
-        ws.column_dimensions['B'].width = 45    # Açıklama (geniş)
-        ws.column_dimensions['C'].width = 10    # Birim (dar)
-        ws.column_dimensions['D'].width = 12    # Miktar
-        ws.column_dimensions['E'].width = 14    # Birim fiyat
-        ws.column_dimensions['F'].width = 14    # Toplam
-
-        ws.title = "Teklif"
-
-        # Styles
-        bold = Font(bold=True)
-        big_bold = Font(bold=True, size=14)
-        center = Alignment(horizontal="center", vertical="center")
-        left = Alignment(horizontal="left", vertical="center")
-        right = Alignment(horizontal="right", vertical="center")
-        thin = Side(border_style="medium", color="000000")
-        border = Border(left=thin, right=thin, top=thin, bottom=thin)
-        header_fill = PatternFill("solid", fgColor="2F4F4F")  # dark grey
-        header_fg = "FFFFFF"
-        alt_fill = PatternFill("solid", fgColor="ECF0F1")  # light grey
-
-        # Column widths
-        col_widths = {1:5, 2:35, 3:12, 4:10, 5:14, 6:14}
-        for col, w in col_widths.items():
-            ws.column_dimensions[get_column_letter(col)].width = w
-
-        r = 1
-
-        # Logo
-        if self.logo_path and PIL_AVAILABLE:
-            try:
-                img = XLImage(self.logo_path)
-                img.width = 120  # yaklaşık 2 cm
-                img.height = 120
-                ws.add_image(img, "F1")  # üst sağ veya uygun konum
-            except Exception:
-                pass
-
-        # Başlık
-        ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=6)
-        ws.cell(row=r, column=1, value="EF YAPI DEKORASYON").font = big_bold
-        ws.cell(row=r, column=1).alignment = center
-        r += 1
-
-        # Firma info
-        ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=6)
-        ws.cell(row=r, column=1, value="Firma: EF Yapı     ").font = Font(size=14)
-        ws.cell(row=r, column=1).alignment = left
-        r += 1
-        ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=6)
-        ws.cell(row=r, column=1, value="Firma Sahibi: Fatih AYDIN      Tel: 0537 517 41 19  ").font = Font(size=14)
-        ws.cell(row=r, column=1).alignment = left
-        r += 1
-        ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=6)
-        ws.cell(row=r, column=1, value="Adres: İbnisina Mahallesi Serkan Sokak No:5/1    E-mail: efyapi0@gmail.com      ").font = Font(size=14)
-        ws.cell(row=r, column=1).alignment = left
-        r += 2
-
-        # Teklif başlığı
-        ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=6)
-        ws.cell(row=r, column=1, value="FİYAT TEKLİFİ").font = Font(bold=True, size=12)
-        ws.cell(row=r, column=1).alignment = center
-        r += 1
-
-        # Müşteri kutusu
-        # Müşteri kutusu (gri background)
-        box_rows = [
-            ("MÜŞTERİ ADI :", self.customer_name.get() if hasattr(self, 'customer_name') else ''),
-            ("T.C. :", self.customer_tc.get() if hasattr(self, 'customer_tc') else ''),
-            ("TEL :", self.customer_phone.get() if hasattr(self, 'customer_phone') else ''),
-            ("ADRES :", self.customer_address.get() if hasattr(self, 'customer_address') else ''),
-            ("TARİH :", datetime.now().strftime('%d.%m.%Y'))
-        ]
-
-        # Label sütunu = 2 (B), Value = 3..6 (C-F)
-        for label, val in box_rows:
-            ws.cell(row=r, column=2, value=label).font = Font(bold=True)  # label
-            ws.cell(row=r, column=3, value=val)                            # value
-            ws.merge_cells(start_row=r, start_column=3, end_row=r, end_column=6)
-            ws.cell(row=r, column=3).alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-            ws.cell(row=r, column=4).fill = PatternFill("solid", fgColor="FFFFFF")
-            ws.cell(row=r, column=3).fill = alt_fill
-            r += 1
-
-        r += 1
-
-            # Malzeme tablosu başlığı
-
-        
-        # ------------------------------------
-
-        headers = ['NO', 'AÇIKLAMA', 'BİRİM', 'MİKTAR', 'BİRİM FİYATI', 'TOPLAM FİYATI']
-        # --- SÜTUN GENİŞLİKLERİ (EKLEDİM) ---
-       
-        for c, h in enumerate(headers, start=1):
-            cell = ws.cell(row=r, column=c, value=h)
-            cell.font = Font(bold=True, color=header_fg)
-            cell.fill = header_fill
-            cell.alignment = center
-            cell.border = border        
-
-        r += 1
-        ws.column_dimensions['A'].width = 6      # NO
-        ws.column_dimensions['B'].width = 30     # AÇIKLAMA (GENİŞ)
-        ws.column_dimensions['C'].width = 10     # BİRİM (DAR)
-        ws.column_dimensions['D'].width = 15     # MİKTAR
-        ws.column_dimensions['E'].width = 15     # BİRİM FİYATI
-        ws.column_dimensions['F'].width = 15     # TOPLAM FİYATI
-        # Malzeme tablosu
-        items = self.get_table_data(self.material_tree)
-        if not items:
-            for i in range(3):
-                for c in range(1,7):
-                    ws.cell(row=r, column=c, value='').border = border
-                r += 1
-        else:
-            for idx, vals in enumerate(items, start=1):
-                name = vals[0] if len(vals) > 0 else ''
-                unit = vals[1] if len(vals) > 1 else ''
-                qty = vals[2] if len(vals) > 2 else ''
-                unit_price = vals[3] if len(vals) > 3 else ''
-                total = vals[4] if len(vals) > 4 else ''
-
-                ws.cell(row=r, column=1, value=idx).border = border
-                
-                ws.cell(row=r, column=2, value=name).border = border
-                # Açıklama alt satıra geçsin
-                ws.cell(row=r, column=2).alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-
-                ws.cell(row=r, column=3, value=unit).border = border
-
-                # Miktar
-                try:
-                    c = ws.cell(row=r, column=4, value=float(qty))
-                    c.number_format = '0.00'
-                    c.border = border
-                except:
-                    c = ws.cell(row=r, column=4, value=qty)
-                    c.border = border
-
-                # Birim fiyat
-                try:
-                    c = ws.cell(row=r, column=5, value=float(str(unit_price).replace('₺','').strip()))
-                    c.number_format = '#,##0.00'
-                    c.border = border
-                except:
-                    c = ws.cell(row=r, column=5, value=unit_price)
-                    c.border = border
-
-                # Toplam fiyat
-                try:
-                    c = ws.cell(row=r, column=6, value=float(str(total).replace('₺','').strip()))
-                    c.number_format = '#,##0.00'
-                    c.border = border
-                except:
-                    c = ws.cell(row=r, column=6, value=total)
-                    c.border = border
-
-                # Hizalamalar
-                ws.cell(row=r, column=1).alignment = Alignment(horizontal="center", vertical="center")
-                ws.cell(row=r, column=3).alignment = Alignment(horizontal="center", vertical="center")
-                ws.cell(row=r, column=4).alignment = Alignment(horizontal="center", vertical="center")
-                ws.cell(row=r, column=5).alignment = Alignment(horizontal="right", vertical="center")
-                ws.cell(row=r, column=6).alignment = Alignment(horizontal="right", vertical="center")
-
-                r += 1
-
-
-
-        
-
-        # Malzeme toplamları
-        m_sub, m_without, m_vat, m_with = self.calculate_table_totals(self.material_tree)
-        totals = [("GENEL Toplam:", m_sub), ("KDV'siz Toplam:", m_without),
-                ("KDV (%20) Tutarı:", m_vat), ("KDV'li Toplam:", m_with)]
-        for label, val in totals:
-            ws.cell(row=r, column=5, value=label).font = Font(bold=True)
-            ws.cell(row=r, column=6, value=val).number_format = '#,##0.00'
-            ws.cell(row=r, column=5).fill = alt_fill
-            ws.cell(row=r, column=6).fill = PatternFill("solid", fgColor="FFFFFF")
-            ws.cell(row=r, column=5).border = border
-            ws.cell(row=r, column=6).border = border
-            ws.cell(row=r, column=6).alignment = Alignment(horizontal="right", vertical="center")
-            r += 1
-
-        r += 1
-
-        # Ödeme planı
-        ws.cell(row=r, column=1, value="ÖDEME PLANI").font = Font(bold=True)
-        r += 1
-        pay_headers = ['NO', 'TARİH', 'TOPLAM', 'ALINACAK TUTAR', 'KALACAK TUTAR','AÇIKLAMALAR']
-        for c, h in enumerate(pay_headers, start=1):
-            cell = ws.cell(row=r, column=c, value=h)
-            cell.font = Font(bold=True, color=header_fg)
-            cell.fill = header_fill
-            cell.alignment = center
-            cell.border = border
-        r += 1
-       
-        payments = self.get_table_data(self.payment_tree)
-        if not payments:
-            for i in range(3):
-                for c in range(1,6):
-                    ws.cell(row=r, column=c, value='').border = border
-                r += 1
-            # İmza satırı
-            ws.cell(row=r+5, column=1, value="İMZA : ________")
-            ws.cell(row=r+5, column=5, value="İMZA : ________")
-            r += 2  # biraz boşluk bırak
-            ws.page_setup.fitToWidth = 1
-            ws.page_setup.fitToHeight = 0  # yüksekliği sınırsız bırak, sadece genişlik sığsın
-            ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT  # veya LANDSCAPE
-            ws.page_setup.paperSize = ws.PAPERSIZE_A4    
-        else:
-            for idx, vals in enumerate(payments, start=1):
-                date = vals[0] if len(vals) > 0 else ''
-                full = vals[1] if len(vals) > 1 else ''
-                recv = vals[2] if len(vals) > 2 else ''
-                rem = vals[3] if len(vals) > 3 else ''
-
-                ws.cell(row=r, column=1, value=idx).alignment = center
-                ws.cell(row=r, column=2, value=date).alignment = center
-                try:
-                    ws.cell(row=r, column=3, value=float(str(full).replace('₺','').strip())).number_format = '#,##0.00'
-                except:
-                    ws.cell(row=r, column=3, value=full)
-                try:
-                    ws.cell(row=r, column=4, value=float(str(recv).replace('₺','').strip())).number_format = '#,##0.00'
-                except:
-                    ws.cell(row=r, column=4, value=recv)
-                try:
-                    ws.cell(row=r, column=5, value=float(str(rem).replace('₺','').strip())).number_format = '#,##0.00'
-                except:
-                    ws.cell(row=r, column=5, value=rem)
-                for c in range(1,6):
-                    ws.cell(row=r, column=c).border = border
-                r += 1
-                sig_start_row = r+2
-                
-            # Başlıklar
-            ws.cell(row=sig_start_row, column=1, value="MÜŞTERİ").font = Font(bold=True)
-            ws.cell(row=sig_start_row, column=5, value="FİRMA YETKİLİSİ").font = Font(bold=True)
-            r += 1
-
-            # Tarih satırı
-            ws.cell(row=r+3, column=1, value="TARİH : ________")
-            ws.cell(row=r+3, column=5, value="TARİH : ________")
-            r += 1
-
-            # İmza satırı
-            ws.cell(row=r+5, column=1, value="İMZA : ________")
-            ws.cell(row=r+5, column=5, value="İMZA : ________")
-            r += 2  # biraz boşluk bırak
-            ws.page_setup.fitToWidth = 1
-            ws.page_setup.fitToHeight = 0  # yüksekliği sınırsız bırak, sadece genişlik sığsın
-            ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT  # veya LANDSCAPE
-            ws.page_setup.paperSize = ws.PAPERSIZE_A4
-        # Kaydet
-        try:
-            wb.save(output_path)
-        except Exception:
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx').name
-            wb.save(tmp)
-            import shutil
-            shutil.copy(tmp, output_path)
-        return output_path
-    
-    
-
-
-    def preview_excel(self):
-        try:
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx').name
-            self.create_excel(tmp)
-            # open with default app
-            webbrowser.open(tmp)
-        except Exception as e:
-            messagebox.showerror("Hata", f"Excel oluşturulurken hata:\n{e}")
-
-    def save_excel(self):
-        customer_name = self.customer_name.get().strip()
-        if not customer_name:
-            messagebox.showwarning("Uyarı", "Lütfen müşteri adı soyadı girin.")
-            return
-        try:
-            teklifler_dir = self.get_save_folder()
-            teklifler_dir.mkdir(parents=True, exist_ok=True)
-            # sanitize folder name
-            customer_folder_name = customer_name.replace(" ", "_")
-            safe_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_çğıöşüÇĞİÖŞÜ"
-            customer_folder_name = ''.join(c if c in safe_chars else '_' for c in customer_folder_name)
-            customer_dir = teklifler_dir / customer_folder_name
-            customer_dir.mkdir(exist_ok=True)
-            date_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"Teklif_{date_str}.xlsx"
-            path = customer_dir / filename
-            self.create_excel(str(path))
-            try:
-                webbrowser.open(str(path))
-            except:
-                pass
-            messagebox.showinfo("Başarılı", f"Excel oluşturuldu:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Kaydetme sırasında hata:\n{e}")
-
-if __name__ == "__main__":
-    # Locale best-effort (windows tr)
-    if sys.platform == 'win32':
-        try:
-            import locale
-            locale.setlocale(locale.LC_ALL, 'Turkish_Turkey.1254')
-        except Exception:
-            try:
-                locale.setlocale(locale.LC_ALL, 'tr_TR.UTF-8')
-            except:
-                pass
-    # Ensure stdout utf-8 if possible
-    try:
-        if sys.stdout.encoding != 'utf-8':
-            sys.stdout.reconfigure(encoding='utf-8')
-        if sys.stderr.encoding != 'utf-8':
-            sys.stderr.reconfigure(encoding='utf-8')
-    except Exception:
-        pass
-
-    root = tk.Tk()
-    app = TeklifApp(root)
-    root.mainloop()
+# -*- coding: utf-8 -*-
+"""
+teklif_app.py
+Excel (XLSX) çıktı üreten Teklif Uygulaması
+- Malzeme tablosu (satır ekle/sil, inline edit)
+- Ödeme planı tablosu (satır ekle/sil, inline edit)
+- Excel çıktısı A4'e göre hizalanmış, firma bilgileri, müşteri kutusu, toplamlar, imza alanı
+- Logo üstte ortalı (varsa ef.png / logo.png kullanılır)
+Requires: openpyxl, pillow (optional for image embedding)
+
+Başlangıç süresi için: python teklif_app.py --startup-profile
+Tek örnek: program açıkken yeniden başlatmak aynı süreçte yeni teklif penceresi açar
+(ayrı süreç için: python teklif_app.py --new-instance)
+"""
+import time
+_START = time.perf_counter()
+
+import sys
+if __name__ == "__main__" and len(sys.argv) == 1:
+    # Açık bir pencere varsa ona "yeni teklif" gönder ve Tk / openpyxl yüklenmeden çık
+    import teklif_tekil
+    if teklif_tekil.forward('new'):
+        sys.exit(0)
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, simpledialog
+import atexit
+from datetime import datetime
+import os
+from pathlib import Path
+import json
+import webbrowser
+import subprocess
+import threading
+
+from teklif_model import (Quote, MaterialLine, PaymentLine, format_kurus, parse_kurus, safe_name,
+                          quote_date, materials_from_rows, installment_plan, ROUNDING_STEPS)
+from teklif_firma import find_logo_path, load_company
+from teklif_export import ExportJob
+from teklif_tablo import VirtualTable
+from teklif_geri import History, fields_of
+import teklif_olcum
+import teklif_tekil
+from teklif_olcum import phase
+# Excel çıktısı (teklif_excel -> openpyxl) ilk dışa aktarımda ya da pencere
+# açıldıktan sonra arka planda yüklenir (bkz. TeklifApp.warm_up_excel)
+_IMPORTS_DONE = time.perf_counter()
+
+# Oturum günlüğünün diske toplu yazılma (fsync) aralığı
+JOURNAL_FLUSH_MS = 2000
+
+
+class StartupProfile:
+    """--startup-profile: açılış aşamalarının sürelerini ölç ve yazdır"""
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def mark(self, name, since=None):
+        """Bir önceki işaretten (veya since'ten) bu yana geçen süreyi kaydet"""
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append((name, now - (self.last if since is None else since)))
+            if since is None:
+                self.last = now
+
+    def report(self, stream=None):
+        with self._lock:
+            phases = list(self.phases)
+        # Ölçüm açıksa (teklif_olcum) açılış süreleri loga da yazılır
+        teklif_olcum.write_record('startup', phases,
+                                  process_ms=round((time.perf_counter() - self.start) * 1000, 2))
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        print("Başlangıç profili:", file=stream)
+        for name, seconds in phases:
+            print(f"  {name:<38} {seconds * 1000:8.1f} ms", file=stream)
+        print(f"  {'toplam (süreç başından)':<38} {(time.perf_counter() - self.start) * 1000:8.1f} ms",
+              file=stream)
+
+
+class TeklifApp:
+    # Bu süreçteki açık teklif pencereleri (tek örnek modunda yeni pencereler aynı süreçte açılır)
+    windows = []
+    # Ürün/işçilik kataloğu süreç başına bir kez yüklenir, pencereler paylaşır (bkz. load_catalog)
+    catalog = None
+    # Arka plan ısınması süreç başına bir kez çalışır (bkz. on_first_idle)
+    _warm_up_lock = threading.Lock()
+    _warm_up_started = False
+    # Kaydedilen teklifler arşive arka plandaki tek thread'de yazılır (bkz. archive_writer)
+    _archive_writer = None
+
+    def __init__(self, root, profile=None, headless=False):
+        """headless: ölçüm için gizli pencere (teklif_bench); günlük, arka plan ısınması ve
+        pencere listesi kullanılmaz"""
+        self.root = root
+        self.profile = profile or StartupProfile()
+        self.root.title("EF Yapı Dekorasyon - Teklif Uygulaması (Excel)")
+        try:
+            self.root.state('zoomed')
+        except Exception:
+            pass
+        self.root.configure(bg='#f0f0f0')
+
+        # Ayarlar dosyası
+        self.config_file = Path(__file__).parent /"setup"/ "teklif_ayarlari.json"
+        # Aynı süreçteki pencereler ayarları paylaşır (dosyaya birbirinin üzerine yazmasınlar)
+        self.settings = TeklifApp.windows[0].settings if TeklifApp.windows else self.load_settings()
+        # Ayar dosyasındaki varsayılan false, TEKLIF_TIMING / TEKLIF_PROFILE ortam değişkenini kapatmasın
+        teklif_olcum.configure(self.settings.get('timing') or None,
+                               self.settings.get('profile_next_export') or None)
+
+        # Logo: uygulama klasöründe ef.png / logo.png
+        self.logo_path = find_logo_path(os.path.dirname(os.path.abspath(__file__)))
+
+        # Headless teklif modeli; tablolar sadece bu modeli gösterir
+        self.quote = Quote()
+        # Sanal tablolar (teklif_tablo.VirtualTable); sadece görünen satırlar Tk öğesidir
+        self.tables = {}
+        # Bekleyen toplam etiketi güncellemesi (root.after id)
+        self._totals_job = None
+        # Arka planda çalışan Excel çıktısı (teklif_export.ExportJob)
+        self.export_job = None
+        # SQLite teklif arşivi (ilk kullanımda açılır, bkz. teklif_arsiv)
+        self._archive = None
+        # Tedarikçi fiyat veritabanı (teklif_fiyat; öneri listesine katkı verir)
+        self._price_db = None
+        self.price_import = None
+        # Önizleme dosyaları önbelleği (teklif_onizleme; ilk önizlemede kurulur, çıkışta silinir)
+        self._preview_cache = None
+        # Çökme kurtarma günlüğü (teklif_gunluk.Journal; ilk boşta açılır)
+        self.journal = None
+        # Geri al / yinele (teklif_geri.History; tablo kopyası değil ters işlemler tutar)
+        self.history = History()
+        # Müşteri kutusu değişkenleri (alan adı -> StringVar); her yazım modele ve günlüğe geçer
+        self.customer_vars = {}
+        self.profile.mark("ayarlar ve model")
+
+        # Ana frame
+        main_frame = tk.Frame(root, bg='#f0f0f0', padx=10, pady=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Başlık (UI başlığı)
+        title_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        title_frame.pack(fill=tk.X, pady=(0, 10))
+
+        title_label = tk.Label(title_frame, text="EF YAPI DEKORASYON",
+                               font=('Arial', 26, 'bold'), bg='#f0f0f0', fg='#2c3e50')
+        title_label.pack()
+
+        subtitle_label = tk.Label(title_frame, text="Fiyat Teklif Uygulaması (Excel Çıktısı)",
+                                  font=('Arial', 18), bg='#f0f0f0', fg='#7f8c8d')
+        subtitle_label.pack()
+
+        # Müşteri bilgileri frame
+        customer_frame = tk.LabelFrame(main_frame, text="Müşteri Bilgileri",
+                                       font=('Arial', 10, 'bold'), bg='#f0f0f0', padx=10, pady=10)
+        customer_frame.pack(fill=tk.X, pady=(0, 10))
+
+        tk.Label(customer_frame, text="Ad Soyad:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=0, sticky='w', padx=6, pady=4)
+        self.customer_name = tk.Entry(customer_frame, width=30, font=('Arial', 9),
+                                      textvariable=self.customer_var('customer_name'))
+        self.customer_name.grid(row=0, column=1, padx=6, pady=4)
+
+        tk.Label(customer_frame, text="T.C. Kimlik No:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=2, sticky='w', padx=6, pady=4)
+        self.customer_tc = tk.Entry(customer_frame, width=25, font=('Arial', 9),
+                                    textvariable=self.customer_var('customer_tc'))
+        self.customer_tc.grid(row=0, column=3, padx=6, pady=4)
+
+        tk.Label(customer_frame, text="Telefon:", bg='#f0f0f0', font=('Arial', 9)).grid(row=1, column=0, sticky='w', padx=6, pady=4)
+        self.customer_phone = tk.Entry(customer_frame, width=30, font=('Arial', 9),
+                                       textvariable=self.customer_var('customer_phone'))
+        self.customer_phone.grid(row=1, column=1, padx=6, pady=4)
+
+        tk.Label(customer_frame, text="Adres:", bg='#f0f0f0', font=('Arial', 9)).grid(row=2, column=0, sticky='w', padx=6, pady=4)
+        self.customer_address = tk.Entry(customer_frame, width=60, font=('Arial', 9),
+                                         textvariable=self.customer_var('customer_address'))
+        self.customer_address.grid(row=2, column=1, columnspan=3, padx=6, pady=4)
+
+
+        # Menü çubuğu
+        self.menubar = tk.Menu(root)
+        root.config(menu=self.menubar)
+        self.create_menu()
+
+        # Butonlar frame
+        button_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        button_frame.pack(fill=tk.X, pady=(0, 6))
+
+        preview_btn = tk.Button(button_frame, text="Excel Önizleme", command=self.preview_excel,
+                                bg='#3498db', fg='white', font=('Arial', 10, 'bold'),
+                                padx=18, pady=5, cursor='hand2')
+        preview_btn.pack(side=tk.LEFT, padx=5)
+
+        save_btn = tk.Button(button_frame, text="Excel Kaydet (Yazdırma için Excel'den yazdırın)", command=self.save_excel,
+                              bg='#27ae60', fg='white', font=('Arial', 10, 'bold'),
+                              padx=18, pady=5, cursor='hand2')
+        save_btn.pack(side=tk.LEFT, padx=5)
+
+        pdf_btn = tk.Button(button_frame, text="PDF Kaydet (Yazdırmaya hazır)",
+                            command=lambda: self.save_excel('pdf'),
+                            bg='#c0392b', fg='white', font=('Arial', 10, 'bold'),
+                            padx=18, pady=5, cursor='hand2')
+        pdf_btn.pack(side=tk.LEFT, padx=5)
+
+        pdf_preview_btn = tk.Button(button_frame, text="PDF Önizleme",
+                                    command=lambda: self.preview_excel('pdf'),
+                                    bg='#e67e22', fg='white', font=('Arial', 10, 'bold'),
+                                    padx=18, pady=5, cursor='hand2')
+        pdf_preview_btn.pack(side=tk.LEFT, padx=5)
+
+        # Dışa aktarma durumu: ilerleme çubuğu + iptal
+        self.export_cancel_btn = tk.Button(button_frame, text="İptal", command=self.cancel_export,
+                                           font=('Arial', 9), state='disabled')
+        self.export_cancel_btn.pack(side=tk.RIGHT, padx=5)
+        self.export_progress = ttk.Progressbar(button_frame, length=160, maximum=100)
+        self.export_progress.pack(side=tk.RIGHT, padx=5)
+        self.export_status = tk.Label(button_frame, text="", bg='#f0f0f0', fg='#7f8c8d', font=('Arial', 9))
+        self.export_status.pack(side=tk.RIGHT, padx=5)
+
+        # Tablolar container
+        tables_container = tk.Frame(main_frame, bg='#f0f0f0')
+        tables_container.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+
+        # Sol taraf - Malzeme tablosu
+        material_container = tk.LabelFrame(tables_container, text="MALZEME TABLOSU",
+                                           font=('Arial', 11, 'bold'), bg='#f0f0f0', padx=5, pady=5)
+        material_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        self.setup_table(material_container, "material")
+
+        # Sağ taraf - Ödeme planı
+        payment_container = tk.LabelFrame(tables_container, text="ÖDEME PLANI",
+                                          font=('Arial', 11, 'bold'), bg='#f0f0f0', padx=5, pady=5)
+        payment_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.setup_table(payment_container, "payment")
+
+        # Genel toplam frame
+        total_frame = tk.LabelFrame(main_frame, text="Genel Toplam", font=('Arial', 10, 'bold'), bg='#f0f0f0', padx=10, pady=10)
+        total_frame.pack(fill=tk.X)
+        self.total_without_vat_label = tk.Label(total_frame, text="KDV Hariç Toplam: 0.00 ₺",
+                                                font=('Arial', 11, 'bold'), bg='#f0f0f0', fg='#2c3e50')
+        self.total_without_vat_label.pack(side=tk.LEFT, padx=20)
+        self.total_with_vat_label = tk.Label(total_frame, text="KDV Dahil Toplam: 0.00 ₺",
+                                             font=('Arial', 11, 'bold'), bg='#f0f0f0', fg='#27ae60')
+        self.total_with_vat_label.pack(side=tk.LEFT, padx=20)
+        self.profile.mark("arayüz bileşenleri")
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        for sequence, command in (('<Control-z>', self.undo), ('<Control-Z>', self.undo),
+                                  ('<Control-y>', self.redo), ('<Control-Y>', self.redo)):
+            self.root.bind(sequence, command)
+        if headless:
+            return
+        TeklifApp.windows.append(self)
+        # Pencere çizildikten sonra Excel motorunu arka planda ısıt
+        self.root.after_idle(self.on_first_idle)
+
+    def on_first_idle(self):
+        self.profile.mark("ilk çizim (pencere görünür)")
+        with TeklifApp._warm_up_lock:
+            start = not TeklifApp._warm_up_started
+            TeklifApp._warm_up_started = True
+        if start:
+            threading.Thread(target=self.warm_up_excel, daemon=True).start()
+        self.start_journal()
+
+    def on_close(self):
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except OSError:
+                pass
+            self.journal = None
+        TeklifApp.windows.remove(self)
+        if isinstance(self.root, tk.Tk):
+            if TeklifApp.windows:
+                # Diğer pencereler Tk köküne bağlı: kök sadece gizlenir
+                self.root.withdraw()
+            else:
+                self.root.destroy()
+        else:
+            tk_root = self.root.master
+            self.root.destroy()
+            if not TeklifApp.windows:
+                tk_root.destroy()
+
+    def is_blank(self):
+        """Henüz hiçbir şey girilmemiş pencere"""
+        return not (self.quote.materials or self.quote.payments or
+                    any(entry.get().strip() for entry in (self.customer_name, self.customer_tc,
+                                                          self.customer_phone, self.customer_address)))
+
+    def bring_to_front(self):
+        self.root.deiconify()
+        self.root.lift()
+        # Windows başka programın önüne geçmeye izin vermezse kısa süreli en üstte tut
+        self.root.attributes('-topmost', True)
+        self.root.after_idle(self.root.attributes, '-topmost', False)
+        self.root.focus_force()
+
+    @classmethod
+    def open_window(cls, tk_root):
+        """Tek örnek komutu: boş bir pencere varsa öne getir, yoksa yeni teklif penceresi aç"""
+        for app in cls.windows:
+            if app.is_blank():
+                app.bring_to_front()
+                return app
+        app = cls(tk.Toplevel(tk_root))
+        app.bring_to_front()
+        return app
+
+    def warm_up_excel(self):
+        """openpyxl'i, stil tablosunu, firma şablonunu ve logoyu arka planda hazırla"""
+        start = time.perf_counter()
+        try:
+            import teklif_excel
+            teklif_excel.named_style_specs()
+            teklif_excel.header_template()
+            teklif_excel.logo_png(self.logo_path)
+            self.profile.mark("openpyxl ısınma (arka plan)", since=start)
+        except Exception as e:
+            self.profile.mark(f"openpyxl ısınma hatası: {e}", since=start)
+        start = time.perf_counter()
+        try:
+            import teklif_pdf
+            teklif_pdf.register_fonts()
+            self.profile.mark("PDF fontları (arka plan)", since=start)
+        except Exception as e:
+            self.profile.mark(f"PDF font hatası: {e}", since=start)
+        start = time.perf_counter()
+        self.load_catalog()
+        self.profile.mark("katalog (arka plan)", since=start)
+        self.profile.report()
+
+    def load_catalog(self):
+        """setup/katalog.csv'yi oku; worker thread'den de çağrılabilir (tek atama, tüm pencerelere geçer)"""
+        from teklif_katalog import Catalog
+        try:
+            catalog = Catalog.load_csv()
+        except Exception:
+            catalog = Catalog()
+        TeklifApp.catalog = catalog
+        return catalog
+
+    # ---------------- Oturum günlüğü ----------------
+    def start_journal(self):
+        """Sahibi kapanmış günlük varsa geri yüklemeyi öner, sonra bu oturumun günlüğünü aç"""
+        import teklif_gunluk
+        try:
+            self.journal = teklif_gunluk.Journal()
+        except OSError:
+            self.journal = None
+            return
+        try:
+            orphans = teklif_gunluk.orphaned_journals()
+        except OSError:
+            orphans = []
+        for path in orphans:
+            if path == self.journal.path:
+                continue
+            try:
+                quote = teklif_gunluk.replay(path)
+            except OSError:
+                continue
+            if not teklif_gunluk.is_empty(quote):
+                if messagebox.askyesno(
+                        "Kurtarma",
+                        "Önceki oturumdan kaydedilmemiş bir teklif bulundu:\n"
+                        f"{quote.customer_name or '(isimsiz)'} - {len(quote.materials)} malzeme, "
+                        f"{len(quote.payments)} ödeme satırı\n\nGeri yüklensin mi?", parent=self.root):
+                    self.load_quote(quote)
+                    teklif_gunluk.discard_journal(path)
+                    break   # kalan günlükler sonraki açılışta sorulur
+            teklif_gunluk.discard_journal(path)
+        self.root.after(JOURNAL_FLUSH_MS, self.flush_journal)
+
+    def log_edit(self, op, *args):
+        """Değişikliği oturum günlüğüne ekle (bkz. teklif_gunluk.Journal); günlük yoksa yok say"""
+        if self.journal is None:
+            return
+        try:
+            getattr(self.journal, op)(*args)
+        except OSError:
+            # Disk dolu / erişim yok: uygulama günlüksüz çalışmaya devam eder
+            self.journal = None
+
+    def flush_journal(self):
+        """Birikmiş kayıtları toplu fsync ile yaz, gerekirse sıkıştır"""
+        if self.journal is None:
+            return
+        self.log_edit('flush')
+        if self.journal is not None and self.journal.needs_compaction:
+            self.log_edit('compact', self.quote)
+        self.root.after(JOURNAL_FLUSH_MS, self.flush_journal)
+
+    # ---------------- Settings ----------------
+    def load_settings(self):
+        """Ayarları yükle"""
+        # excel_engine: auto / standard / stream / direct (bkz. teklif_excel.ENGINES)
+        # timing: aşama sürelerini setup/logs'a yaz; profile_next_export: sıradaki çıktıyı cProfile ile ölç
+        default_settings = {'save_folder': None, 'excel_engine': 'auto',
+                            'timing': False, 'profile_next_export': False}
+        try:
+            if self.config_file.exists():
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    s = json.load(f)
+                    default_settings.update(s)
+        except Exception:
+            pass
+        return default_settings
+
+    def save_settings(self):
+        try:
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            messagebox.showerror("Hata", f"Ayarlar kaydedilirken hata oluştu:\n{e}", parent=self.root)
+
+    def get_save_folder(self):
+        if self.settings.get('save_folder'):
+            return Path(self.settings['save_folder'])
+        else:
+            return Path(__file__).parent / "Teklifler"
+
+    def get_save_folder_display(self):
+        folder = self.get_save_folder()
+        try:
+            return str(folder)
+        except:
+            return "Varsayılan (Uygulama Klasörü)"
+
+    def select_save_folder(self):
+        current_folder = self.get_save_folder()
+        folder = filedialog.askdirectory(title="Tekliflerin Kaydedileceği Klasörü Seçin",
+                                         initialdir=str(current_folder) if current_folder.exists() else None,
+                                         parent=self.root)
+        if folder:
+            self.settings['save_folder'] = str(Path(folder))
+            self.save_settings()
+            messagebox.showinfo("Başarılı", f"Kayıt klasörü güncellendi:\n{folder}", parent=self.root)
+            self.root.after(100, self.update_menu)
+
+    def reset_save_folder(self):
+        self.settings['save_folder'] = None
+        self.save_settings()
+        messagebox.showinfo("Başarılı", "Varsayılan klasöre dönüldü.", parent=self.root)
+        self.root.after(100, self.update_menu)
+
+    def create_menu(self):
+        try:
+            self.menubar.delete(0, tk.END)
+        except Exception:
+            pass
+        ayarlar_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Ayarlar", menu=ayarlar_menu)
+        ayarlar_menu.add_command(label="Kayıt Klasörü Seç", command=self.select_save_folder)
+        ayarlar_menu.add_command(label="Varsayılan Klasöre Dön", command=self.reset_save_folder)
+        ayarlar_menu.add_command(label="Kataloğu Yeniden Yükle", command=self.reload_catalog)
+        ayarlar_menu.add_separator()
+        current_folder = self.get_save_folder_display()
+        if len(current_folder) > 50:
+            current_folder = "..." + current_folder[-47:]
+        ayarlar_menu.add_command(label=f"Mevcut: {current_folder}", state='disabled')
+        duzen_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Düzen", menu=duzen_menu)
+        duzen_menu.add_command(label="Geri Al", accelerator="Ctrl+Z", command=self.undo)
+        duzen_menu.add_command(label="Yinele", accelerator="Ctrl+Y", command=self.redo)
+        arsiv_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Arşiv", menu=arsiv_menu)
+        arsiv_menu.add_command(label="Teklif Ara / Aç...", command=self.open_archive_dialog)
+        arsiv_menu.add_separator()
+        arsiv_menu.add_command(label="Fiyat Listesi İçe Aktar...", command=self.import_price_lists)
+
+    def update_menu(self):
+        self.create_menu()
+
+    def reload_catalog(self):
+        catalog = self.load_catalog()
+        messagebox.showinfo("Katalog", f"Katalog yüklendi: {len(catalog)} kalem", parent=self.root)
+
+    def complete_items(self, prefix, limit=10):
+        """Öneri listesi: önce katalog, kalan yer tedarikçi fiyatlarından"""
+        items = self.catalog.complete(prefix, limit) if self.catalog else []
+        if len(items) < limit:
+            try:
+                if self._price_db is None:
+                    import teklif_fiyat
+                    if not teklif_fiyat.PRICE_DB_FILE.exists():
+                        return items
+                    self._price_db = teklif_fiyat.PriceDB()
+                items += self._price_db.complete(prefix, limit - len(items))
+            except Exception:
+                pass
+        return items
+
+    def import_price_lists(self):
+        """Seçilen fiyat listelerini worker thread'de fiyat veritabanına aktar"""
+        if self.price_import is not None and self.price_import.is_alive():
+            messagebox.showwarning("Uyarı", "Fiyat listesi aktarımı sürüyor.", parent=self.root)
+            return
+        paths = filedialog.askopenfilenames(title="Fiyat Listeleri",
+                                            filetypes=[("Fiyat listesi", "*.xlsx *.xlsm *.csv"),
+                                                       ("Tüm dosyalar", "*.*")], parent=self.root)
+        if not paths:
+            return
+        supplier = simpledialog.askstring("Tedarikçi", "Tedarikçi adı:", parent=self.root)
+        if not supplier:
+            return
+        import teklif_fiyat
+        results = []
+        self.price_import = threading.Thread(
+            target=lambda: results.extend(teklif_fiyat.import_files(paths, supplier.strip())),
+            daemon=True)
+        self.price_import.start()
+        self.export_status.config(text="Fiyat listesi aktarılıyor...")
+
+        def poll():
+            if self.price_import.is_alive():
+                self.root.after(200, poll)
+                return
+            self.export_status.config(text="")
+            summary = "\n".join(teklif_fiyat.result_line(r) for r in results)
+            messagebox.showinfo("Fiyat Listesi", summary or "Aktarım tamamlanamadı.", parent=self.root)
+        poll()
+
+    # ----------------- Table UI -----------------
+    def setup_table(self, parent, table_type):
+        """Tablo yapısını oluştur (material veya payment)"""
+        table_frame = tk.Frame(parent, bg='#f0f0f0')
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+        if table_type == "material":
+            columns = ('Ürün/İşçilik Adı', 'Birim', 'Miktar', 'Birim Fiyat', 'Toplam')
+        else:
+            columns = ('Tarih', 'Genel Toplam', 'Alınacak Tutar', 'Kalan Tutar')
+
+        table = VirtualTable(table_frame, columns, self.table_lines(table_type), height=12)
+        # Kaydırınca açık hücre düzenlemesi başka satırın üstünde kalmasın
+        table.on_scroll = lambda: self.finish_edit(table.tree, table_type)
+        self.tables[table_type] = table
+        tree = table.tree
+
+        for col in columns:
+            tree.heading(col, text=col)
+        # column widths
+        if table_type == "material":
+            tree.column('Ürün/İşçilik Adı', width=220, anchor='w')
+            tree.column('Birim', width=70, anchor='center')
+            tree.column('Miktar', width=70, anchor='center')
+            tree.column('Birim Fiyat', width=100, anchor='e')
+            tree.column('Toplam', width=100, anchor='e')
+        else:
+            tree.column('Tarih', width=90, anchor='center')
+            tree.column('Genel Toplam', width=110, anchor='e')
+            tree.column('Alınacak Tutar', width=110, anchor='e')
+            tree.column('Kalan Tutar', width=110, anchor='e')
+
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Buttons
+        btn_frame = tk.Frame(parent, bg='#f0f0f0')
+        btn_frame.pack(fill=tk.X, padx=6, pady=6)
+        if table_type == "material":
+            add_btn = tk.Button(btn_frame, text="Satır Ekle", command=lambda: self.add_row(tree, table_type),
+                                bg='#3498db', fg='white', font=('Arial', 9), padx=8, pady=3)
+            add_btn.pack(side=tk.LEFT, padx=5)
+            delete_btn = tk.Button(btn_frame, text="Satır Sil", command=lambda: self.delete_row(tree, table_type),
+                                   bg='#e74c3c', fg='white', font=('Arial', 9), padx=8, pady=3)
+            delete_btn.pack(side=tk.LEFT, padx=5)
+            import_btn = tk.Button(btn_frame, text="CSV/Excel İçe Aktar", command=self.import_materials_file,
+                                   bg='#8e44ad', fg='white', font=('Arial', 9), padx=8, pady=3)
+            import_btn.pack(side=tk.LEFT, padx=5)
+            # Excel'den kopyalanan satırlar Ctrl+V ile eklenir
+            tree.bind('<<Paste>>', lambda e: self.paste_materials())
+        else:
+            add_btn = tk.Button(btn_frame, text="Ödeme Satırı Ekle", command=lambda: self.add_row(tree, table_type),
+                                bg='#3498db', fg='white', font=('Arial', 9), padx=8, pady=3)
+            add_btn.pack(side=tk.LEFT, padx=5)
+            delete_btn = tk.Button(btn_frame, text="Satır Sil", command=lambda: self.delete_row(tree, table_type),
+                                   bg='#e74c3c', fg='white', font=('Arial', 9), padx=8, pady=3)
+            delete_btn.pack(side=tk.LEFT, padx=5)
+            plan_btn = tk.Button(btn_frame, text="Taksit Planı", command=self.open_installment_dialog,
+                                 bg='#8e44ad', fg='white', font=('Arial', 9), padx=8, pady=3)
+            plan_btn.pack(side=tk.LEFT, padx=5)
+
+        # Totals area for material
+        if table_type == "material":
+            total_frame = tk.Frame(parent, bg='#f0f0f0')
+            total_frame.pack(fill=tk.X, padx=6, pady=(4,6))
+            tk.Label(total_frame, text="Ara Toplam:", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=0, sticky='w', padx=3)
+            subtotal_value = tk.Label(total_frame, text="0.00 ₺", bg='#f0f0f0', font=('Arial', 9))
+            subtotal_value.grid(row=0, column=1, sticky='e', padx=3)
+            tk.Label(total_frame, text="KDV (%20):", bg='#f0f0f0', font=('Arial', 9)).grid(row=0, column=2, sticky='w', padx=30)
+            vat_value = tk.Label(total_frame, text="0.00 ₺", bg='#f0f0f0', font=('Arial', 9))
+            vat_value.grid(row=0, column=3, sticky='e', padx=3)
+            self.material_subtotal = subtotal_value
+            self.material_vat = vat_value
+
+        # Save tree refs
+        if table_type == "material":
+            self.material_tree = tree
+        else:
+            self.payment_tree = tree
+
+        # Inline editing support (simple)
+        tree.bind('<Double-1>', lambda e: self.start_edit(tree, table_type, e))
+        tree.bind('<Button-1>', lambda e: self.on_click(tree, e))
+        tree.bind('<Return>', lambda e: self.finish_edit(tree, table_type))
+        tree.bind('<Escape>', lambda e: self.cancel_edit(tree))
+        tree.bind('<Delete>', lambda e: self.delete_row(tree, table_type))
+
+    def table_lines(self, table_type):
+        """Modeldeki satır listesi (material veya payment)"""
+        if table_type == "material":
+            return self.quote.materials
+        return self.quote.payments
+
+    def insert_line(self, tree, table_type, line):
+        """Satırı modele ekle ve tabloda göster"""
+        if table_type == "material":
+            self.quote.add_material(line)
+        else:
+            self.quote.payments.append(line)
+        table = self.tables[table_type]
+        self.history.record('ins', table_type, range(len(table.lines) - 1, len(table.lines)), [line])
+        self.log_edit('insert', table_type, len(table.lines) - 1, [line])
+        table.see(len(table.lines) - 1)
+        return line
+
+    def insert_materials(self, lines):
+        """Çok sayıda malzeme satırını tek seferde ekle; toplamlar en sonda bir kez hesaplanır"""
+        start = len(self.quote.materials)
+        self.quote.extend_materials(lines)
+        self.history.record('ins', 'material', range(start, start + len(lines)), list(lines))
+        self.log_edit('insert', 'material', start, lines)
+        table = self.tables['material']
+        table.see(len(table.lines) - 1)
+        self.schedule_totals()
+
+    def import_material_rows(self, rows, source):
+        """Doğrula, hatalıları bildir, geçerli satırları toplu ekle"""
+        lines, errors = materials_from_rows(rows)
+        if errors:
+            shown = "\n".join(f"Satır {n}: {msg}" for n, msg in errors[:10])
+            more = f"\n... (+{len(errors) - 10})" if len(errors) > 10 else ""
+            if not messagebox.askyesno("Uyarı", f"{source}: {len(errors)} satır okunamadı:\n{shown}{more}\n\n"
+                                                f"Geçerli {len(lines)} satır eklensin mi?", parent=self.root):
+                return
+        if lines:
+            self.insert_materials(lines)
+
+    def paste_materials(self):
+        """Panodaki sekmeyle ayrılmış satırları (Excel kopyası) malzeme tablosuna ekle"""
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            return 'break'
+        rows = [line.split('\t') for line in text.splitlines()]
+        self.import_material_rows(rows, "Pano")
+        return 'break'
+
+    def import_materials_file(self):
+        path = filedialog.askopenfilename(title="Malzeme Listesi",
+                                          filetypes=[("CSV / Excel", "*.csv *.txt *.xlsx *.xlsm"),
+                                                     ("Tüm dosyalar", "*.*")], parent=self.root)
+        if not path:
+            return
+        from teklif_fiyat import iter_rows
+        try:
+            rows = list(iter_rows(path))
+        except Exception as e:
+            messagebox.showerror("Hata", f"Dosya okunamadı:\n{e}", parent=self.root)
+            return
+        self.import_material_rows(rows, os.path.basename(path))
+
+    def add_row(self, tree, table_type):
+        if table_type == "material":
+            line = MaterialLine()
+        else:
+            # payment default columns: Tarih, Genel Toplam, Alınacak, Kalan
+            line = PaymentLine(date=datetime.now().strftime('%d.%m.%Y'))
+        self.insert_line(tree, table_type, line)
+        self.schedule_totals()
+
+    def delete_row(self, tree, table_type):
+        table = self.tables[table_type]
+        removed = table.selected_lines()
+        if removed:
+            self.cancel_edit(tree)
+            ids = {id(line) for line in removed}
+            indices = [i for i, line in enumerate(table.lines) if id(line) in ids]
+            self.history.record('del', table_type, indices, removed)
+            self.log_edit('delete', table_type, indices)
+            if table_type == "material":
+                self.quote.remove_materials(removed)
+            else:
+                self.quote.payments[:] = [line for line in self.quote.payments if id(line) not in ids]
+            table.clear_selection()
+            table.refresh()
+            self.schedule_totals()
+        else:
+            messagebox.showwarning("Uyarı", "Lütfen silmek için bir satır seçin.", parent=self.root)
+
+    def open_installment_dialog(self):
+        """KDV dahil toplam, peşinat, taksit sayısı/aralığı ve yuvarlamadan tüm ödeme planını üret"""
+        win = tk.Toplevel(self.root)
+        win.title("Taksit Planı")
+        win.resizable(False, False)
+        win.transient(self.root)
+        form = tk.Frame(win, padx=10, pady=10)
+        form.pack(fill=tk.BOTH)
+
+        fields = {}
+        defaults = (
+            ('total', "Genel Toplam (KDV Dahil):", format_kurus(self.quote.totals()[3])),
+            ('down', "Peşinat:", "0.00"),
+            ('count', "Taksit Sayısı:", "12"),
+            ('interval', "Aralık (ay):", "1"),
+            ('start', "Başlangıç Tarihi:", datetime.now().strftime('%d.%m.%Y')),
+        )
+        for row, (key, label, value) in enumerate(defaults):
+            tk.Label(form, text=label, font=('Arial', 9)).grid(row=row, column=0, sticky='w', pady=2)
+            entry = tk.Entry(form, width=16, font=('Arial', 9))
+            entry.insert(0, value)
+            entry.grid(row=row, column=1, sticky='w', padx=6, pady=2)
+            fields[key] = entry
+        row = len(defaults)
+        tk.Label(form, text="Yuvarlama:", font=('Arial', 9)).grid(row=row, column=0, sticky='w', pady=2)
+        rounding = ttk.Combobox(form, values=list(ROUNDING_STEPS), state='readonly', width=13)
+        rounding.set('1 ₺')
+        rounding.grid(row=row, column=1, sticky='w', padx=6, pady=2)
+        tk.Label(form, text="Artan Tutar:", font=('Arial', 9)).grid(row=row + 1, column=0, sticky='w', pady=2)
+        remainder = ttk.Combobox(form, values=("Son taksite", "İlk taksite"), state='readonly', width=13)
+        remainder.set("Son taksite")
+        remainder.grid(row=row + 1, column=1, sticky='w', padx=6, pady=2)
+
+        def create():
+            try:
+                start = datetime.strptime(fields['start'].get().strip(), '%d.%m.%Y')
+            except ValueError:
+                messagebox.showwarning("Uyarı", "Tarih gg.aa.yyyy biçiminde olmalı.", parent=win)
+                return
+            try:
+                plan = installment_plan(parse_kurus(fields['total'].get()),
+                                        int(fields['count'].get()), start,
+                                        parse_kurus(fields['down'].get()),
+                                        int(fields['interval'].get()),
+                                        ROUNDING_STEPS[rounding.get()],
+                                        remainder.get() == "Son taksite")
+            except ValueError as e:
+                messagebox.showwarning("Uyarı", f"Geçersiz değer: {e}", parent=win)
+                return
+            if self.quote.payments and not messagebox.askyesno(
+                    "Taksit Planı", "Mevcut ödeme planı silinip yenisi yazılsın mı?", parent=win):
+                return
+            self.set_payment_plan(plan)
+            win.destroy()
+
+        buttons = tk.Frame(win, padx=10)
+        buttons.pack(fill=tk.X, pady=(0, 10))
+        tk.Button(buttons, text="Oluştur", command=create, bg='#27ae60', fg='white',
+                  font=('Arial', 9), padx=10).pack(side=tk.RIGHT, padx=4)
+        tk.Button(buttons, text="Vazgeç", command=win.destroy, font=('Arial', 9),
+                  padx=10).pack(side=tk.RIGHT, padx=4)
+        win.bind('<Return>', lambda e: create())
+        win.bind('<Escape>', lambda e: win.destroy())
+        fields['down'].focus_set()
+
+    def set_payment_plan(self, lines):
+        """Ödeme tablosunu verilen satırlarla tek seferde değiştir"""
+        self.cancel_edit(self.payment_tree)
+        self.history.record('rep', 'payment', list(self.quote.payments), list(lines))
+        self.quote.payments[:] = lines
+        self.log_edit('replace', 'payment', lines)
+        self.tables['payment'].set_lines(self.quote.payments)
+
+    def start_edit(self, tree, table_type, event):
+        # End previous edit
+        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
+            self.finish_edit(tree, table_type)
+
+        region = tree.identify_region(event.x, event.y)
+        if region != "cell":
+            return
+        item = tree.identify_row(event.y)
+        column = tree.identify_column(event.x)
+        col_index = int(column.replace('#','')) - 1
+        if not item:
+            return
+        # Toplam sütunu miktar x birim fiyattan hesaplanır
+        if table_type == "material" and col_index == 4:
+            return
+        bbox = tree.bbox(item, column)
+        if not bbox:
+            return
+        x, y, width, height = bbox
+        line = self.tables[table_type].line_at(item)
+        if line is None:
+            return
+        values = line.values()
+        current_value = values[col_index] if col_index < len(values) else ''
+        entry = tk.Entry(tree, font=('Arial', 9))
+        entry.place(x=x, y=y, width=width, height=height)
+        entry.insert(0, str(current_value))
+        entry.select_range(0, tk.END)
+        entry.focus()
+        if not hasattr(self, 'editing_cells'):
+            self.editing_cells = {}
+        self.editing_cells[tree] = {'entry': entry, 'line': line, 'col_index': col_index, 'table_type': table_type}
+        entry.bind('<Return>', lambda e: self.finish_edit(tree, table_type))
+        entry.bind('<Escape>', lambda e: self.cancel_edit(tree))
+        if table_type == "material" and col_index == 0:
+            self.attach_completion(tree, entry, x, y + height, max(width, 380))
+
+    def attach_completion(self, tree, entry, x, y, width):
+        """Ürün adı düzenlenirken katalogdan öneri listesi; seçilen kalem birim ve fiyatı da doldurur"""
+        info = self.editing_cells[tree]
+        popup = tk.Listbox(tree, font=('Arial', 9), height=8, activestyle='none')
+        info['popup'] = popup
+        shown = []
+
+        def refresh(event):
+            if event.keysym in ('Up', 'Down', 'Return', 'KP_Enter', 'Escape'):
+                return
+            shown[:] = self.complete_items(entry.get())
+            popup.delete(0, tk.END)
+            if not shown:
+                popup.place_forget()
+                return
+            popup.insert(tk.END, *(item.label() for item in shown))
+            popup.config(height=len(shown))
+            popup.place(x=x, y=y, width=width)
+
+        def move(step):
+            if not shown:
+                return
+            sel = popup.curselection()
+            i = (sel[0] + step) if sel else (0 if step > 0 else len(shown) - 1)
+            i = max(0, min(len(shown) - 1, i))
+            popup.selection_clear(0, tk.END)
+            popup.selection_set(i)
+            popup.see(i)
+            return 'break'
+
+        def accept(event=None):
+            sel = popup.curselection()
+            if shown and sel:
+                item = shown[sel[0]]
+                entry.delete(0, tk.END)
+                entry.insert(0, item.name)
+                info['catalog_item'] = item
+            self.finish_edit(tree, "material")
+            return 'break'
+
+        entry.bind('<KeyRelease>', refresh)
+        entry.bind('<Down>', lambda e: move(1))
+        entry.bind('<Up>', lambda e: move(-1))
+        entry.bind('<Return>', accept)
+        popup.bind('<ButtonRelease-1>', accept)
+
+    def on_click(self, tree, event):
+        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
+            self.finish_edit(tree, self.editing_cells[tree]['table_type'])
+
+    def finish_edit(self, tree, table_type):
+        if not hasattr(self, 'editing_cells') or tree not in self.editing_cells:
+            return
+        info = self.editing_cells[tree]
+        entry = info['entry']
+        line = info['line']
+        col_index = info['col_index']
+        new_value = entry.get()
+        before = fields_of(line)
+        entry.destroy()
+        if 'popup' in info:
+            info['popup'].destroy()
+        del self.editing_cells[tree]
+        try:
+            if table_type == "material":
+                catalog_item = info.get('catalog_item')
+                # Değişmeyen hücre yeniden ayrıştırılmaz ('1.125' gibi gösterimler belirsiz sayılır)
+                if catalog_item is not None or new_value != line.values()[col_index]:
+                    self.quote.edit_material(line, col_index, new_value)
+                if catalog_item is not None:
+                    self.quote.edit_material(line, 1, catalog_item.unit)
+                    self.quote.edit_material(line, 3, format_kurus(catalog_item.unit_price))
+            else:
+                line.set_field(col_index, new_value)
+        except ValueError:
+            # Yarım kalan düzenleme (ör. katalog seçimi) satırı eski haline döndürür
+            self.restore_line(table_type, line, before)
+            messagebox.showwarning("Uyarı", f"Geçersiz sayı: {new_value}", parent=self.root)
+            return
+
+        table = self.tables[table_type]
+        index = table.lines.index(line)
+        # Düzenleme ve otomatik eklenen ödeme satırı tek geri alma adımıdır
+        with self.history.group():
+            if table_type == "payment" and col_index in (1, 2):
+                # Payment table otomatik Kalan Tutar ve alt satır ekleme
+                # Alınacak Tutar 0'dan farklıysa işlem yap
+                if line.received != 0:
+                    kalan = line.total - line.received
+                    if kalan < 0:
+                        messagebox.showwarning("Uyarı", "Alınacak tutar Genel Toplamdan büyük olamaz!",
+                                               parent=self.root)
+                        kalan = 0  # kalan sıfır olarak kalır
+                    line.remaining = kalan
+
+                    # Eğer kalan > 0 ve bu son satırsa alt satır ekle
+                    if kalan > 0 and line is self.quote.payments[-1]:
+                        self.insert_line(tree, table_type, PaymentLine(
+                            date=datetime.now().strftime('%d.%m.%Y'),
+                            total=kalan, received=0, remaining=kalan))
+            after = fields_of(line)
+            if after != before:
+                self.history.record('set', table_type, index, before, after)
+                self.log_edit('update', table_type, index, line)
+        table.refresh_line(line)
+        self.schedule_totals()
+
+    def restore_line(self, table_type, line, values):
+        """Satırın alanlarını values'a (fields_of) geri al ve ekranda tazele"""
+        if fields_of(line) != values:
+            old_total = line.total if table_type == "material" else 0
+            for name, value in zip(line.__slots__, values):
+                setattr(line, name, value)
+            if table_type == "material":
+                self.quote.subtotal += line.total - old_total
+                self.schedule_totals()
+        self.tables[table_type].refresh_line(line)
+
+    # ---------------- Geri al / yinele ----------------
+    def undo(self, event=None):
+        return self.step_history(self.history.undo, event)
+
+    def redo(self, event=None):
+        return self.step_history(self.history.redo, event)
+
+    def step_history(self, step, event=None):
+        """Geçmişten bir adım uygula, değişen tabloları gösterip toplamları güncelle"""
+        if event is not None and isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return None     # metin kutusunda yazarken tabloya dokunma
+        for tree in (self.material_tree, self.payment_tree):
+            self.cancel_edit(tree)
+        touched = step(self.quote, self.log_edit)
+        for table_type, index in dict(touched).items():
+            table = self.tables[table_type]
+            table.clear_selection()
+            if table.lines:
+                table.see(min(index, len(table.lines) - 1))
+            else:
+                table.refresh()
+        if touched:
+            self.schedule_totals()
+        return 'break'
+
+    def cancel_edit(self, tree):
+        if hasattr(self, 'editing_cells') and tree in self.editing_cells:
+            entry = self.editing_cells[tree]['entry']
+            try:
+                entry.destroy()
+                self.editing_cells[tree].get('popup', entry).destroy()
+            except:
+                pass
+            del self.editing_cells[tree]
+
+    def calculate_table_totals(self, tree=None):
+        """(ara toplam, KDV hariç, KDV, KDV dahil) - kuruş; ödeme tablosu toplama dahil değil"""
+        return self.quote.totals()
+
+    def schedule_totals(self, delay=50):
+        """Etiket güncellemesini root.after ile birleştir (art arda değişiklikte tek çizim)"""
+        if self._totals_job is None:
+            self._totals_job = self.root.after(delay, self.update_totals)
+
+    def update_totals(self):
+        self._totals_job = None
+        try:
+            m_sub, m_without, m_vat, m_with = self.calculate_table_totals()
+            self.material_subtotal.config(text=f"{format_kurus(m_sub)} ₺")
+            self.material_vat.config(text=f"{format_kurus(m_vat)} ₺")
+            self.total_without_vat_label.config(text=f"KDV Hariç Toplam: {format_kurus(m_without)} ₺")
+            self.total_with_vat_label.config(text=f"KDV Dahil Toplam: {format_kurus(m_with)} ₺")
+        except Exception:
+            pass
+
+    def get_table_data(self, tree):
+        """Tablodaki satırların görüntü değerleri (modelden)"""
+        table_type = "material" if tree == getattr(self, 'material_tree', None) else "payment"
+        return [line.values() for line in self.table_lines(table_type)]
+
+    def customer_var(self, field):
+        """Müşteri alanının (Quote alan adı) değişkeni; Entry'deki her değişiklik customer_changed'e gider"""
+        var = tk.StringVar(self.root)
+        var.trace_add('write', lambda *_: self.customer_changed(field))
+        self.customer_vars[field] = var
+        return var
+
+    def customer_changed(self, field):
+        """Müşteri alanını modele aktar ve günlüğe ekle (aynı değer tekrar yazılmaz)"""
+        setattr(self.quote, field, self.customer_vars[field].get())
+        q = self.quote
+        self.log_edit('set_customer', (q.customer_name, q.customer_tc, q.customer_phone, q.customer_address))
+
+    # ---------------- EXCEL Generation ----------------
+    def create_excel(self, output_path):
+        """Modeldeki teklifi Excel'e yaz (bkz. teklif_excel.create_excel)"""
+        import teklif_excel
+        return teklif_excel.create_excel(self.quote, output_path, self.logo_path,
+                                         engine=self.settings.get('excel_engine'))
+
+    # ------------- Arka planda dışa aktarma -------------
+    def export_snapshot(self):
+        """Dışa aktarılacak bağımsız kopya; Excel'deki ve arşivdeki tarih aynı olsun"""
+        snapshot = self.quote.snapshot()
+        snapshot.date = quote_date(snapshot)
+        return snapshot
+
+    def start_export(self, output_path, on_success, error_text, fmt='xlsx', snapshot=None):
+        """Teklifin kopyasını worker thread'de Excel'e / PDF'e yaz; bitince on_success(path) çağrılır"""
+        if self.export_job is not None and not self.export_job.done:
+            messagebox.showwarning("Uyarı", "Önceki Excel çıktısı hâlâ hazırlanıyor.", parent=self.root)
+            return
+        if snapshot is None:
+            snapshot = self.export_snapshot()
+        self.export_job = ExportJob(snapshot, output_path, self.logo_path,
+                                    self.settings.get('excel_engine'), fmt).start()
+        self._export_success = on_success
+        self._export_error_text = error_text
+        self.export_cancel_btn.config(state='normal')
+        self.poll_export()
+
+    def poll_export(self):
+        job = self.export_job
+        stage, fraction = job.progress()
+        self.export_status.config(text=stage)
+        if fraction is None:
+            self.export_progress.config(mode='indeterminate')
+            self.export_progress.step(4)
+        else:
+            self.export_progress.config(mode='determinate', value=fraction * 100)
+        if not job.done:
+            self.root.after(100, self.poll_export)
+            return
+        self.export_cancel_btn.config(state='disabled')
+        self.export_progress.config(mode='determinate', value=0)
+        if job.profile_path is not None and self.settings.get('profile_next_export'):
+            # Profil tek seferliktir
+            self.settings['profile_next_export'] = False
+            self.save_settings()
+        if job.cancelled:
+            self.export_status.config(text="İptal edildi")
+            job.trace.finish(status='cancelled')
+        elif job.error is not None:
+            self.export_status.config(text="Hata")
+            job.trace.finish(status='error', error=str(job.error))
+            messagebox.showerror("Hata", f"{self._export_error_text}:\n{job.error}", parent=self.root)
+        else:
+            self.export_status.config(text=f"Hazır ({job.elapsed:.1f} s)")
+            with job.trace.activate():
+                self._export_success(job.result_path)
+            job.trace.finish(status='ok', profile=str(job.profile_path) if job.profile_path else None)
+
+    def cancel_export(self):
+        if self.export_job is not None and not self.export_job.done:
+            self.export_job.cancel()
+            self.export_status.config(text="İptal ediliyor...")
+
+    @property
+    def preview_cache(self):
+        if self._preview_cache is None:
+            from teklif_onizleme import PreviewCache
+            self._preview_cache = PreviewCache()
+            atexit.register(self._preview_cache.clear)
+        return self._preview_cache
+
+    def preview_excel(self, fmt='xlsx'):
+        """Değişmemiş teklifin önizlemesi önbellekten açılır, değilse üretilip önbelleğe alınır"""
+        from teklif_onizleme import quote_digest
+        snapshot = self.export_snapshot()
+        cache = self.preview_cache
+        key = quote_digest(snapshot, fmt, self.logo_path, self.settings.get('excel_engine'),
+                           load_company())
+        cached = cache.get(key)
+        if cached is not None:
+            self.export_status.config(text="Hazır (önbellek)")
+            self.open_file(cached)
+            return
+
+        def on_ready(path):
+            self.open_file(cache.put(key, path, fmt))
+        self.start_export(None, on_ready,
+                          "PDF oluşturulurken hata" if fmt == 'pdf' else "Excel oluşturulurken hata",
+                          fmt, snapshot)
+
+    def save_excel(self, fmt='xlsx'):
+        customer_name = self.customer_name.get().strip()
+        if not customer_name:
+            messagebox.showwarning("Uyarı", "Lütfen müşteri adı soyadı girin.", parent=self.root)
+            return
+        try:
+            teklifler_dir = self.get_save_folder()
+            teklifler_dir.mkdir(parents=True, exist_ok=True)
+            # sanitize folder name
+            customer_folder_name = safe_name(customer_name)
+            customer_dir = teklifler_dir / customer_folder_name
+            customer_dir.mkdir(exist_ok=True)
+            date_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"Teklif_{date_str}.{fmt}"
+            path = customer_dir / filename
+        except Exception as e:
+            messagebox.showerror("Hata", f"Kaydetme sırasında hata:\n{e}", parent=self.root)
+            return
+        self.start_export(str(path), self.on_saved, "Kaydetme sırasında hata", fmt)
+
+    def open_file(self, path):
+        with phase('open'):
+            webbrowser.open(path)
+
+    def on_saved(self, path):
+        # Arşiv (SQLite) yazımı arka planda; sonucu poll_archive_save Tk thread'inde gösterir
+        try:
+            future = self.archive_writer().save(self.export_job.quote, path)
+        except Exception as e:
+            messagebox.showwarning("Uyarı", f"Teklif arşive yazılamadı:\n{e}", parent=self.root)
+        else:
+            self.poll_archive_save(future)
+        try:
+            self.open_file(path)
+        except:
+            pass
+        messagebox.showinfo("Başarılı", f"Teklif oluşturuldu:\n{path}", parent=self.root)
+
+    def poll_archive_save(self, future):
+        if not future.done():
+            self.root.after(50, self.poll_archive_save, future)
+            return
+        error = future.exception()
+        if error is not None:
+            messagebox.showwarning("Uyarı", f"Teklif arşive yazılamadı:\n{error}", parent=self.root)
+
+    # ---------------- Arşiv ----------------
+    @classmethod
+    def archive_writer(cls):
+        """Tüm pencerelerin paylaştığı arka plan arşiv yazıcısı (teklif_arsiv.ArchiveWriter)"""
+        if cls._archive_writer is None:
+            from teklif_arsiv import ArchiveWriter
+            cls._archive_writer = ArchiveWriter()
+            atexit.register(cls._archive_writer.close)
+        return cls._archive_writer
+
+    @property
+    def archive(self):
+        if self._archive is None:
+            from teklif_arsiv import QuoteArchive
+            self._archive = QuoteArchive()
+        return self._archive
+
+    def load_quote(self, quote):
+        """Teklifi müşteri kutusuna ve tablolara yükle (mevcut içerik silinir)"""
+        for tree in (self.material_tree, self.payment_tree):
+            self.cancel_edit(tree)
+        self.quote = Quote(materials=quote.materials, payments=quote.payments)
+        for field, var in self.customer_vars.items():
+            var.set(getattr(quote, field))     # customer_changed modele aktarır
+        self.tables['material'].set_lines(self.quote.materials)
+        self.tables['payment'].set_lines(self.quote.payments)
+        self.log_edit('compact', self.quote)
+        self.history.clear()
+        self.schedule_totals()
+
+    def open_archive_dialog(self):
+        """Arşivde müşteri adı / T.C. / telefon / tarih aralığına göre ara, çift tıkla aç"""
+        try:
+            archive = self.archive
+        except Exception as e:
+            messagebox.showerror("Hata", f"Arşiv açılamadı:\n{e}", parent=self.root)
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Teklif Arşivi")
+        win.geometry("820x420")
+        form = tk.Frame(win, padx=8, pady=8)
+        form.pack(fill=tk.X)
+        tk.Label(form, text="Ad / T.C. / Telefon:", font=('Arial', 9)).grid(row=0, column=0, sticky='w')
+        text_entry = tk.Entry(form, width=30, font=('Arial', 9))
+        text_entry.grid(row=0, column=1, padx=6)
+        tk.Label(form, text="Tarih (gg.aa.yyyy):", font=('Arial', 9)).grid(row=0, column=2, sticky='w')
+        from_entry = tk.Entry(form, width=11, font=('Arial', 9))
+        from_entry.grid(row=0, column=3, padx=3)
+        tk.Label(form, text="-", font=('Arial', 9)).grid(row=0, column=4)
+        to_entry = tk.Entry(form, width=11, font=('Arial', 9))
+        to_entry.grid(row=0, column=5, padx=3)
+
+        columns = ('Tarih', 'Müşteri', 'T.C.', 'Telefon', 'KDV Dahil', 'Dosya')
+        tree = ttk.Treeview(win, columns=columns, show='headings')
+        for col, width, anchor in zip(columns, (80, 180, 100, 110, 100, 240),
+                                      ('center', 'w', 'center', 'center', 'e', 'w')):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor=anchor)
+        tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
+        status = tk.Label(win, text="", font=('Arial', 9), fg='#7f8c8d', anchor='w')
+        status.pack(fill=tk.X, padx=8, pady=(0, 6))
+
+        job = [None]
+
+        def run_search():
+            job[0] = None
+            tree.delete(*tree.get_children())
+            rows = archive.search(text_entry.get(), from_entry.get(), to_entry.get())
+            for quote_id, date, name, tc, phone, total, path in rows:
+                tree.insert('', 'end', iid=str(quote_id),
+                            values=(date, name, tc, phone, format_kurus(total), path or ''))
+            status.config(text=f"{len(rows)} teklif" + (" (ilk 200)" if len(rows) == 200 else ""))
+
+        def schedule_search(event=None):
+            # Yazarken her tuşta değil, kısa bir duraklamadan sonra ara
+            if job[0] is not None:
+                win.after_cancel(job[0])
+            job[0] = win.after(150, run_search)
+
+        def open_selected(event=None):
+            sel = tree.selection()
+            if not sel:
+                return
+            try:
+                quote = archive.load(int(sel[0]))
+            except KeyError:
+                messagebox.showerror("Hata", "Teklif arşivde bulunamadı.", parent=win)
+                return
+            # Yeniden kaydedilen teklif bugünün tarihini alır
+            quote.date = None
+            self.load_quote(quote)
+            win.destroy()
+
+        for entry in (text_entry, from_entry, to_entry):
+            entry.bind('<KeyRelease>', schedule_search)
+        tree.bind('<Double-1>', open_selected)
+        tree.bind('<Return>', open_selected)
+        text_entry.focus_set()
+        run_search()
+
+if __name__ == "__main__":
+    # Locale best-effort (windows tr)
+    if sys.platform == 'win32':
+        try:
+            import locale
+            locale.setlocale(locale.LC_ALL, 'Turkish_Turkey.1254')
+        except Exception:
+            try:
+                locale.setlocale(locale.LC_ALL, 'tr_TR.UTF-8')
+            except:
+                pass
+    # Ensure stdout utf-8 if possible
+    try:
+        if sys.stdout.encoding != 'utf-8':
+            sys.stdout.reconfigure(encoding='utf-8')
+        if sys.stderr.encoding != 'utf-8':
+            sys.stderr.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+    # Toplu üretim: python teklif_app.py batch quotes.jsonl --out DIR --workers N
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        import teklif_batch
+        sys.exit(teklif_batch.main(sys.argv[2:]))
+    # Performans ölçümü: python teklif_app.py bench [--update-baseline]
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        import teklif_bench
+        sys.exit(teklif_bench.main(sys.argv[2:]))
+    # Fiyat listesi aktarımı: python teklif_app.py fiyat-import --supplier ADI liste.xlsx ...
+    if len(sys.argv) > 1 and sys.argv[1] == 'fiyat-import':
+        import teklif_fiyat
+        sys.exit(teklif_fiyat.main(sys.argv[2:]))
+    # Ofis içi teklif sunucusu: python teklif_app.py serve --out KLASÖR [--host 0.0.0.0]
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        import teklif_sunucu
+        sys.exit(teklif_sunucu.main(sys.argv[2:]))
+
+    profile = StartupProfile('--startup-profile' in sys.argv, _START)
+    profile.phases.append(("modül importları", _IMPORTS_DONE - _START))
+    profile.last = time.perf_counter()
+    root = tk.Tk()
+    profile.mark("Tk()")
+    app = TeklifApp(root, profile)
+    # Sonraki açılışlar bu sürece bağlanıp yeni pencere ister (bkz. teklif_tekil)
+    instance = None
+    try:
+        instance = teklif_tekil.InstanceServer().start()
+        instance.attach(root, lambda command: TeklifApp.open_window(root))
+    except OSError:
+        pass
+    root.mainloop()
+    if instance is not None:
+        instance.close()
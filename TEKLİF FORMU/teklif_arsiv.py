@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_arsiv.py
+Kaydedilen tekliflerin yerel SQLite arşivi
+- Her kayıtta müşteri bilgileri, malzeme satırları ve ödeme planı tek işlemde (transaction) yazılır
+- Müşteri adı, T.C., telefon ve tarih indeksli; arama on binlerce teklifte milisaniyeler sürer
+- load() arşivdeki teklifi tekrar Quote nesnesine çevirir (tablolara geri açmak için)
+- ArchiveWriter kayıtları arka plandaki tek thread'de kendi bağlantısıyla yazar (arayüz beklemez);
+  WAL sayesinde arayüzdeki okuma bağlantısı yeni kayıtları hemen görür
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import sqlite3
+
+from teklif_model import Quote, MaterialLine, PaymentLine, search_key
+
+ARCHIVE_FILE = Path(__file__).parent / "setup" / "teklif_arsivi.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    customer_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    customer_tc TEXT NOT NULL,
+    customer_phone TEXT NOT NULL,
+    phone_key TEXT NOT NULL,
+    customer_address TEXT NOT NULL,
+    date TEXT NOT NULL,
+    date_iso TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    xlsx_path TEXT,
+    subtotal INTEGER NOT NULL,
+    total_with_vat INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_quotes_name ON quotes(name_key);
+CREATE INDEX IF NOT EXISTS ix_quotes_tc ON quotes(customer_tc);
+CREATE INDEX IF NOT EXISTS ix_quotes_phone ON quotes(phone_key);
+CREATE INDEX IF NOT EXISTS ix_quotes_date ON quotes(date_iso);
+CREATE TABLE IF NOT EXISTS materials (
+    quote_id INTEGER NOT NULL REFERENCES quotes(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    qty REAL NOT NULL,
+    unit_price INTEGER NOT NULL,
+    PRIMARY KEY (quote_id, pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS payments (
+    quote_id INTEGER NOT NULL REFERENCES quotes(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    received INTEGER NOT NULL,
+    remaining INTEGER NOT NULL,
+    PRIMARY KEY (quote_id, pos)
+) WITHOUT ROWID;
+"""
+
+# Arama sonucu sütunları (search() bu sırayla döner)
+RESULT_COLUMNS = ('id', 'date', 'customer_name', 'customer_tc', 'customer_phone',
+                  'total_with_vat', 'xlsx_path')
+
+
+def digits_of(text):
+    return ''.join(c for c in text if c.isdigit())
+
+
+def iso_date(date_text):
+    """'dd.mm.yyyy' -> 'yyyy-mm-dd' (tarih aralığı sorguları indeksten okunabilsin diye)"""
+    try:
+        return datetime.strptime(date_text.strip(), '%d.%m.%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return ''
+
+
+def _prefix_range(column, prefix):
+    """column LIKE 'prefix%' yerine indeks kullanan aralık koşulu"""
+    return f"({column} >= ? AND {column} < ?)", [prefix, prefix + '\U0010ffff']
+
+
+class QuoteArchive:
+    """SQLite teklif arşivi; tek bağlantı, açıldığı thread'de kullanılır"""
+
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, quote, xlsx_path=None):
+        """Teklifi arşive yaz, yeni kaydın id'sini döndür"""
+        date = quote.date or datetime.now().strftime('%d.%m.%Y')
+        _, _, _, total_with_vat = quote.totals()
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO quotes (customer_name, name_key, customer_tc, customer_phone, phone_key,"
+                " customer_address, date, date_iso, saved_at, xlsx_path, subtotal, total_with_vat)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (quote.customer_name, search_key(quote.customer_name), quote.customer_tc.strip(),
+                 quote.customer_phone, digits_of(quote.customer_phone), quote.customer_address,
+                 date, iso_date(date), datetime.now().isoformat(timespec='seconds'),
+                 xlsx_path, quote.subtotal, total_with_vat))
+            quote_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO materials VALUES (?, ?, ?, ?, ?, ?)",
+                [(quote_id, pos, m.name, m.unit, m.qty, m.unit_price)
+                 for pos, m in enumerate(quote.materials)])
+            self.conn.executemany(
+                "INSERT INTO payments VALUES (?, ?, ?, ?, ?, ?)",
+                [(quote_id, pos, p.date, p.total, p.received, p.remaining)
+                 for pos, p in enumerate(quote.payments)])
+        return quote_id
+
+    def search(self, text='', date_from=None, date_to=None, limit=200):
+        """Metin rakamsa T.C./telefon önekine, değilse müşteri adı önekine göre ara.
+        date_from / date_to: 'dd.mm.yyyy' (dahil). En yeni teklifler önce gelir."""
+        where, params = [], []
+        text = text.strip()
+        if text:
+            digits = digits_of(text)
+            if digits and len(digits) == len(text.replace(' ', '')):
+                tc_cond, tc_params = _prefix_range('customer_tc', digits)
+                phone_cond, phone_params = _prefix_range('phone_key', digits)
+                where.append(f"({tc_cond} OR {phone_cond})")
+                params += tc_params + phone_params
+            else:
+                cond, cond_params = _prefix_range('name_key', search_key(text))
+                where.append(cond)
+                params += cond_params
+        if date_from and iso_date(date_from):
+            where.append("date_iso >= ?")
+            params.append(iso_date(date_from))
+        if date_to and iso_date(date_to):
+            where.append("date_iso <= ?")
+            params.append(iso_date(date_to))
+        sql = f"SELECT {', '.join(RESULT_COLUMNS)} FROM quotes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def load(self, quote_id):
+        """Arşivdeki teklifi Quote olarak döndür; bulunamazsa KeyError"""
+        row = self.conn.execute(
+            "SELECT customer_name, customer_tc, customer_phone, customer_address, date"
+            " FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        if row is None:
+            raise KeyError(quote_id)
+        materials = [MaterialLine(*r) for r in self.conn.execute(
+            "SELECT name, unit, qty, unit_price FROM materials WHERE quote_id = ? ORDER BY pos",
+            (quote_id,))]
+        payments = [PaymentLine(*r) for r in self.conn.execute(
+            "SELECT date, total, received, remaining FROM payments WHERE quote_id = ? ORDER BY pos",
+            (quote_id,))]
+        return Quote(*row, materials=materials, payments=payments)
+
+    def delete(self, quote_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM quotes WHERE id = ?", (quote_id,))
+
+
+class ArchiveWriter:
+    """save() kaydı arka plan thread'inde yazar ve Future döndürür (sonuç: kaydın id'si).
+    Bağlantı ilk kayıtta o thread'de açılır; sqlite3 bağlantısı thread'ler arasında paylaşılmaz."""
+
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = path
+        self._archive = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='teklif-arsiv')
+
+    def save(self, quote, xlsx_path=None):
+        return self._pool.submit(self._save, quote, xlsx_path)
+
+    def _save(self, quote, xlsx_path):
+        if self._archive is None:
+            self._archive = QuoteArchive(self.path)
+        return self._archive.save(quote, xlsx_path)
+
+    def close(self):
+        """Bekleyen kayıtları bitir ve bağlantıyı kapat"""
+        self._pool.submit(self._close)
+        self._pool.shutdown(wait=True)
+
+    def _close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_batch.py
+Arayüz açmadan toplu teklif üretimi (fiyat değişikliğinden sonra sezonun tekliflerini yenilemek için)
+
+    python teklif_app.py batch quotes.jsonl --out DIR --workers N
+
+quotes.jsonl: her satırda bir teklif (biçim için bkz. teklif_model.Quote.from_dict);
+isteğe bağlı "output" alanı dosya adını belirler (klasör kısmı yok sayılır, dosya her zaman --out altına yazılır);
+iki teklif aynı dosya adına çıkıyorsa üretime başlamadan hata verilir.
+XLSX dosyaları CPU çekirdeklerine dağıtılarak (ProcessPoolExecutor) üretilir.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from teklif_model import Quote, safe_name
+from teklif_firma import find_logo_path
+import teklif_excel
+
+
+def load_quote_defs(path):
+    """jsonl dosyasındaki teklif tanımlarını oku (boş satırlar atlanır).
+    Geçersiz JSON veya nesne olmayan satırda satır numarasıyla ValueError fırlatır."""
+    defs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                quote_def = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: geçersiz JSON ({e})")
+            if not isinstance(quote_def, dict):
+                raise ValueError(f"{path}:{line_no}: teklif bir JSON nesnesi olmalı "
+                                 f"({type(quote_def).__name__} verildi)")
+            defs.append(quote_def)
+    return defs
+
+
+def output_name(index, quote_def):
+    """Çıktı klasörüne göre dosya adı; "output" alanındaki klasör kısmı ('../', mutlak yol) atılır"""
+    name = quote_def.get('output')
+    if name:
+        name = os.path.basename(str(name).replace('\\', '/'))
+    if name and name not in ('.', '..'):
+        return name if name.lower().endswith('.xlsx') else name + '.xlsx'
+    customer = safe_name(quote_def.get('customer', {}).get('name', '')) or 'musteri'
+    return f"Teklif_{index:04d}_{customer}.xlsx"
+
+
+def output_names(quote_defs):
+    """Tüm dosya adları (sırayla); aynı ada (büyük/küçük harf farkı gözetmeden, Windows'taki gibi)
+    çıkan teklifler birbirinin üzerine yazacağından ValueError"""
+    names, first = [], {}
+    clashes = []
+    for index, quote_def in enumerate(quote_defs, start=1):
+        name = output_name(index, quote_def)
+        key = name.casefold()
+        if key in first:
+            clashes.append(f"{name} (teklif {first[key]} ve {index})")
+        else:
+            first[key] = index
+        names.append(name)
+    if clashes:
+        raise ValueError("aynı çıktı dosyası adı: " + ", ".join(clashes))
+    return names
+
+
+def render_one(index, quote_def, path, logo_path, engine=None):
+    """Tek teklifi path'e üret; (index, dosya yolu, süre, hata) döner. Süreç havuzunda çalışır."""
+    start = time.perf_counter()
+    try:
+        teklif_excel.create_excel(Quote.from_dict(quote_def), path, logo_path, engine)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return index, path, time.perf_counter() - start, error
+
+
+def run_batch(quote_defs, out_dir, workers=None, logo_path=None, engine=None):
+    """Teklifleri paralel üret; index sırasına göre sonuç listesi döner.
+    Dosya adları çakışıyorsa hiçbir dosya yazılmadan ValueError (bkz. output_names)"""
+    paths = [os.path.join(out_dir, name) for name in output_names(quote_defs)]
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = list(zip(range(1, len(quote_defs) + 1), quote_defs, paths))
+    results = []
+    if workers == 1:
+        for index, d, path in jobs:
+            results.append(render_one(index, d, path, logo_path, engine))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_one, index, d, path, logo_path, engine)
+                   for index, d, path in jobs]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+    results.sort(key=lambda r: r[0])
+    return results
+
+
+def print_summary(results, elapsed, stream=sys.stdout):
+    """Dosya başına süre özeti"""
+    ok = 0
+    for index, path, seconds, error in results:
+        if error:
+            print(f"[{index:4d}] HATA   {seconds * 1000:8.1f} ms  {path}  ({error})", file=stream)
+        else:
+            ok += 1
+            print(f"[{index:4d}] OK     {seconds * 1000:8.1f} ms  {path}", file=stream)
+    cpu_total = sum(r[2] for r in results)
+    print(f"{ok}/{len(results)} teklif üretildi, toplam {elapsed:.2f} s "
+          f"(dosya başı süre toplamı {cpu_total:.2f} s)", file=stream)
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"en az 1 olmalı: {text}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="teklif_app.py batch",
+                                     description="JSONL teklif tanımlarından toplu Excel üretimi")
+    parser.add_argument('quotes', help="teklif tanımları (.jsonl)")
+    parser.add_argument('--out', required=True, help="çıktı klasörü")
+    parser.add_argument('--workers', type=positive_int, default=None,
+                        help="paralel süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('--no-logo', action='store_true', help="logo ekleme")
+    parser.add_argument('--engine', default='auto',
+                        choices=['auto'] + sorted(teklif_excel.ENGINES),
+                        help="Excel motoru (varsayılan: auto)")
+    args = parser.parse_args(argv)
+
+    try:
+        quote_defs = load_quote_defs(args.quotes)
+        output_names(quote_defs)
+    except (OSError, ValueError) as e:
+        print(f"HATA: {e}", file=sys.stderr)
+        return 2
+    logo_path = None if args.no_logo else find_logo_path()
+    start = time.perf_counter()
+    results = run_batch(quote_defs, args.out, args.workers, logo_path, args.engine)
+    print_summary(results, time.perf_counter() - start)
+    return 1 if any(r[3] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_bench.py
+Performans ölçümü: toplamlar, tablo işlemleri ve çıktı motorları
+
+    python teklif_app.py bench                      # ölç ve kayıtlı temel değerlerle karşılaştır
+    python teklif_app.py bench --update-baseline    # temel değerleri güncelle
+    python teklif_app.py bench --sizes 10,1000 --tk # Tk tablosunu da ölç (ekran gerekir)
+
+- Sentetik teklifler 10 / 1k / 10k / 100k satırlıktır (sabit tohumlu rastgele veri)
+- model_* durumları arayüzü değil, TeklifApp'in kullandığı Quote yardımcılarını ölçer;
+  tablo (Treeview) ile birlikte gerçek arayüz yolları --tk ile ölçülür (tk_* durumları)
+- Temel değerler makineye özeldir: setup/bench_baseline.json depoya eklenmez, her makinede
+  --update-baseline ile oluşturulur
+- Her durum için süre (en iyi tekrar) ve tracemalloc tepe belleği ayrı çalıştırmalarda ölçülür
+- Temel değerden belirgin yavaşlama / bellek artışı REGRESYON olarak raporlanır, çıkış kodu 1 olur
+"""
+import argparse
+import gc
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from teklif_model import Quote, MaterialLine, PaymentLine, format_kurus
+
+BASELINE_FILE = Path(__file__).parent / "setup" / "bench_baseline.json"
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+# Yavaş motorlar büyük tekliflerde atlanır (tek ölçüm dakikalar sürmesin)
+EXPORT_MAX_LINES = {'standard': 10000, 'stream': 100000, 'direct': 100000, 'pdf': 10000}
+TOLERANCE = 0.25        # %25'ten fazla kötüleşme regresyondur
+MIN_SECONDS = 0.005     # bundan küçük süre farkları ölçüm gürültüsü sayılır
+MIN_PEAK_KB = 64
+
+_WORDS = ('Saten', 'Boya', 'Alçı', 'Sıva', 'Parke', 'Laminat', 'Seramik', 'Fayans', 'Kapı',
+          'Pencere', 'İşçilik', 'Söküm', 'Montaj', 'Derz', 'İzolasyon', 'Tavan', 'Duvar')
+
+
+def synthetic_quote(lines, seed=42):
+    rnd = random.Random(seed)
+    materials = [MaterialLine(' '.join(rnd.sample(_WORDS, 3)) + f" {i}",
+                              rnd.choice(('Adet', 'm²', 'mt', 'kg')),
+                              float(rnd.randint(1, 40)) / 2, rnd.randint(100, 500000))
+                 for i in range(lines)]
+    quote = Quote("Ahmet Yılmaz", "12345678901", "0532 000 00 00", "Şişli / İstanbul",
+                  "01.01.2026", materials)
+    total = quote.totals()[3]
+    quote.payments = [PaymentLine("01.01.2026", total, total // 2, total - total // 2),
+                      PaymentLine("01.02.2026", total - total // 2, total - total // 2, 0)]
+    return quote
+
+
+# ---------------- Durumlar ----------------
+# Her durum: (ad, hazırlık(quote) -> çağrılabilir). Hazırlık süreye dahil değildir.
+def _case_totals(quote):
+    # Arayüzdeki gibi: tek hücre düzenlemesi (artımlı ara toplam) ardından toplamlar
+    q = quote.snapshot()
+    line = q.materials[len(q.materials) // 2] if q.materials else None
+
+    def run():
+        if line is not None:
+            q.edit_material(line, 2, line.qty + 1)
+        q.totals()
+    return run
+
+
+def _case_add_rows(quote):
+    template = [(m.name, m.unit, m.qty, m.unit_price) for m in quote.materials]
+
+    def run():
+        q = Quote()
+        for args in template:
+            q.add_material(MaterialLine(*args))
+        q.totals()
+    return run
+
+
+def _case_edit(quote):
+    q = quote.snapshot()
+
+    def run():
+        for i, line in enumerate(q.materials):
+            q.edit_material(line, 3, format_kurus(line.unit_price + (i & 1)))
+            q.edit_material(line, 2, '2')
+        q.totals()
+    return run
+
+
+def _case_delete(quote):
+    q = quote.snapshot()
+    doomed = q.materials[::2]
+
+    def run():
+        q.remove_materials(doomed)
+        q.totals()
+    return run
+
+
+def _case_table_data(quote):
+    return lambda: [line.values() for line in quote.materials]
+
+
+def _case_export(engine):
+    def prepare(quote):
+        fd, path = tempfile.mkstemp(suffix='.pdf' if engine == 'pdf' else '.xlsx')
+        os.close(fd)
+
+        def run():
+            if engine == 'pdf':
+                import teklif_pdf
+                teklif_pdf.write_quote_pdf(quote, path)
+            else:
+                import teklif_excel
+                teklif_excel.create_excel(quote, path, engine=engine)
+        run.cleanup = lambda: os.remove(path)
+        return run
+    return prepare
+
+
+# Model düzeyi: Quote yardımcılarının süresi (Tk tablosu ve olay döngüsü dahil değil, bkz. tk_cases)
+MODEL_CASES = (
+    ('model_totals', _case_totals),
+    ('model_add_row', _case_add_rows),
+    ('model_finish_edit', _case_edit),
+    ('model_delete_row', _case_delete),
+    ('model_table_data', _case_table_data),
+)
+
+
+def tk_cases():
+    """Ekran varsa gizli (headless) bir TeklifApp üzerinde tablo işlemleri; her durumdan sonra kapatılır"""
+    import tkinter as tk
+    from teklif_app import TeklifApp
+
+    def prepare(quote):
+        root = tk.Tk()
+        root.withdraw()
+        app = TeklifApp(root, headless=True)
+        lines = quote.snapshot().materials
+
+        def run():
+            app.load_quote(Quote())
+            app.insert_materials(lines)
+            table = app.tables['material']
+            for top in range(0, len(lines), max(1, len(lines) // 50)):
+                table.scroll_to(top)
+            app.update_totals()
+            root.update()
+        run.cleanup = root.destroy
+        return run
+    return (('tk_insert_scroll', prepare),)
+
+
+# ---------------- Ölçüm ----------------
+def measure(prepare, quote, repeats):
+    """(en iyi süre s, tepe bellek KB)"""
+    best = None
+    for _ in range(repeats):
+        run = prepare(quote)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        getattr(run, 'cleanup', lambda: None)()
+        best = elapsed if best is None else min(best, elapsed)
+    run = prepare(quote)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    getattr(run, 'cleanup', lambda: None)()
+    return best, peak / 1024
+
+
+def run_suite(sizes, with_tk=False, stream=sys.stdout):
+    cases = list(MODEL_CASES)
+    cases += [(f"export_{engine}", _case_export(engine)) for engine in EXPORT_MAX_LINES]
+    if with_tk:
+        cases += list(tk_cases())
+    results = {}
+    for size in sizes:
+        quote = synthetic_quote(size)
+        repeats = 5 if size <= 1000 else (3 if size <= 10000 else 1)
+        for name, prepare in cases:
+            engine = name[len('export_'):] if name.startswith('export_') else None
+            if engine and size > EXPORT_MAX_LINES[engine]:
+                continue
+            key = f"{name}@{size}"
+            seconds, peak_kb = measure(prepare, quote, repeats)
+            results[key] = {'seconds': round(seconds, 6), 'peak_kb': round(peak_kb, 1)}
+            print(f"{key:<28} {seconds * 1000:10.2f} ms  {peak_kb:10.1f} KB", file=stream, flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE, stream=sys.stdout):
+    """Regresyon listesini döndür ve yazdır"""
+    regressions = []
+    for key, now in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for field, floor, unit in (('seconds', MIN_SECONDS, 's'), ('peak_kb', MIN_PEAK_KB, 'KB')):
+            old, new = base[field], now[field]
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(f"{key}: {field} {old:g} -> {new:g} {unit} (+{(new / old - 1) * 100:.0f}%)"
+                                   if old else f"{key}: {field} {old:g} -> {new:g} {unit}")
+    if regressions:
+        print("\n!!! REGRESYON !!!", file=stream)
+        for line in regressions:
+            print("  " + line, file=stream)
+    else:
+        print("\nTemel değerlere göre regresyon yok.", file=stream)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="teklif_app.py bench",
+                                     description="Toplam, tablo ve çıktı motoru performans ölçümü")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="satır sayıları (virgülle)")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help="temel değer dosyası")
+    parser.add_argument('--update-baseline', action='store_true', help="sonuçları temel değer olarak kaydet")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="izin verilen kötüleşme oranı")
+    parser.add_argument('--tk', action='store_true', help="Tk tablo işlemlerini de ölç (ekran gerekir)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run_suite(sizes, args.tk)
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nTemel değerler kaydedildi: {baseline_path}")
+        return 0
+    if not baseline:
+        print("\nTemel değer dosyası yok; --update-baseline ile oluşturun.")
+        return 0
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
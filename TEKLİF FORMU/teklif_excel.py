@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_excel.py
+Teklif modelinden (teklif_model.Quote) A4 Excel çıktısı üretir.
+Tk'ya bağımlı değildir; arayüz, toplu üretim vb. aynı fonksiyonu kullanır.
+"""
+import json
+import os
+import tempfile
+import shutil
+
+# Excel imports (must be installed)
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.exceptions import WorkbookAlreadySaved
+from openpyxl.worksheet.page import PageMargins
+from openpyxl.worksheet.pagebreak import Break, RowBreak
+
+# Image embedding in Excel (logo bytes are prepared by teklif_firma, Pillow optional)
+from openpyxl.drawing.image import Image as XLImage
+
+from teklif_model import kurus_to_float, quote_date
+from teklif_olcum import phase
+from teklif_firma import LOGO_SIZE, PROGRESS_EVERY, Cancelled, load_company, header_lines, logo_png
+from teklif_yerlesim import COLUMN_WIDTHS, HEADER_SIZES, MARGINS, layout_sheet
+import teklif_xlsx
+
+
+# ---------------- Named style registry ----------------
+# Tablo hücreleri tek atamayla (cell.style = ...) biçimlenir. Stil parçaları
+# süreç başına bir kez kurulur; her çalışma kitabına sadece kayıt edilir
+# (openpyxl NamedStyle nesnelerini tek bir kitaba bağladığı için).
+STYLE_HEADER = 'teklif_header'            # tablo başlığı
+STYLE_TEXT = 'teklif_text'                # açıklama (alt satıra geçen metin)
+STYLE_CENTER = 'teklif_center'            # NO, birim, tarih
+STYLE_NUMBER = 'teklif_number'            # miktar
+STYLE_MONEY = 'teklif_money'              # birim fiyat / toplam
+STYLE_PAY_MONEY = 'teklif_pay_money'      # ödeme planı tutarları
+STYLE_TOTAL_LABEL = 'teklif_total_label'  # toplam etiketi
+STYLE_TOTAL_VALUE = 'teklif_total_value'  # toplam tutarı
+STYLE_EMPTY = 'teklif_empty'              # boş tablo satırı
+
+_style_specs = None
+
+
+def named_style_specs():
+    """Stil adı -> NamedStyle parametreleri (süreç başına bir kez kurulur)"""
+    global _style_specs
+    if _style_specs is None:
+        thin = Side(border_style="medium", color="000000")
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        center = Alignment(horizontal="center", vertical="center")
+        right = Alignment(horizontal="right", vertical="center")
+        _style_specs = {
+            STYLE_HEADER: dict(font=Font(bold=True, color="FFFFFF"),
+                               fill=PatternFill("solid", fgColor="2F4F4F"),
+                               border=border, alignment=center),
+            STYLE_TEXT: dict(border=border,
+                             alignment=Alignment(horizontal="left", vertical="top", wrap_text=True)),
+            STYLE_CENTER: dict(border=border, alignment=center),
+            STYLE_NUMBER: dict(border=border, alignment=center, number_format='0.00'),
+            STYLE_MONEY: dict(border=border, alignment=right, number_format='#,##0.00'),
+            STYLE_PAY_MONEY: dict(border=border, number_format='#,##0.00'),
+            STYLE_TOTAL_LABEL: dict(font=Font(bold=True), border=border,
+                                    fill=PatternFill("solid", fgColor="ECF0F1")),
+            STYLE_TOTAL_VALUE: dict(border=border, alignment=right, number_format='#,##0.00',
+                                    fill=PatternFill("solid", fgColor="FFFFFF")),
+            STYLE_EMPTY: dict(border=border),
+        }
+    return _style_specs
+
+
+def add_named_styles(wb):
+    """Kayıttaki stilleri çalışma kitabına ekle"""
+    for name, spec in named_style_specs().items():
+        spec = dict(spec)
+        spec.setdefault('font', DEFAULT_FONT)
+        wb.add_named_style(NamedStyle(name=name, **spec))
+
+
+# ---------------- Üst bölüm şablonu ----------------
+class HeaderTemplate:
+    """
+    Her teklifte aynı olan üst bölüm: başlık, firma satırları, birleşik hücreler,
+    sütun genişlikleri. Firma bilgilerine göre bir kez kurulur (bkz. header_template);
+    her çıktıda sadece hücrelere kopyalanır.
+    """
+    __slots__ = ('rows', 'merges', 'column_widths', 'next_row')
+
+    def __init__(self, company):
+        center = Alignment(horizontal="center", vertical="center")
+        left = Alignment(horizontal="left", vertical="center")
+        kinds = {
+            'title': (Font(bold=True, size=HEADER_SIZES['title']), center),
+            'info': (Font(size=HEADER_SIZES['info']), left),
+            'quote_title': (Font(bold=True, size=HEADER_SIZES['quote_title']), center),
+        }
+        # (satır, değer, font, hizalama) - her satır A:F boyunca birleşik
+        self.rows = tuple((row, text) + kinds[kind] for row, text, kind in header_lines(company))
+        self.merges = tuple(f"A{row}:F{row}" for row, *_ in self.rows)
+        self.column_widths = tuple(zip('ABCDEF', COLUMN_WIDTHS))
+        self.next_row = 7  # müşteri kutusunun başladığı satır
+
+    def apply(self, ws):
+        """Normal (bellekteki) çalışma sayfasına uygula; sonraki satır numarasını döner"""
+        for col, width in self.column_widths:
+            ws.column_dimensions[col].width = width
+        for merge, (row, value, font, alignment) in zip(self.merges, self.rows):
+            ws.merge_cells(merge)
+            c = ws.cell(row=row, column=1, value=value)
+            c.font = font
+            c.alignment = alignment
+        return self.next_row
+
+
+_header_cache = {}
+
+
+def header_template(company=None):
+    """Firma bilgilerine göre anahtarlanmış üst bölüm şablonu"""
+    company = company or load_company()
+    key = json.dumps(company, sort_keys=True, ensure_ascii=False)
+    tpl = _header_cache.get(key)
+    if tpl is None:
+        tpl = _header_cache[key] = HeaderTemplate(company)
+    return tpl
+
+
+# ---------------- Logo ----------------
+class CachedLogo(XLImage):
+    """Önceden kodlanmış PNG baytlarını doğrudan yazan openpyxl Image"""
+
+    def __init__(self, data):
+        self.ref = None
+        self._png = data
+        self.width, self.height = LOGO_SIZE
+        self.format = "png"
+
+    def _data(self):
+        return self._png
+
+
+def add_logo(ws, logo_path):
+    """Önbellekteki logoyu sağ üst köşeye ekle"""
+    with phase('logo'):
+        data = logo_png(logo_path)
+        if data is not None:
+            ws.add_image(CachedLogo(data), "F1")
+
+
+def quote_layout(quote, company=None):
+    """Satır yükseklikleri, A4 sayfa sonları ve tekrarlanan tablo başlıkları (bkz. teklif_yerlesim)"""
+    with phase('layout'):
+        return layout_sheet(quote, header_lines(company or load_company()))
+
+
+def apply_layout(ws, layout):
+    """quote_layout sonucunu sayfaya uygula; write_only sayfada satırlar yazılmadan önce çağrılmalıdır"""
+    for row, height in layout.heights.items():
+        ws.row_dimensions[row].height = height
+    # RowBreak.append her seferinde listeyi kopyalar; tek atamayla kur
+    ws.row_breaks = RowBreak(brk=[Break(id=row) for row in layout.breaks])
+    ws.page_margins = PageMargins(**MARGINS)
+    ws.page_setup.orientation = 'portrait'
+    ws.page_setup.paperSize = '9'  # A4
+    ws.page_setup.scale = layout.scale
+
+
+def build_workbook(quote, logo_path=None, company=None, progress=None):
+    """
+    Creates a styled Excel workbook resembling the provided layout with:
+    - Ürün/İşçilik Adı ve Müşteri Adres hücrelerinde wrap text; satır yükseklikleri ve
+      A4 sayfa sonları teklif_yerlesim'de ölçülür
+    - Malzeme ve ödeme planı tabloları
+    - KDV ve toplam hesaplamaları
+    Üst bölüm (firma bilgileri) önbellekteki HeaderTemplate'ten kopyalanır.
+    progress: isteğe bağlı progress(yapılan, toplam) (bkz. teklif_firma.PROGRESS_EVERY)
+    """
+    wb = Workbook()
+    add_named_styles(wb)
+    ws = wb.active
+    ws.title = "Teklif"
+    layout = quote_layout(quote, company)
+
+    # Styles
+    alt_fill = PatternFill("solid", fgColor="ECF0F1")  # light grey
+
+    # Başlık, firma bilgileri, teklif başlığı ve sütun genişlikleri
+    r = header_template(company).apply(ws)
+
+    # Logo
+    add_logo(ws, logo_path)
+
+    # Müşteri kutusu (gri background)
+    box_rows = [
+        ("MÜŞTERİ ADI :", quote.customer_name),
+        ("T.C. :", quote.customer_tc),
+        ("TEL :", quote.customer_phone),
+        ("ADRES :", quote.customer_address),
+        ("TARİH :", quote_date(quote))
+    ]
+
+    # Label sütunu = 2 (B), Value = 3..6 (C-F)
+    for label, val in box_rows:
+        ws.cell(row=r, column=2, value=label).font = Font(bold=True)  # label
+        ws.cell(row=r, column=3, value=val)                            # value
+        ws.merge_cells(start_row=r, start_column=3, end_row=r, end_column=6)
+        ws.cell(row=r, column=3).alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
+        ws.cell(row=r, column=4).fill = PatternFill("solid", fgColor="FFFFFF")
+        ws.cell(row=r, column=3).fill = alt_fill
+        r += 1
+
+    r += 1
+
+    # Malzeme tablosu başlığı
+    headers = ['NO', 'AÇIKLAMA', 'BİRİM', 'MİKTAR', 'BİRİM FİYATI', 'TOPLAM FİYATI']
+    for c, h in enumerate(headers, start=1):
+        ws.cell(row=r, column=c, value=h).style = STYLE_HEADER
+
+    r += 1
+    # Malzeme tablosu; sayfa başlarında (layout.repeat_rows) başlık tekrar yazılır
+    items = quote.materials
+    repeat = iter(layout.repeat_rows)
+    next_repeat = next(repeat, None)
+    if not items:
+        for i in range(3):
+            for c in range(1,7):
+                ws.cell(row=r, column=c, value='').style = STYLE_EMPTY
+            r += 1
+    else:
+        for idx, line in enumerate(items, start=1):
+            if r == next_repeat:
+                for c, h in enumerate(headers, start=1):
+                    ws.cell(row=r, column=c, value=h).style = STYLE_HEADER
+                r += 1
+                next_repeat = next(repeat, None)
+            ws.cell(row=r, column=1, value=idx).style = STYLE_CENTER
+            # Açıklama alt satıra geçsin
+            ws.cell(row=r, column=2, value=line.name).style = STYLE_TEXT
+            ws.cell(row=r, column=3, value=line.unit).style = STYLE_CENTER
+            ws.cell(row=r, column=4, value=line.qty).style = STYLE_NUMBER
+            ws.cell(row=r, column=5, value=kurus_to_float(line.unit_price)).style = STYLE_MONEY
+            ws.cell(row=r, column=6, value=kurus_to_float(line.total)).style = STYLE_MONEY
+            r += 1
+            if progress is not None and idx % PROGRESS_EVERY == 0:
+                progress(idx, len(items))
+    if progress is not None:
+        progress(len(items), len(items))
+
+    # Malzeme toplamları
+    m_sub, m_without, m_vat, m_with = quote.totals()
+    totals = [("GENEL Toplam:", m_sub), ("KDV'siz Toplam:", m_without),
+              ("KDV (%20) Tutarı:", m_vat), ("KDV'li Toplam:", m_with)]
+    for label, val in totals:
+        ws.cell(row=r, column=5, value=label).style = STYLE_TOTAL_LABEL
+        ws.cell(row=r, column=6, value=kurus_to_float(val)).style = STYLE_TOTAL_VALUE
+        r += 1
+
+    r += 1
+
+    # Ödeme planı
+    ws.cell(row=r, column=1, value="ÖDEME PLANI").font = Font(bold=True)
+    r += 1
+    pay_headers = ['NO', 'TARİH', 'TOPLAM', 'ALINACAK TUTAR', 'KALACAK TUTAR','AÇIKLAMALAR']
+    for c, h in enumerate(pay_headers, start=1):
+        ws.cell(row=r, column=c, value=h).style = STYLE_HEADER
+    r += 1
+
+    payments = quote.payments
+    if not payments:
+        for i in range(3):
+            for c in range(1,6):
+                ws.cell(row=r, column=c, value='').style = STYLE_EMPTY
+            r += 1
+        # İmza satırı
+        ws.cell(row=r+5, column=1, value="İMZA : ________")
+        ws.cell(row=r+5, column=5, value="İMZA : ________")
+        r += 2  # biraz boşluk bırak
+    else:
+        for idx, line in enumerate(payments, start=1):
+            ws.cell(row=r, column=1, value=idx).style = STYLE_CENTER
+            ws.cell(row=r, column=2, value=line.date).style = STYLE_CENTER
+            ws.cell(row=r, column=3, value=kurus_to_float(line.total)).style = STYLE_PAY_MONEY
+            ws.cell(row=r, column=4, value=kurus_to_float(line.received)).style = STYLE_PAY_MONEY
+            ws.cell(row=r, column=5, value=kurus_to_float(line.remaining)).style = STYLE_PAY_MONEY
+            r += 1
+        sig_start_row = r+2
+
+        # Başlıklar
+        ws.cell(row=sig_start_row, column=1, value="MÜŞTERİ").font = Font(bold=True)
+        ws.cell(row=sig_start_row, column=5, value="FİRMA YETKİLİSİ").font = Font(bold=True)
+        r += 1
+
+        # Tarih satırı
+        ws.cell(row=r+3, column=1, value="TARİH : ________")
+        ws.cell(row=r+3, column=5, value="TARİH : ________")
+        r += 1
+
+        # İmza satırı
+        ws.cell(row=r+5, column=1, value="İMZA : ________")
+        ws.cell(row=r+5, column=5, value="İMZA : ________")
+        r += 2  # biraz boşluk bırak
+    apply_layout(ws, layout)
+    return wb
+
+
+def build_workbook_streaming(quote, logo_path=None, company=None, progress=None):
+    """
+    build_workbook ile aynı görünümü openpyxl write_only modunda üretir.
+    Satırlar sırayla akıtılır; hücreler kaydetmeye kadar bellekte tutulmaz,
+    binlerce satırlık tekliflerde bellek kullanımı sabit kalır.
+    """
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)
+    add_named_styles(wb)
+    ws = wb.create_sheet("Teklif")
+
+    # Styles (tablo hücreleri named style kullanır)
+    bold = Font(bold=True)
+    top_wrap = Alignment(horizontal="left", vertical="top", wrap_text=True)
+    alt_fill = PatternFill("solid", fgColor="ECF0F1")  # light grey
+    white_fill = PatternFill("solid", fgColor="FFFFFF")
+
+    def cell(value, style=None, font=None, fill=None, alignment=None):
+        c = WriteOnlyCell(ws, value=value)
+        if style is not None:
+            c.style = style
+        if font is not None:
+            c.font = font
+        if fill is not None:
+            c.fill = fill
+        if alignment is not None:
+            c.alignment = alignment
+        return c
+
+    if progress is not None:
+        report = progress
+
+        def progress(done, total):
+            try:
+                report(done, total)
+            except Cancelled:
+                # Yarım kalan sayfanın geçici dosyasını kapatıp sil (kaydetme hiç gelmeyecek)
+                ws.close()
+                ws._writer.cleanup()
+                raise
+
+    header = header_template(company)
+    # Sütun genişlikleri satırlardan önce yazılmalı
+    for col, width in header.column_widths:
+        ws.column_dimensions[col].width = width
+
+    # Satır yükseklikleri akıtılan satırlara yazılırken okunur
+    layout = quote_layout(quote, company)
+    apply_layout(ws, layout)
+
+    # Logo
+    add_logo(ws, logo_path)
+
+    r = 0  # son yazılan satır
+
+    def emit(row, cells=()):
+        """row numaralı satırı yaz; aradaki satırlar boş geçilir"""
+        nonlocal r
+        while r < row - 1:
+            ws.append([])
+            r += 1
+        ws.append(cells)
+        r += 1
+
+    def merge(row, first, last):
+        ws.merged_cells.add(f"{get_column_letter(first)}{row}:{get_column_letter(last)}{row}")
+
+    # Başlık, firma bilgileri ve teklif başlığı (önbellekteki şablondan)
+    for merged, (row, value, font, alignment) in zip(header.merges, header.rows):
+        emit(row, [cell(value, font=font, alignment=alignment)])
+        ws.merged_cells.add(merged)
+    r = header.next_row - 1
+
+    # Müşteri kutusu
+    box_rows = [
+        ("MÜŞTERİ ADI :", quote.customer_name),
+        ("T.C. :", quote.customer_tc),
+        ("TEL :", quote.customer_phone),
+        ("ADRES :", quote.customer_address),
+        ("TARİH :", quote_date(quote))
+    ]
+    for label, val in box_rows:
+        emit(r + 1, [None, cell(label, font=bold), cell(val, fill=alt_fill, alignment=top_wrap),
+                     cell(None, fill=white_fill)])
+        merge(r, 3, 6)
+
+    # Malzeme tablosu
+    headers = ['NO', 'AÇIKLAMA', 'BİRİM', 'MİKTAR', 'BİRİM FİYATI', 'TOPLAM FİYATI']
+    emit(r + 2, [cell(h, STYLE_HEADER) for h in headers])
+    repeat = iter(layout.repeat_rows)
+    next_repeat = next(repeat, None)
+    if not quote.materials:
+        for i in range(3):
+            emit(r + 1, [cell('', STYLE_EMPTY) for c in range(6)])
+    else:
+        for idx, line in enumerate(quote.materials, start=1):
+            if r + 1 == next_repeat:
+                emit(r + 1, [cell(h, STYLE_HEADER) for h in headers])
+                next_repeat = next(repeat, None)
+            emit(r + 1, [
+                cell(idx, STYLE_CENTER),
+                cell(line.name, STYLE_TEXT),
+                cell(line.unit, STYLE_CENTER),
+                cell(line.qty, STYLE_NUMBER),
+                cell(kurus_to_float(line.unit_price), STYLE_MONEY),
+                cell(kurus_to_float(line.total), STYLE_MONEY),
+            ])
+            if progress is not None and idx % PROGRESS_EVERY == 0:
+                progress(idx, len(quote.materials))
+    if progress is not None:
+        progress(len(quote.materials), len(quote.materials))
+
+    # Malzeme toplamları
+    m_sub, m_without, m_vat, m_with = quote.totals()
+    totals = [("GENEL Toplam:", m_sub), ("KDV'siz Toplam:", m_without),
+              ("KDV (%20) Tutarı:", m_vat), ("KDV'li Toplam:", m_with)]
+    for label, val in totals:
+        emit(r + 1, [None, None, None, None,
+                     cell(label, STYLE_TOTAL_LABEL),
+                     cell(kurus_to_float(val), STYLE_TOTAL_VALUE)])
+
+    # Ödeme planı
+    emit(r + 2, [cell("ÖDEME PLANI", font=bold)])
+    pay_headers = ['NO', 'TARİH', 'TOPLAM', 'ALINACAK TUTAR', 'KALACAK TUTAR', 'AÇIKLAMALAR']
+    emit(r + 1, [cell(h, STYLE_HEADER) for h in pay_headers])
+    if not quote.payments:
+        for i in range(3):
+            emit(r + 1, [cell('', STYLE_EMPTY) for c in range(5)])
+        # İmza satırı
+        emit(r + 6, [cell("İMZA : ________"), None, None, None, cell("İMZA : ________")])
+    else:
+        for idx, line in enumerate(quote.payments, start=1):
+            emit(r + 1, [
+                cell(idx, STYLE_CENTER),
+                cell(line.date, STYLE_CENTER),
+                cell(kurus_to_float(line.total), STYLE_PAY_MONEY),
+                cell(kurus_to_float(line.received), STYLE_PAY_MONEY),
+                cell(kurus_to_float(line.remaining), STYLE_PAY_MONEY),
+            ])
+        last = r
+        # Başlıklar, tarih ve imza satırları
+        emit(last + 3, [cell("MÜŞTERİ", font=bold), None, None, None,
+                        cell("FİRMA YETKİLİSİ", font=bold)])
+        emit(last + 5, [cell("TARİH : ________"), None, None, None, cell("TARİH : ________")])
+        emit(last + 8, [cell("İMZA : ________"), None, None, None, cell("İMZA : ________")])
+    return wb
+
+
+def _openpyxl_writer(build):
+    def write(quote, output_path, logo_path=None, company=None, progress=None):
+        with phase('build'):
+            wb = build(quote, logo_path, company, progress)
+        with phase('save'):
+            wb.save(output_path)
+    return write
+
+
+# Excel motorları: "standard" tüm çalışma kitabını bellekte kurar,
+# "stream" write_only modunda satırları akıtır (çok büyük teklifler için),
+# "direct" openpyxl'i hiç kullanmadan XML parçalarını zip'e yazar (toplu üretim, önizleme).
+ENGINES = {
+    'standard': _openpyxl_writer(build_workbook),
+    'stream': _openpyxl_writer(build_workbook_streaming),
+    'direct': teklif_xlsx.write_quote_xlsx,
+}
+# "auto" seçildiğinde bu satır sayısının üstünde stream motoru kullanılır
+STREAM_THRESHOLD = 2000
+
+
+def resolve_engine(quote, engine=None):
+    if engine in (None, 'auto'):
+        return 'stream' if len(quote.materials) > STREAM_THRESHOLD else 'standard'
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen Excel motoru: {engine}")
+    return engine
+
+
+def create_excel(quote, output_path, logo_path=None, engine=None, company=None, progress=None):
+    """Teklifi output_path'e XLSX olarak kaydet (engine: standard / stream / direct / auto).
+    progress(yapılan, toplam) malzeme satırlarında çağrılır; Cancelled fırlatırsa üretim durur."""
+    engine = resolve_engine(quote, engine)
+    write = ENGINES[engine]
+    # Kaydet
+    try:
+        with phase(f'write_{engine}'):
+            write(quote, output_path, logo_path, company, progress)
+    except WorkbookAlreadySaved:
+        # write_only kitaplar bir kez kaydedilebilir; geçici dosyaya yeniden üretip kopyala
+        with phase('fallback_copy'):
+            fd, tmp = tempfile.mkstemp(suffix='.xlsx')
+            os.close(fd)
+            try:
+                write(quote, tmp, logo_path, company, progress)
+                shutil.copy(tmp, output_path)
+            finally:
+                os.remove(tmp)
+    return output_path
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_export.py
+Excel / PDF çıktısını arayüzü dondurmadan arka planda (worker thread) üretir
+- ExportJob teklifin bağımsız bir kopyasıyla (Quote.snapshot) çalışır; kullanıcı düzenlemeye devam edebilir
+- Dosya önce yerel geçici klasörde üretilir, sonra hedefe parça parça kopyalanır
+  (OneDrive / ağ klasörlerinde yavaş kayıt sırasında ilerleme gösterilebilir ve iptal edilebilir)
+- Motorlar malzeme satırlarında progress(yapılan, toplam) geri çağrısını çağırır; ilerleme satır
+  sayısına göre gösterilir ve iptal üretimin ortasında da (bir sonraki satır grubunda) etkili olur
+- Durum alanları thread güvenlidir; Tk tarafı root.after ile progress() / done okur
+"""
+import os
+import tempfile
+import threading
+import time
+
+from teklif_firma import Cancelled
+from teklif_olcum import Trace, maybe_profile, phase
+
+COPY_CHUNK = 1 << 20  # hedefe kopyalama parça boyutu (1 MB)
+
+
+class ExportCancelled(Cancelled):
+    pass
+
+
+class ExportJob:
+    """Tek bir dışa aktarma işi. output_path None ise geçici dosya sonuçtur (önizleme).
+    fmt: 'xlsx' (teklif_excel, engine ile) veya 'pdf' (teklif_pdf)"""
+
+    def __init__(self, quote, output_path=None, logo_path=None, engine=None, fmt='xlsx'):
+        self.quote = quote
+        self.output_path = output_path
+        self.logo_path = logo_path
+        self.engine = engine
+        self.fmt = fmt
+        # Aşama süreleri (teklif_olcum); Tk tarafı açma/arşiv aşamalarını ekleyip finish() çağırır
+        self.trace = Trace('export', fmt=fmt, engine=engine, lines=len(quote.materials))
+        self.profile_path = None
+        self.result_path = None
+        self.error = None
+        self.cancelled = False
+        self.elapsed = 0.0
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._stage = "Bekliyor"
+        self._fraction = None
+        self._thread = None
+
+    # ------------- Tk tarafı -------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="teklif-export", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """İptal iste; iş bir sonraki kontrol noktasında durur"""
+        self._cancel.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def progress(self):
+        """(aşama metni, 0..1 arası oran veya belirsizse None)"""
+        with self._lock:
+            return self._stage, self._fraction
+
+    # ------------- worker -------------
+    def _set(self, stage, fraction=None):
+        with self._lock:
+            self._stage = stage
+            self._fraction = fraction
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+
+    def _rows_done(self, done, total):
+        """Motorların satır ilerlemesi; iptal istendiyse motoru ExportCancelled ile durdurur"""
+        self._check()
+        name = "PDF" if self.fmt == 'pdf' else "Excel"
+        if done < total:
+            self._set(f"{name} hazırlanıyor ({done}/{total} satır)", done / total)
+        else:
+            self._set(f"{name} dosyası yazılıyor")
+
+    def _run(self):
+        start = time.perf_counter()
+        tmp = None
+        try:
+            with self.trace.activate(), maybe_profile() as self.profile_path:
+                tmp = self._render()
+                self._check()
+                if self.output_path is None:
+                    self.result_path, tmp = tmp, None
+                else:
+                    with phase('copy'):
+                        self._copy(tmp, self.output_path)
+                    self.result_path = self.output_path
+            self._set("Tamamlandı", 1.0)
+        except ExportCancelled:
+            self.cancelled = True
+            self._set("İptal edildi")
+        except Exception as e:
+            self.error = e
+            self._set("Hata")
+        finally:
+            if tmp:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            self.elapsed = time.perf_counter() - start
+            self._done.set()
+
+    def _render(self):
+        """Yerel geçici dosyaya üret, yolunu döndür"""
+        fd, tmp = tempfile.mkstemp(suffix='.' + self.fmt)
+        os.close(fd)
+        try:
+            if self.fmt == 'pdf':
+                self._set("PDF hazırlanıyor")
+                with phase('import'):
+                    import teklif_pdf
+                self._check()
+                teklif_pdf.write_quote_pdf(self.quote, tmp, self.logo_path, progress=self._rows_done)
+            else:
+                self._set("Excel hazırlanıyor")
+                with phase('import'):
+                    import teklif_excel
+                self._check()
+                teklif_excel.create_excel(self.quote, tmp, self.logo_path, self.engine,
+                                          progress=self._rows_done)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return tmp
+
+    def _copy(self, src, dst):
+        """Hedefe .part uzantılı dosyaya yaz, bitince yerine taşı (yarım xlsx görünmez)"""
+        total = os.path.getsize(src) or 1
+        part = dst + '.part'
+        copied = 0
+        try:
+            with open(src, 'rb') as fin, open(part, 'wb') as fout:
+                while True:
+                    self._check()
+                    chunk = fin.read(COPY_CHUNK)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+                    copied += len(chunk)
+                    self._set("Kaydediliyor", copied / total)
+            os.replace(part, dst)
+        except BaseException:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
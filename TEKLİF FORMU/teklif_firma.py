@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_firma.py
+Tüm çıktı motorlarında ortak olan statik içerik: firma bilgileri (setup/firma.json)
+ve logo. openpyxl'e bağımlı değildir.
+"""
+from io import BytesIO
+import importlib.util
+import json
+import os
+
+# Optional: logo resizing (requires Pillow). Pillow ilk logo hazırlanırken yüklenir.
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+
+# ---------------- Firma bilgileri ----------------
+COMPANY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "setup", "firma.json")
+DEFAULT_COMPANY = {
+    "title": "EF YAPI DEKORASYON",
+    "firma": "EF Yapı",
+    "owner": "Fatih AYDIN",
+    "phone": "0537 517 41 19",
+    "address": "İbnisina Mahallesi Serkan Sokak No:5/1",
+    "email": "efyapi0@gmail.com",
+    "quote_title": "FİYAT TEKLİFİ",
+}
+
+_company_cache = {}  # dosya yolu -> (mtime, firma bilgileri)
+
+
+def load_company(path=COMPANY_FILE):
+    """Firma bilgilerini setup/firma.json'dan oku (dosya değişmedikçe önbellekten)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return DEFAULT_COMPANY
+    cached = _company_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    company = dict(DEFAULT_COMPANY)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            company.update(json.load(f))
+    except Exception:
+        pass
+    _company_cache[path] = (mtime, company)
+    return company
+
+
+def header_lines(company):
+    """Üst bölüm satırları: (satır no, metin, tür) - tür: title / info / quote_title"""
+    return (
+        (1, company['title'], 'title'),
+        (2, f"Firma: {company['firma']}     ", 'info'),
+        (3, f"Firma Sahibi: {company['owner']}      Tel: {company['phone']}  ", 'info'),
+        (4, f"Adres: {company['address']}    E-mail: {company['email']}      ", 'info'),
+        (6, company['quote_title'], 'quote_title'),
+    )
+
+
+# ---------------- İlerleme ----------------
+# Motorlar isteğe bağlı progress(yapılan, toplam) geri çağrısını malzeme satırlarında bu kadar
+# satırda bir ve tablo bitince çağırır; geri çağrı Cancelled fırlatarak üretimi durdurabilir.
+PROGRESS_EVERY = 500
+
+
+class Cancelled(Exception):
+    """progress geri çağrısından gelen iptal; motorlar yakalamadan yukarı iletir"""
+
+
+# ---------------- Logo ----------------
+def find_logo_path(app_dir=None):
+    """Uygulama klasöründe ef.png / logo.png ara"""
+    app_dir = app_dir or os.path.dirname(os.path.abspath(__file__))
+    for lf in ("ef.png", "logo.png"):
+        p = os.path.join(app_dir, lf)
+        if os.path.exists(p):
+            return p
+    return None
+
+
+LOGO_SIZE = (120, 120)  # Excel'de gösterilen boyut (px), yaklaşık 2 cm
+
+_logo_cache = {}  # dosya yolu -> (mtime, PNG baytları)
+
+
+def logo_png(logo_path):
+    """
+    Logoyu gösterim boyutuna küçültüp PNG olarak bir kez kodla.
+    Dosyanın mtime'ı değişince yeniden üretilir; Pillow yoksa None döner.
+    """
+    if not logo_path or not PIL_AVAILABLE:
+        return None
+    try:
+        mtime = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+    cached = _logo_cache.get(logo_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        from PIL import Image as PILImage
+        with PILImage.open(logo_path) as im:
+            if im.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                im = im.convert('RGBA')
+            im = im.resize(LOGO_SIZE, PILImage.LANCZOS)
+            buf = BytesIO()
+            im.save(buf, format='PNG', optimize=True)
+    except Exception:
+        return None
+    data = buf.getvalue()
+    _logo_cache[logo_path] = (mtime, data)
+    return data
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_fiyat.py
+Tedarikçi fiyat listelerinin (XLSX / CSV) yerel fiyat veritabanına aktarımı
+
+    python teklif_app.py fiyat-import --supplier "Tedarikçi" liste1.xlsx liste2.csv
+
+- Dosyalar satır satır okunur (openpyxl read_only / iter_rows, csv.reader); liste belleğe alınmaz
+- Satırlar BATCH_SIZE'lık gruplar halinde tek transaction'da upsert edilir
+- İçeriği değişmemiş dosya (sha256) tekrar okunmaz
+- Sütun eşlemeleri setup/fiyat_eslemeleri.json'da tedarikçi adına göre tutulur; yoksa başlıklardan tahmin edilir
+- Ondalık ayırıcı eşlemede "decimal" ile verilebilir; verilmezse her hücrede yazımdan çıkarılır ve
+  belirsiz fiyatlar ('1.250') aktarılmaz, hatalı satır olarak sayılır
+- PriceDB.complete() malzeme düzenleyicisindeki öneri listesini besler
+"""
+import argparse
+import csv
+from datetime import datetime
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+from teklif_model import AUTO, format_kurus, parse_kurus, search_key
+
+PRICE_DB_FILE = Path(__file__).parent / "setup" / "fiyatlar.db"
+MAPPING_FILE = Path(__file__).parent / "setup" / "fiyat_eslemeleri.json"
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    supplier TEXT NOT NULL,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    unit_price INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (supplier, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_prices_name ON prices(name_key);
+CREATE TABLE IF NOT EXISTS imported_files (
+    sha256 TEXT NOT NULL,
+    supplier TEXT NOT NULL,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    imported_at TEXT NOT NULL,
+    PRIMARY KEY (sha256, supplier)
+);
+"""
+
+# Eşleme verilmezse başlık satırında aranan adlar (search_key ile karşılaştırılır)
+DEFAULT_HEADERS = {
+    'name': ('ürün adı', 'ürün', 'malzeme', 'açıklama', 'ad', 'tanım', 'name', 'description'),
+    'code': ('stok kodu', 'ürün kodu', 'kod', 'code', 'sku'),
+    'unit': ('birim', 'unit'),
+    'price': ('birim fiyat', 'fiyat', 'liste fiyatı', 'satış fiyatı', 'price'),
+}
+
+
+class PriceItem:
+    """Fiyat veritabanından öneri; katalog kalemiyle aynı arayüz (name, unit, unit_price, label)"""
+    __slots__ = ('name', 'unit', 'unit_price', 'supplier')
+
+    def __init__(self, name, unit, unit_price, supplier):
+        self.name = name
+        self.unit = unit
+        self.unit_price = unit_price
+        self.supplier = supplier
+
+    def label(self):
+        return f"{self.name}   [{self.unit}  {format_kurus(self.unit_price)} ₺ - {self.supplier}]"
+
+
+class ImportStats:
+    """Dosya başına aktarım özeti"""
+    __slots__ = ('path', 'rows', 'upserted', 'skipped', 'errors', 'seconds', 'unchanged')
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.upserted = 0
+        self.skipped = 0
+        self.errors = 0     # okunamayan / belirsiz fiyatlı satırlar
+        self.seconds = 0.0
+        self.unchanged = False
+
+    def line(self):
+        if self.unchanged:
+            return f"DEĞİŞMEDİ {self.seconds * 1000:8.1f} ms  {self.path}"
+        return (f"OK        {self.seconds * 1000:8.1f} ms  {self.path}  "
+                f"({self.rows} satır, {self.upserted} fiyat, {self.skipped} atlandı, {self.errors} hatalı)")
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_mappings(path=MAPPING_FILE):
+    """{"Tedarikçi": {"name": "Ürün Adı", "code": "Stok Kodu", "unit": "Birim", "price": 5,
+    "header_row": 1, "sheet": "Fiyatlar", "decimal": ","}} - sütunlar başlık adı veya 1'den başlayan
+    sıra no; decimal fiyatlardaki ondalık ayırıcı ("," veya ".")"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def iter_rows(path, sheet=None):
+    """Dosyanın satırlarını değer demeti olarak akıt (xlsx: read_only, csv: sniff edilen ayraç)"""
+    if str(path).lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.worksheets[0]
+            yield from ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+        return
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = 'excel'
+        yield from csv.reader(f, dialect)
+
+
+def resolve_columns(header, mapping):
+    """Eşlemeyi başlık satırına göre 0 tabanlı sütun sıralarına çevir"""
+    keys = [search_key(str(h)) if h is not None else '' for h in header]
+    columns = {}
+    for field, candidates in DEFAULT_HEADERS.items():
+        wanted = mapping.get(field)
+        if isinstance(wanted, int):
+            columns[field] = wanted - 1
+            continue
+        names = (search_key(wanted),) if wanted else candidates
+        for name in names:
+            if name in keys:
+                columns[field] = keys.index(name)
+                break
+    missing = {'name', 'price'} - columns.keys()
+    if missing:
+        raise ValueError(f"Sütun bulunamadı: {', '.join(sorted(missing))} (başlık: {header})")
+    return columns
+
+
+class PriceDB:
+    """Yerel fiyat veritabanı; her thread kendi PriceDB nesnesini açmalıdır"""
+
+    def __init__(self, path=PRICE_DB_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+
+    def complete(self, prefix, limit=10):
+        """Ad önekine uyan fiyatlar (indeks aralığı ile)"""
+        key = search_key(prefix)
+        if not key:
+            return []
+        rows = self.conn.execute(
+            "SELECT name, unit, unit_price, supplier FROM prices"
+            " WHERE name_key >= ? AND name_key < ? ORDER BY name_key LIMIT ?",
+            (key, key + '\U0010ffff', limit))
+        return [PriceItem(*r) for r in rows]
+
+    def import_file(self, path, supplier, mapping=None, force=False):
+        """Tek dosyayı aktar; ImportStats döner"""
+        stats = ImportStats(str(path))
+        start = time.perf_counter()
+        mapping = mapping or {}
+        digest = file_sha256(path)
+        if not force and self.conn.execute(
+                "SELECT 1 FROM imported_files WHERE sha256 = ? AND supplier = ?",
+                (digest, supplier)).fetchone():
+            stats.unchanged = True
+            stats.seconds = time.perf_counter() - start
+            return stats
+
+        now = datetime.now().isoformat(timespec='seconds')
+        header_row = mapping.get('header_row', 1)
+        decimal = mapping.get('decimal')
+        if decimal not in (None, ',', '.'):
+            raise ValueError(f"Geçersiz ondalık ayırıcı: {decimal!r} (',' veya '.' olmalı)")
+        decimal = decimal or AUTO
+        columns = None
+        batch = []
+        for row_no, row in enumerate(iter_rows(path, mapping.get('sheet')), start=1):
+            if row_no < header_row:
+                continue
+            if columns is None:
+                columns = resolve_columns(row, mapping)
+                continue
+            stats.rows += 1
+            try:
+                item = self._row_item(row, columns, decimal)
+            except ValueError:
+                stats.errors += 1
+                continue
+            if item is None:
+                stats.skipped += 1
+                continue
+            batch.append((supplier, *item, now))
+            if len(batch) >= BATCH_SIZE:
+                self._upsert(batch)
+                stats.upserted += len(batch)
+                batch = []
+        if batch:
+            self._upsert(batch)
+            stats.upserted += len(batch)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?, ?, ?)",
+                (digest, supplier, str(path), stats.rows, now))
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    @staticmethod
+    def _row_item(row, columns, decimal=AUTO):
+        """(code, name, name_key, unit, unit_price); boş satırda None, okunamayan fiyatta ValueError"""
+        def cell(field):
+            i = columns.get(field)
+            if i is None or i >= len(row) or row[i] is None:
+                return ''
+            return str(row[i]).strip()
+        name = cell('name')
+        if not name:
+            return None
+        value = row[columns['price']] if columns['price'] < len(row) else None
+        price = parse_kurus(value if isinstance(value, (int, float)) else str(value or ''), decimal)
+        if price <= 0:
+            return None
+        key = search_key(name)
+        return cell('code') or key, name, key, cell('unit') or 'Adet', price
+
+    def _upsert(self, batch):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO prices (supplier, code, name, name_key, unit, unit_price, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (supplier, code) DO UPDATE SET name = excluded.name,"
+                " name_key = excluded.name_key, unit = excluded.unit,"
+                " unit_price = excluded.unit_price, updated_at = excluded.updated_at",
+                batch)
+
+
+def import_files(paths, supplier, force=False, db_path=PRICE_DB_FILE, on_file=None):
+    """Dosyaları sırayla aktar (arayüzde worker thread'den çağrılır); ImportStats listesi döner.
+    Hatalı dosyada stats yerine (path, hata metni) eklenir."""
+    mapping = load_mappings().get(supplier, {})
+    db = PriceDB(db_path)
+    results = []
+    try:
+        for path in paths:
+            try:
+                result = db.import_file(path, supplier, mapping, force)
+            except Exception as e:
+                result = (str(path), f"{type(e).__name__}: {e}")
+            results.append(result)
+            if on_file:
+                on_file(result)
+    finally:
+        db.close()
+    return results
+
+
+def result_line(result):
+    if isinstance(result, ImportStats):
+        return result.line()
+    path, error = result
+    return f"HATA      {path}  ({error})"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="teklif_app.py fiyat-import",
+                                     description="Tedarikçi fiyat listelerini yerel fiyat veritabanına aktar")
+    parser.add_argument('files', nargs='+', help="fiyat listeleri (.xlsx / .csv)")
+    parser.add_argument('--supplier', required=True, help="tedarikçi adı (eşleme anahtarı)")
+    parser.add_argument('--force', action='store_true', help="değişmemiş dosyaları da yeniden oku")
+    parser.add_argument('--db', default=str(PRICE_DB_FILE), help="fiyat veritabanı dosyası")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = import_files(args.files, args.supplier, args.force, args.db,
+                           on_file=lambda r: print(result_line(r), flush=True))
+    print(f"{len(results)} dosya, toplam {time.perf_counter() - start:.2f} s")
+    return 1 if any(not isinstance(r, ImportStats) for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_geri.py
+Geri al / yinele geçmişi
+- Tablo kopyası tutulmaz; her adım kendi tersini çıkarabilecek kadar bilgi saklar:
+    ('ins', tablo, sıralar, satırlar)   eklenen satırlar (ardışık eklemede sıralar range'dir)
+    ('del', tablo, sıralar, satırlar)   silinen satırlar ve eski sıraları (artan)
+    ('set', tablo, sıra, eski, yeni)    hücre düzenlemesi: satırın alan değerleri önce / sonra
+    ('rep', tablo, eski, yeni)          tablonun tamamen değişmesi (taksit planı)
+- Bir kullanıcı işlemi (ör. ödeme düzenlemesi + otomatik eklenen satır) group() ile tek adımdır
+- Geri alma sıkı LIFO olduğundan kayıttaki sıralar uygulandığı anda geçerlidir;
+  her adımın maliyeti değişen satır sayısıyla orantılıdır
+"""
+from collections import deque
+from contextlib import contextmanager
+
+MAX_STEPS = 5000
+
+
+def fields_of(line):
+    """Satırın alan değerleri (__slots__ sırasıyla)"""
+    return tuple(getattr(line, name) for name in line.__slots__)
+
+
+def _lines(quote, table):
+    return quote.materials if table == 'material' else quote.payments
+
+
+def _insert(quote, table, indices, lines, log):
+    """Satırları verilen (artan, son konumdaki) sıralara yerleştir"""
+    target = _lines(quote, table)
+    if isinstance(indices, range):
+        target[indices.start:indices.start] = lines
+        log('insert', table, indices.start, lines)
+    else:
+        merged = []
+        rest = iter(target)
+        for index, line in zip(indices, lines):
+            while len(merged) < index:
+                merged.append(next(rest))
+            merged.append(line)
+        merged.extend(rest)
+        target[:] = merged
+        # Günlüğe ardışık parçalar halinde
+        start = 0
+        for k in range(1, len(indices) + 1):
+            if k == len(indices) or indices[k] != indices[k - 1] + 1:
+                log('insert', table, indices[start], lines[start:k])
+                start = k
+    if table == 'material':
+        quote.subtotal += sum(line.total for line in lines)
+
+
+def _delete(quote, table, indices, lines, log):
+    target = _lines(quote, table)
+    if isinstance(indices, range):
+        del target[indices.start:indices.stop]
+    else:
+        removed = set(indices)
+        target[:] = [line for i, line in enumerate(target) if i not in removed]
+    log('delete', table, list(indices))
+    if table == 'material':
+        quote.subtotal -= sum(line.total for line in lines)
+
+
+def _set(quote, table, index, values, log):
+    line = _lines(quote, table)[index]
+    old_total = line.total if table == 'material' else 0
+    for name, value in zip(line.__slots__, values):
+        setattr(line, name, value)
+    if table == 'material':
+        quote.subtotal += line.total - old_total
+    log('update', table, index, line)
+
+
+def _replace(quote, table, lines, log):
+    target = _lines(quote, table)
+    target[:] = lines
+    if table == 'material':
+        quote.recompute_totals()
+    log('replace', table, lines)
+
+
+def _apply(quote, step, reverse, log):
+    """Adımı uygula (reverse=True: tersini); (tablo, gösterilecek sıra) döndür"""
+    kind, table = step[0], step[1]
+    if kind in ('ins', 'del'):
+        _, _, indices, lines = step
+        if (kind == 'ins') != reverse:
+            _insert(quote, table, indices, lines, log)
+        else:
+            _delete(quote, table, indices, lines, log)
+        return table, indices[0] if len(indices) else 0
+    if kind == 'set':
+        _, _, index, old, new = step
+        _set(quote, table, index, old if reverse else new, log)
+        return table, index
+    _, _, old, new = step
+    _replace(quote, table, list(old if reverse else new), log)
+    return table, 0
+
+
+def _no_log(*args):
+    pass
+
+
+class History:
+    def __init__(self, max_steps=MAX_STEPS):
+        self.undo_steps = deque(maxlen=max_steps)
+        self.redo_steps = []
+        self._group = None
+
+    @contextmanager
+    def group(self):
+        """İç içe kayıtları tek geri alma adımında topla"""
+        if self._group is not None:
+            yield
+            return
+        self._group = []
+        try:
+            yield
+        finally:
+            steps, self._group = self._group, None
+            if steps:
+                self._push(steps)
+
+    def record(self, *step):
+        if self._group is not None:
+            self._group.append(step)
+        else:
+            self._push([step])
+
+    def _push(self, steps):
+        self.undo_steps.append(steps)
+        self.redo_steps.clear()
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def undo(self, quote, log=_no_log):
+        """Son adımı geri al; değişen (tablo, sıra) listesini döndür"""
+        if not self.undo_steps:
+            return []
+        steps = self.undo_steps.pop()
+        touched = [_apply(quote, step, True, log) for step in reversed(steps)]
+        self.redo_steps.append(steps)
+        return touched
+
+    def redo(self, quote, log=_no_log):
+        if not self.redo_steps:
+            return []
+        steps = self.redo_steps.pop()
+        touched = [_apply(quote, step, False, log) for step in steps]
+        self.undo_steps.append(steps)
+        return touched
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_gunluk.py
+Oturum günlüğü (write-ahead journal): çökme / elektrik kesintisinde kaydedilmemiş teklifi kurtarır
+- Her değişiklik (satır ekleme, hücre düzenleme, silme, ödeme planı, müşteri alanları) günlüğe
+  tek küçük JSON satırı olarak eklenir; tüm teklif her düzenlemede yeniden yazılmaz
+- Satırlar bellekte biriktirilir, flush() ile toplu yazılıp fsync edilir (arayüz birkaç saniyede bir çağırır)
+- Kayıt sayısı COMPACT_RECORDS'u geçince günlük tek bir anlık görüntü kaydına sıkıştırılır
+- Her uygulama penceresi kendi günlüğünü kilitli tutar; açılışta kilidi boşta kalan (sahibi
+  çökmüş) günlükler orphaned_journals() ile bulunur, replay() ile teklife dönüştürülür
+
+Kayıtlar (t: 'material' / 'payment', i: satır sırası):
+    {"op": "ins", "t", "i", "rows": [...]}    i'den itibaren satır ekle
+    {"op": "set", "t", "i", "row": [...]}     satırı değiştir
+    {"op": "del", "t", "idx": [...]}          satırları sil
+    {"op": "rep", "t", "rows": [...]}         tabloyu değiştir
+    {"op": "cust", "v": [ad, tc, tel, adres]}
+    {"op": "snap", "v": [...], "material": [...], "payment": [...]}
+"""
+import itertools
+import json
+import os
+from pathlib import Path
+import time
+
+from teklif_model import Quote, MaterialLine, PaymentLine
+
+JOURNAL_DIR = Path(__file__).parent / "setup" / "oturum"
+COMPACT_RECORDS = 2000
+_serial = itertools.count(1)
+
+# try_lock(açık dosya): süreç kapanana / dosya kapatılana kadar tutulan kilit; başkası tutuyorsa False
+try:
+    import msvcrt
+
+    def try_lock(f):
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+except ImportError:
+    import fcntl
+
+    def try_lock(f):
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+
+def line_to_row(line):
+    if isinstance(line, MaterialLine):
+        return [line.name, line.unit, line.qty, line.unit_price]
+    return [line.date, line.total, line.received, line.remaining]
+
+
+def row_to_line(table, row):
+    return MaterialLine(*row) if table == 'material' else PaymentLine(*row)
+
+
+def customer_of(quote):
+    return [quote.customer_name, quote.customer_tc, quote.customer_phone, quote.customer_address]
+
+
+class Journal:
+    def __init__(self, directory=JOURNAL_DIR):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Aynı süreçte birden çok pencere olabilir (bkz. teklif_tekil)
+        name = f"oturum_{os.getpid()}_{int(time.time())}_{next(_serial)}"
+        self.path = directory / (name + ".jsonl")
+        # Kilit ayrı dosyada: günlük sıkıştırılırken değiştirilse de kilit kesintisiz kalır
+        self._lock_file = open(directory / (name + ".lock"), 'w')
+        try_lock(self._lock_file)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.pending = []
+        self.records = 0
+        self.customer = ['', '', '', '']
+
+    # ------------- kayıtlar -------------
+    def append(self, record):
+        self.pending.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+    def insert(self, table, index, lines):
+        self.append({'op': 'ins', 't': table, 'i': index, 'rows': [line_to_row(l) for l in lines]})
+
+    def update(self, table, index, line):
+        self.append({'op': 'set', 't': table, 'i': index, 'row': line_to_row(line)})
+
+    def delete(self, table, indices):
+        self.append({'op': 'del', 't': table, 'idx': indices})
+
+    def replace(self, table, lines):
+        self.append({'op': 'rep', 't': table, 'rows': [line_to_row(l) for l in lines]})
+
+    def set_customer(self, fields):
+        """Müşteri alanları son kayıttan farklıysa ekle"""
+        fields = list(fields)
+        if fields != self.customer:
+            self.customer = fields
+            self.append({'op': 'cust', 'v': fields})
+
+    # ------------- yazma -------------
+    def flush(self):
+        """Biriken kayıtları tek yazma + fsync ile diske indir"""
+        if not self.pending:
+            return
+        self._file.write('\n'.join(self.pending) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += len(self.pending)
+        self.pending.clear()
+
+    @property
+    def needs_compaction(self):
+        return self.records >= COMPACT_RECORDS
+
+    def compact(self, quote):
+        """Günlüğü teklifin tek anlık görüntüsüyle değiştir (bekleyen kayıtlar da içinde)"""
+        self.pending.clear()
+        self.customer = customer_of(quote)
+        record = {'op': 'snap', 'v': self.customer,
+                  'material': [line_to_row(l) for l in quote.materials],
+                  'payment': [line_to_row(l) for l in quote.payments]}
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        # Windows'ta açık dosyanın üzerine taşınamaz
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.records = 1
+
+    def close(self, discard=True):
+        """Normal çıkış: günlük artık gerekmez (discard=False ise diskte bırakılır)"""
+        if not discard:
+            self.flush()
+        self._file.close()
+        self._lock_file.close()
+        if discard:
+            discard_journal(self.path)
+
+
+# ------------- kurtarma -------------
+def apply(quote, record):
+    op = record['op']
+    if op == 'cust':
+        (quote.customer_name, quote.customer_tc,
+         quote.customer_phone, quote.customer_address) = record['v']
+        return
+    if op == 'snap':
+        apply(quote, {'op': 'cust', 'v': record['v']})
+        quote.materials[:] = [row_to_line('material', r) for r in record['material']]
+        quote.payments[:] = [row_to_line('payment', r) for r in record['payment']]
+        return
+    table = record['t']
+    lines = quote.materials if table == 'material' else quote.payments
+    if op == 'ins':
+        lines[record['i']:record['i']] = [row_to_line(table, r) for r in record['rows']]
+    elif op == 'set':
+        lines[record['i']] = row_to_line(table, record['row'])
+    elif op == 'del':
+        removed = set(record['idx'])
+        lines[:] = [line for i, line in enumerate(lines) if i not in removed]
+    elif op == 'rep':
+        lines[:] = [row_to_line(table, r) for r in record['rows']]
+
+
+def replay(path):
+    """Günlükten teklifi yeniden kur; yarım yazılmış son satır yok sayılır"""
+    quote = Quote()
+    with open(path, 'r', encoding='utf-8') as f:
+        for text in f:
+            try:
+                record = json.loads(text)
+                apply(quote, record)
+            except (ValueError, KeyError, IndexError, TypeError):
+                break
+    quote.recompute_totals()
+    return quote
+
+
+def is_empty(quote):
+    return not (quote.materials or quote.payments or any(customer_of(quote)))
+
+
+def orphaned_journals(directory=JOURNAL_DIR):
+    """Sahibi çalışmayan (kilidi alınabilen) günlükler, en yeni önce"""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    found = []
+    for path in directory.glob("oturum_*.jsonl"):
+        try:
+            with open(path.with_suffix('.lock'), 'a') as f:
+                if try_lock(f):
+                    found.append(path)
+        except OSError:
+            pass
+    found.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    return found
+
+
+def discard_journal(path):
+    path = Path(path)
+    for p in (path, path.with_suffix('.lock'), path.with_suffix('.tmp')):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_katalog.py
+Ürün/işçilik kataloğu ve önek (prefix) indeksi
+- setup/katalog.csv: her satırda "Ad;Birim;Birim Fiyat" (ilk satır başlık olabilir)
+- İndeks sıralı dizi + bisect: tamamlama O(log n + limit), 50k+ kalemde bile milisaniyenin altında
+- Önce adın başıyla eşleşenler, sonra adın içindeki bir kelimenin başıyla eşleşenler sıralanır
+"""
+from bisect import bisect_left
+from pathlib import Path
+import csv
+import re
+
+from teklif_model import AUTO, format_kurus, parse_kurus, search_key
+
+CATALOG_FILE = Path(__file__).parent / "setup" / "katalog.csv"
+
+_WORD_START = re.compile(r'[\s\-/(]+(?=\w)')
+
+
+class _Semicolon(csv.excel):
+    # Türkçe Excel CSV'yi ; ile kaydeder
+    delimiter = ';'
+
+
+class CatalogItem:
+    __slots__ = ('name', 'unit', 'unit_price')
+
+    def __init__(self, name, unit='Adet', unit_price=0):
+        self.name = name
+        self.unit = unit
+        self.unit_price = unit_price  # kuruş
+
+    def label(self):
+        """Tamamlama listesinde gösterilen metin"""
+        return f"{self.name}   [{self.unit}  {format_kurus(self.unit_price)} ₺]"
+
+
+class Catalog:
+    """Ada göre tekil katalog; complete() ile önek araması"""
+
+    def __init__(self, items=()):
+        self.items = []
+        self._index_of = {}     # arama anahtarı -> items içindeki sıra
+        self._name_keys = []    # sıralı (anahtar, sıra)
+        self._word_keys = []    # sıralı (kelimeden itibaren anahtar, sıra)
+        self._dirty = False
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        """Kalemi ekle; aynı adda kalem varsa birim/fiyatı güncellenir"""
+        key = search_key(item.name)
+        if not key:
+            return
+        i = self._index_of.get(key)
+        if i is not None:
+            self.items[i] = item
+            return
+        self._index_of[key] = len(self.items)
+        self.items.append(item)
+        self._dirty = True
+
+    def get(self, name):
+        i = self._index_of.get(search_key(name))
+        return None if i is None else self.items[i]
+
+    def _build(self):
+        # Toplu eklemeden sonra bir kez sırala (her add'de değil)
+        name_keys, word_keys = [], []
+        for key, i in self._index_of.items():
+            name_keys.append((key, i))
+            for m in _WORD_START.finditer(key):
+                word_keys.append((key[m.end():], i))
+        name_keys.sort()
+        word_keys.sort()
+        self._name_keys = name_keys
+        self._word_keys = word_keys
+        self._dirty = False
+
+    def complete(self, prefix, limit=10):
+        """Öneke uyan en fazla limit kalem (önce ad başı, sonra kelime başı eşleşmeleri)"""
+        key = search_key(prefix)
+        if not key:
+            return []
+        if self._dirty:
+            self._build()
+        result, seen = [], set()
+        for keys in (self._name_keys, self._word_keys):
+            pos = bisect_left(keys, (key,))
+            while pos < len(keys) and len(result) < limit:
+                k, i = keys[pos]
+                if not k.startswith(key):
+                    break
+                if i not in seen:
+                    seen.add(i)
+                    result.append(self.items[i])
+                pos += 1
+        return result
+
+    @classmethod
+    def load_csv(cls, path=CATALOG_FILE):
+        """Katalog dosyasını oku; dosya yoksa boş katalog. Ayraç ; , veya sekme olabilir."""
+        catalog = cls()
+        path = Path(path)
+        if not path.exists():
+            return catalog
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+            except csv.Error:
+                dialect = _Semicolon
+            for row in csv.reader(f, dialect):
+                if not row or not row[0].strip():
+                    continue
+                unit = row[1].strip() if len(row) > 1 and row[1].strip() else 'Adet'
+                try:
+                    price = parse_kurus(row[2], AUTO) if len(row) > 2 else 0
+                except ValueError:
+                    continue  # başlık satırı veya bozuk fiyat
+                catalog.add(CatalogItem(row[0].strip(), unit, price))
+        catalog._build()
+        return catalog
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_model.py
+Teklif verisinin Tk'dan bağımsız (headless) modeli
+- Quote: müşteri bilgileri + malzeme satırları + ödeme planı
+- MaterialLine / PaymentLine: __slots__ ile hafif satır nesneleri
+- Tutarlar tamsayı kuruş olarak tutulur (1 ₺ = 100 kuruş), ekranda/Excel'de sadece biçimlenir
+- Tablo hücrelerinde tek ondalık ayırıcı vardır: '.' ya da ',' (1.5 = 1,5); binlik ayırıcı yazılmaz.
+  Hücreler de '.' ile gösterilir (format_kurus / format_qty), gösterilen değer aynen geri okunur.
+  Dosyadan / panodan aktarımda (decimal=AUTO) ayırıcı yazımdan çıkarılır (bkz. decimal_separator)
+"""
+import calendar
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import math
+
+VAT_PERCENT = 20
+
+MATERIAL_COLUMNS = ('Ürün/İşçilik Adı', 'Birim', 'Miktar', 'Birim Fiyat', 'Toplam')
+PAYMENT_COLUMNS = ('Tarih', 'Genel Toplam', 'Alınacak Tutar', 'Kalan Tutar')
+
+_CENT = Decimal('0.01')
+AUTO = 'auto'       # decimal=AUTO: ondalık ayırıcıyı her metinde yazımdan çıkar (aktarımlar)
+
+
+def decimal_separator(s):
+    """Yazımdan ondalık ayırıcıyı bul: iki ayırıcı varsa sondaki ondalıktır ('1.234,56', '1,234.56');
+    tek ayırıcı birden çok kez geçiyorsa binliktir ('1.250.000'). Tek ayırıcıdan sonra tam üç rakam
+    gelirse ('1.250', '1,250') binlik mi ondalık mı anlaşılamaz: ValueError."""
+    comma, dot = s.rfind(','), s.rfind('.')
+    if comma >= 0 and dot >= 0:
+        return ',' if comma > dot else '.'
+    if comma < 0 and dot < 0:
+        return '.'
+    sep = ',' if comma >= 0 else '.'
+    if s.count(sep) > 1:
+        return '.' if sep == ',' else ','
+    head, tail = s.split(sep)
+    head = head.lstrip('+-')
+    if len(tail) == 3 and tail.isdigit() and head.isdigit() and len(head) <= 3 and head[0] != '0':
+        raise ValueError(f"Belirsiz sayı: {s!r} (binlik mi ondalık mı? ayırıcısız ya da iki ondalıkla yazın)")
+    return sep
+
+
+def _clean_number(text, decimal=None):
+    """Girişi Decimal'e uygun metne çevir.
+    decimal None: tablo hücresi; tek ayırıcı ondalıktır ('1.500' = '1,5'), birden çok ayırıcı hatadır.
+    decimal ',' / '.': '1.234,56 ₺' / '1,234.56'; AUTO: decimal_separator ile bulunur.
+    Binlik gruplar üçer rakam olmalıdır."""
+    s = str(text).replace('₺', '').replace(' ', '').replace('\xa0', '').strip()
+    if decimal is None:
+        if s.count('.') + s.count(',') > 1:
+            raise ValueError(f"Geçersiz sayı: {text!r} (binlik ayırıcı yazmayın, ör. 1234,56 ya da 1234.56)")
+        return s.replace(',', '.')
+    if decimal == AUTO:
+        decimal = decimal_separator(s)
+    thousands = '.' if decimal == ',' else ','
+    if thousands in s:
+        whole = s.split(decimal)[0].lstrip('+-')
+        groups = whole.split(thousands)
+        if not (1 <= len(groups[0]) <= 3 and all(len(g) == 3 for g in groups[1:])):
+            raise ValueError(f"Geçersiz binlik ayırıcı: {text!r}")
+        s = s.replace(thousands, '')
+    return s.replace(decimal, '.')
+
+
+def parse_kurus(text, decimal=None):
+    """Para metnini kuruşa çevir. Boş metin 0 döner, geçersiz ya da belirsiz metin ValueError fırlatır.
+    decimal: None (hücre yazımı), ',' / '.' ya da AUTO (bkz. _clean_number)"""
+    if isinstance(text, int):
+        return text * 100
+    if isinstance(text, float):
+        text, decimal = repr(text), '.'   # tablolardan gelen sayı hücresi
+    s = _clean_number(text, decimal)
+    if not s:
+        return 0
+    try:
+        value = Decimal(s)
+        if not value.is_finite():
+            raise InvalidOperation
+        return int(value.quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:
+        raise ValueError(f"Geçersiz tutar: {text!r}")
+
+
+def parse_qty(text, decimal=None):
+    """Miktar metnini float'a çevir. Boş metin 0 döner; geçersiz ya da sonlu olmayan
+    (nan, inf, 1e400) metin ValueError fırlatır."""
+    if isinstance(text, (int, float)):
+        qty = float(text)
+    else:
+        s = _clean_number(text, decimal)
+        if not s:
+            return 0.0
+        try:
+            qty = float(s)
+        except ValueError:
+            raise ValueError(f"Geçersiz miktar: {text!r}")
+    if not math.isfinite(qty):
+        raise ValueError(f"Geçersiz miktar: {text!r}")
+    return qty
+
+
+def format_kurus(kurus):
+    """Kuruşu '1234.56' biçiminde yaz"""
+    sign = '-' if kurus < 0 else ''
+    kurus = abs(kurus)
+    return f"{sign}{kurus // 100}.{kurus % 100:02d}"
+
+
+def format_qty(qty):
+    """Miktarı gereksiz sıfırlar olmadan yaz (1 -> '1', 2.5 -> '2.5', 1.125 -> '1.125');
+    parse_qty ile aynen geri okunur"""
+    return f"{qty:.3f}".rstrip('0').rstrip('.')
+
+
+def kurus_to_float(kurus):
+    """Excel hücresine yazılacak sayısal değer"""
+    return kurus / 100
+
+
+def round_half_up(x):
+    """Pozitif ve negatif değerlerde yarımı sıfırdan uzağa yuvarla"""
+    return int(x + 0.5) if x >= 0 else -int(-x + 0.5)
+
+
+def safe_name(name):
+    """Müşteri adını klasör/dosya adında kullanılabilir hale getir"""
+    name = name.strip().replace(" ", "_")
+    safe_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_çğıöşüÇĞİÖŞÜ"
+    return ''.join(c if c in safe_chars else '_' for c in name)
+
+
+def search_key(text):
+    """Türkçe büyük/küçük harf duyarsız arama anahtarı (I -> ı, İ -> i)"""
+    return text.strip().replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def vat_of(kurus):
+    """KDV tutarı (kuruş)"""
+    return round_half_up(kurus * VAT_PERCENT / 100)
+
+
+def quote_date(quote):
+    """Teklif tarihi; verilmemişse bugünün tarihi"""
+    return quote.date or datetime.now().strftime('%d.%m.%Y')
+
+
+class MaterialLine:
+    """Malzeme/işçilik satırı: miktar float, birim fiyat ve toplam kuruş"""
+    __slots__ = ('name', 'unit', 'qty', 'unit_price')
+
+    def __init__(self, name='', unit='Adet', qty=1.0, unit_price=0):
+        self.name = name
+        self.unit = unit
+        self.qty = qty
+        self.unit_price = unit_price
+
+    @property
+    def total(self):
+        return round_half_up(self.qty * self.unit_price)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('name', ''), d.get('unit', 'Adet'),
+                   parse_qty(d.get('qty', 1)), parse_kurus(d.get('unit_price', 0)))
+
+    def to_dict(self):
+        return {'name': self.name, 'unit': self.unit, 'qty': self.qty,
+                'unit_price': format_kurus(self.unit_price)}
+
+    def set_field(self, col_index, text):
+        """Tablo sütununa göre alanı güncelle (Toplam sütunu hesaplanır, düzenlenmez)"""
+        if col_index == 0:
+            self.name = text
+        elif col_index == 1:
+            self.unit = text
+        elif col_index == 2:
+            self.qty = parse_qty(text)
+        elif col_index == 3:
+            self.unit_price = parse_kurus(text)
+
+    def values(self):
+        """Treeview satırı için görüntü değerleri"""
+        return (self.name, self.unit, format_qty(self.qty),
+                format_kurus(self.unit_price), format_kurus(self.total))
+
+
+# Yapıştırılan / içe aktarılan listelerin başlık satırında beklenen adlar (search_key ile)
+HEADER_LABELS = frozenset(search_key(h) for h in MATERIAL_COLUMNS + (
+    'No', 'Ad', 'Ürün', 'Ürün Adı', 'Malzeme', 'Açıklama', 'Adet', 'Fiyat', 'Birim Fiyatı',
+    'Toplam Fiyatı', 'Tutar', 'Name', 'Description', 'Unit', 'Qty', 'Quantity', 'Price', 'Total'))
+
+
+def _is_header_row(cells, decimal=AUTO):
+    """Miktar / fiyat hücrelerinden hiçbiri sayı değil ve en az bir hücre bilinen başlık adıysa True"""
+    for parse, text in ((parse_qty, cells[2]), (parse_kurus, cells[3])):
+        if text:
+            try:
+                parse(text, decimal)
+            except ValueError:
+                continue
+            return False
+    return any(search_key(c) in HEADER_LABELS for c in cells)
+
+
+def materials_from_rows(rows, decimal=AUTO):
+    """Yapıştırılan / CSV'den okunan satırları tek geçişte doğrula.
+    Sütunlar: Ad, Birim, Miktar, Birim Fiyat (Toplam sütunu varsa yok sayılır).
+    (satırlar, hatalar) döner; hatalar [(satır no, mesaj)]. İlk satır sadece başlık adlarından
+    oluşuyorsa atlanır; yazım hatalı bir veri satırı başlık sayılmaz, hata olarak bildirilir.
+    Sayı hücreleri (xlsx) olduğu gibi kullanılır; metinlerde ondalık ayırıcı decimal ile verilmezse
+    her hücrede yazımdan çıkarılır ve belirsiz sayılar ('1.250') hatalı satır olur."""
+    lines, errors = [], []
+    first = True
+    for row_no, row in enumerate(rows, start=1):
+        row = list(row) + [None] * (4 - len(row))
+        cells = ['' if c is None else str(c).strip() for c in row]
+        if not any(cells):
+            continue
+        if first:
+            first = False
+            if _is_header_row(cells, decimal):
+                continue
+        name, unit, qty, price = cells[:4]
+        # Sayı hücresi metne çevrilmeden ayrıştırılır (1.234 -> '1.234' belirsiz olurdu)
+        raw_qty = row[2] if isinstance(row[2], (int, float)) and not isinstance(row[2], bool) else qty
+        raw_price = row[3] if isinstance(row[3], (int, float)) and not isinstance(row[3], bool) else price
+        try:
+            line = MaterialLine(name, unit or 'Adet',
+                                parse_qty(raw_qty, decimal) if qty else 1.0,
+                                parse_kurus(raw_price, decimal))
+        except ValueError as e:
+            errors.append((row_no, str(e)))
+            continue
+        lines.append(line)
+    return lines, errors
+
+
+class PaymentLine:
+    """Ödeme planı satırı: tüm tutarlar kuruş"""
+    __slots__ = ('date', 'total', 'received', 'remaining')
+
+    def __init__(self, date='', total=0, received=0, remaining=0):
+        self.date = date
+        self.total = total
+        self.received = received
+        self.remaining = remaining
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('date', ''), parse_kurus(d.get('total', 0)),
+                   parse_kurus(d.get('received', 0)), parse_kurus(d.get('remaining', 0)))
+
+    def to_dict(self):
+        return {'date': self.date, 'total': format_kurus(self.total),
+                'received': format_kurus(self.received), 'remaining': format_kurus(self.remaining)}
+
+    def set_field(self, col_index, text):
+        if col_index == 0:
+            self.date = text
+        elif col_index == 1:
+            self.total = parse_kurus(text)
+        elif col_index == 2:
+            self.received = parse_kurus(text)
+        elif col_index == 3:
+            self.remaining = parse_kurus(text)
+
+    def values(self):
+        return (self.date, format_kurus(self.total),
+                format_kurus(self.received), format_kurus(self.remaining))
+
+
+# Taksit yuvarlama seçenekleri: etiket -> kuruş adımı
+ROUNDING_STEPS = {'Kuruş': 1, '1 ₺': 100, '10 ₺': 1000, '100 ₺': 10000}
+
+
+def add_months(date, months):
+    """Ay ekle; gün hedef ayda yoksa ayın son gününe çekilir (31.01 + 1 ay -> 28/29.02)"""
+    month = date.month - 1 + months
+    year = date.year + month // 12
+    month = month % 12 + 1
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+
+def installment_plan(total, count, start_date, down_payment=0, interval_months=1,
+                     rounding=1, remainder_last=True):
+    """KDV dahil toplamdan (kuruş) tüm ödeme planını tek geçişte üret.
+    Peşinat varsa start_date'te alınır ve taksitler interval_months sonra başlar, yoksa ilk taksit
+    start_date'tedir. Taksitler rounding kuruşun katına aşağı yuvarlanır, artan tutar son
+    (remainder_last=False ise ilk) taksite eklenir; rounding taksit tutarından büyükse ValueError. Satırlar tablodaki düzendedir:
+    Genel Toplam = önceki satırın kalanı, Kalan = Genel Toplam - Alınacak."""
+    if count < 1:
+        raise ValueError("Taksit sayısı en az 1 olmalı")
+    if interval_months < 1:
+        raise ValueError("Taksit aralığı en az 1 ay olmalı")
+    if not 0 <= down_payment <= total:
+        raise ValueError("Peşinat 0 ile Genel Toplam arasında olmalı")
+    if rounding < 1:
+        raise ValueError("Yuvarlama adımı en az 1 kuruş olmalı")
+    rest = total - down_payment
+    base = rest // count // rounding * rounding
+    if rest and not base:
+        # Yuvarlama adımı taksit tutarından büyük: taksitler 0 olur, tüm tutar tek taksite kalırdı
+        raise ValueError(f"Yuvarlama adımı ({format_kurus(rounding)} ₺) taksit tutarından "
+                         f"({format_kurus(rest // count)} ₺) büyük; daha küçük bir yuvarlama seçin")
+    amounts = [base] * count
+    amounts[-1 if remainder_last else 0] += rest - base * count
+
+    dates = []
+    offset = 0
+    if down_payment:
+        dates.append(start_date)
+        amounts.insert(0, down_payment)
+        offset = interval_months
+    dates += [add_months(start_date, offset + i * interval_months) for i in range(count)]
+
+    rows = []
+    balance = total
+    for date, amount in zip(dates, amounts):
+        if amount == 0 and balance == 0:
+            break
+        rows.append(PaymentLine(date.strftime('%d.%m.%Y'), balance, amount, balance - amount))
+        balance -= amount
+    return rows
+
+
+class Quote:
+    """Tek bir fiyat teklifi"""
+    __slots__ = ('customer_name', 'customer_tc', 'customer_phone', 'customer_address',
+                 'date', 'materials', 'payments', 'subtotal')
+
+    def __init__(self, customer_name='', customer_tc='', customer_phone='',
+                 customer_address='', date=None, materials=None, payments=None):
+        self.customer_name = customer_name
+        self.customer_tc = customer_tc
+        self.customer_phone = customer_phone
+        self.customer_address = customer_address
+        self.date = date  # None ise çıktı anındaki tarih kullanılır
+        self.materials = materials if materials is not None else []
+        self.payments = payments if payments is not None else []
+        self.recompute_totals()
+
+    @classmethod
+    def from_dict(cls, d):
+        """JSON teklif tanımı -> Quote. Tutarlar TL olarak sayı veya metin verilebilir:
+        {"customer": {"name", "tc", "phone", "address"}, "date": "dd.mm.yyyy",
+         "materials": [{"name", "unit", "qty", "unit_price"}],
+         "payments": [{"date", "total", "received", "remaining"}]}
+        """
+        c = d.get('customer', {})
+        return cls(c.get('name', ''), c.get('tc', ''), c.get('phone', ''), c.get('address', ''),
+                   d.get('date'),
+                   [MaterialLine.from_dict(m) for m in d.get('materials', ())],
+                   [PaymentLine.from_dict(p) for p in d.get('payments', ())])
+
+    def to_dict(self):
+        return {
+            'customer': {'name': self.customer_name, 'tc': self.customer_tc,
+                         'phone': self.customer_phone, 'address': self.customer_address},
+            'date': self.date,
+            'materials': [line.to_dict() for line in self.materials],
+            'payments': [line.to_dict() for line in self.payments],
+        }
+
+    def snapshot(self):
+        """Bağımsız kopya: arka planda dışa aktarılırken arayüzdeki düzenlemelerden etkilenmez"""
+        return Quote(self.customer_name, self.customer_tc, self.customer_phone,
+                     self.customer_address, self.date,
+                     [MaterialLine(m.name, m.unit, m.qty, m.unit_price) for m in self.materials],
+                     [PaymentLine(p.date, p.total, p.received, p.remaining) for p in self.payments])
+
+    # Malzeme satırları bu metodlarla değiştirilirse ara toplam artımlı
+    # (satır başına O(1)) güncel kalır; tüm tabloyu taramaya gerek kalmaz.
+    def add_material(self, line):
+        self.materials.append(line)
+        self.subtotal += line.total
+
+    def extend_materials(self, lines):
+        """Toplu ekleme: ara toplam tek seferde güncellenir"""
+        self.materials.extend(lines)
+        self.subtotal += sum(line.total for line in lines)
+
+    def remove_materials(self, lines):
+        removed = {id(line) for line in lines}
+        self.subtotal -= sum(line.total for line in lines)
+        self.materials[:] = [line for line in self.materials if id(line) not in removed]
+
+    def edit_material(self, line, col_index, text):
+        """Satır alanını güncelle, eski toplamı çıkarıp yenisini ekle.
+        Yeni değer önce kopya üzerinde denenir; ValueError'da satır değişmeden kalır."""
+        edited = MaterialLine(line.name, line.unit, line.qty, line.unit_price)
+        edited.set_field(col_index, text)
+        try:
+            new_total = edited.total
+        except OverflowError:
+            raise ValueError(f"Tutar çok büyük: {text!r}")
+        self.subtotal += new_total - line.total
+        line.name, line.unit, line.qty, line.unit_price = (
+            edited.name, edited.unit, edited.qty, edited.unit_price)
+
+    def recompute_totals(self):
+        """materials listesi doğrudan değiştirildiyse ara toplamı baştan hesapla"""
+        self.subtotal = sum(line.total for line in self.materials)
+
+    def totals(self):
+        """(ara toplam, KDV hariç, KDV, KDV dahil) - hepsi kuruş"""
+        subtotal = self.subtotal
+        vat = vat_of(subtotal)
+        return subtotal, subtotal, vat, subtotal + vat
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_olcum.py
+Aşama süresi ölçümü ve profil çıkarma (dışa aktarma, açılış)
+- Ayarlarda "timing": true veya TEKLIF_TIMING=1 ile açılır; kapalıyken hiçbir şey yazılmaz
+- Her iş (Trace) aşama süreleriyle birlikte tek JSON satırı olarak setup/logs/teklif_olcum.log'a
+  yazılır (dönen log: 1 MB x 3 dosya)
+- Ayarlarda "profile_next_export": true veya TEKLIF_PROFILE=1: sıradaki tek çıktı cProfile ile
+  ölçülür, .prof dosyası aynı klasöre kaydedilir
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import logging
+import logging.handlers
+import os
+from pathlib import Path
+import threading
+import time
+
+LOG_DIR = Path(__file__).parent / "setup" / "logs"
+LOG_FILE = LOG_DIR / "teklif_olcum.log"
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 3
+
+_TRUE = ('1', 'true', 'yes', 'evet')
+_enabled = os.environ.get('TEKLIF_TIMING', '').lower() in _TRUE
+_profile_next = os.environ.get('TEKLIF_PROFILE', '').lower() in _TRUE
+_local = threading.local()
+_lock = threading.Lock()
+_logger = None
+
+
+def configure(enabled=None, profile_next=None):
+    """Ayarlardan gelen değerleri uygula (None: ortam değişkeni / mevcut değer kalır;
+    True / False verilirse ortam değişkeni de geçersiz kılınır)"""
+    global _enabled, _profile_next
+    if enabled is not None:
+        _enabled = bool(enabled)
+    if profile_next is not None:
+        _profile_next = bool(profile_next)
+
+
+def is_enabled():
+    return _enabled
+
+
+def _get_logger():
+    global _logger
+    with _lock:
+        if _logger is None:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            logger = logging.getLogger('teklif.olcum')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+
+def write_record(kind, phases, **info):
+    """{"ts", "kind", "total_ms", "phases": {ad: ms}, ...} satırını loga yaz.
+    İç içe aşamalar "dış/iç" adıyla yazılır; toplam sadece en dış aşamalardan hesaplanır."""
+    if not _enabled:
+        return None
+    record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'kind': kind}
+    record.update(info)
+    record['total_ms'] = round(sum(s for name, s in phases if '/' not in name) * 1000, 2)
+    record['phases'] = {name: round(seconds * 1000, 2) for name, seconds in phases}
+    try:
+        _get_logger().info(json.dumps(record, ensure_ascii=False))
+    except OSError:
+        pass
+    return record
+
+
+class Trace:
+    """Bir işin aşama süreleri; activate() ile bulunduğu thread'de phase() kayıtlarını toplar"""
+    __slots__ = ('kind', 'info', 'phases')
+
+    def __init__(self, kind, **info):
+        self.kind = kind
+        self.info = info
+        self.phases = []
+
+    def add(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def activate(self):
+        previous = getattr(_local, 'trace', None)
+        _local.trace = self
+        try:
+            yield self
+        finally:
+            _local.trace = previous
+
+    def finish(self, **info):
+        self.info.update(info)
+        return write_record(self.kind, self.phases, **self.info)
+
+
+@contextmanager
+def phase(name):
+    """Etkin Trace varsa bloğun süresini name adıyla kaydet"""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield
+        return
+    stack = _local.__dict__.setdefault('stack', [])
+    stack.append(name)
+    full_name = '/'.join(stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stack.pop()
+        trace.add(full_name, time.perf_counter() - start)
+
+
+@contextmanager
+def maybe_profile(label='export'):
+    """Profil isteği varsa (bir kez) bloğu cProfile ile ölç; .prof yolunu yield eder, yoksa None"""
+    global _profile_next
+    with _lock:
+        wanted, _profile_next = _profile_next, False
+    if not wanted:
+        yield None
+        return
+    import cProfile
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    path = LOG_DIR / f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_onizleme.py
+İçerik adresli önizleme önbelleği
+- Anahtar teklif içeriğinin (müşteri, tarih, satırlar, logo, firma bilgileri, format, Excel motoru)
+  SHA-256 özetidir; değişmemiş teklifin önizlemesi yeniden üretilmeden hemen açılır
+- Dosyalar işleme özel geçici klasörde tutulur; toplam boyut / dosya sayısı sınırı aşılınca
+  en uzun süredir kullanılmayan (LRU) silinir
+- clear() çıkışta klasörü siler; çökmüş oturumlardan kalan eski klasörler açılışta temizlenir.
+  Her pencere kendi klasöründeki kilit dosyasını açık tutar, kilitli klasörler silinmez
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+from teklif_gunluk import try_lock
+
+CACHE_ROOT = Path(tempfile.gettempdir()) / "teklif_onizleme"
+MAX_BYTES = 50 << 20
+MAX_ENTRIES = 20
+STALE_SECONDS = 24 * 3600
+LOCK_NAME = ".kilit"
+
+
+def quote_digest(quote, fmt, logo_path=None, engine=None, company=None):
+    """Çıktıyı belirleyen her şeyin özeti (satırlar tek geçişte, ara liste kurmadan).
+    company: teklif_firma.load_company() sonucu (başlık satırları), engine: Excel motoru ayarı"""
+    h = hashlib.sha256()
+    h.update('\x1f'.join((fmt, engine or '', quote.customer_name, quote.customer_tc,
+                          quote.customer_phone, quote.customer_address, quote.date or '')).encode('utf-8'))
+    if company:
+        h.update(b'\x1e' + json.dumps(company, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    if logo_path:
+        try:
+            st = os.stat(logo_path)
+            h.update(f"\x1e{logo_path}\x1f{st.st_size}\x1f{st.st_mtime_ns}".encode('utf-8'))
+        except OSError:
+            pass
+    for m in quote.materials:
+        h.update(f"\x1e{m.name}\x1f{m.unit}\x1f{m.qty!r}\x1f{m.unit_price}".encode('utf-8'))
+    h.update(b'\x1d')
+    for p in quote.payments:
+        h.update(f"\x1e{p.date}\x1f{p.total}\x1f{p.received}\x1f{p.remaining}".encode('utf-8'))
+    return h.hexdigest()
+
+
+class PreviewCache:
+    def __init__(self, root=CACHE_ROOT, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # anahtar -> (yol, boyut, mtime_ns); sonda en yeni
+        self.total_bytes = 0
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        self._prune_stale(root)
+        self.dir = Path(tempfile.mkdtemp(prefix=f"{os.getpid()}_", dir=root))
+        # Klasör kullanımda: kilit açık kaldıkça diğer pencerelerin _prune_stale'i dokunmaz
+        self._lock_file = open(self.dir / LOCK_NAME, 'w')
+        try_lock(self._lock_file)
+
+    @staticmethod
+    def _prune_stale(root):
+        """Eski ve sahibi çalışmayan (kilidi alınabilen) klasörleri sil"""
+        limit = time.time() - STALE_SECONDS
+        for child in root.iterdir():
+            try:
+                if not child.is_dir() or child.stat().st_mtime >= limit:
+                    continue
+                lock = child / LOCK_NAME
+                if lock.exists():
+                    with open(lock, 'a') as f:
+                        if not try_lock(f):
+                            continue    # uzun süredir açık bir pencerenin önbelleği
+                shutil.rmtree(child, ignore_errors=True)
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Önbellekteki dosya yolu; yoksa veya dosya dışarıdan değiştirildiyse None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        path, size, mtime = entry
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or st.st_size != size or st.st_mtime_ns != mtime:
+            # Önizleme Excel'de düzenlenip kaydedilmiş ya da silinmiş: güvenilmez
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return path
+
+    def put(self, key, src, fmt):
+        """Üretilen geçici dosyayı önbelleğe taşı, yeni yolunu döndür"""
+        if key in self.entries:
+            self._drop(key)
+        path = str(self.dir / f"Teklif_Onizleme_{key[:12]}.{fmt}")
+        shutil.move(src, path)
+        st = os.stat(path)
+        self.entries[key] = (path, st.st_size, st.st_mtime_ns)
+        self.total_bytes += st.st_size
+        self._evict()
+        return path
+
+    def _evict(self):
+        # En yeni kayıt (az önce eklenen) her durumda kalır
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                         or self.total_bytes > self.max_bytes):
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        path, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass    # Windows'ta açık dosya silinemez; clear() klasörle birlikte dener
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+        self._lock_file.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
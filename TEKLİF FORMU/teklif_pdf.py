@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_pdf.py
+Teklifi doğrudan PDF olarak üretir (reportlab canvas; ofis programı gerekmez)
+- Excel çıktısıyla aynı A4 düzeni: firma başlığı + logo, müşteri kutusu, malzeme tablosu,
+  toplamlar, ödeme planı ve imza alanı; sütun oranları Excel sütun genişliklerinden alınır
+- Uzun tablolar sayfalara bölünür, her yeni sayfada tablo başlık satırı tekrarlanır
+- Türkçe karakterli TTF font ve logo (ImageReader) süreç başına bir kez hazırlanır
+"""
+from io import BytesIO
+import os
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from teklif_firma import PROGRESS_EVERY, header_lines, load_company, logo_png
+from teklif_model import quote_date
+from teklif_olcum import phase
+from teklif_yerlesim import COLUMN_WIDTHS, DEFAULT_HEIGHT, HEADER_SIZES, LINE_HEIGHTS
+
+# Türkçe karakter (ğ, ş, ı, İ) içeren fontlar; ilk bulunan kullanılır
+_WINDIR = os.environ.get('WINDIR', r'C:\Windows')
+FONT_CANDIDATES = (
+    (os.path.join(_WINDIR, 'Fonts', 'arial.ttf'), os.path.join(_WINDIR, 'Fonts', 'arialbd.ttf')),
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/TTF/DejaVuSans.ttf', '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf'),
+    ('/Library/Fonts/Arial.ttf', '/Library/Fonts/Arial Bold.ttf'),
+)
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 28                       # ~1 cm
+FOOTER = 20                       # sayfa numarası alanı
+# Excel sütun genişlikleri (A..F, teklif_yerlesim) ile aynı oranlar
+_usable = PAGE_WIDTH - 2 * MARGIN
+COL_WIDTHS = tuple(_usable * w / sum(COLUMN_WIDTHS) for w in COLUMN_WIDTHS)
+COL_X = tuple(MARGIN + sum(COL_WIDTHS[:i]) for i in range(len(COL_WIDTHS) + 1))
+
+ROW_HEIGHT = 16
+FONT_SIZE = 9
+LEADING = 11
+PAD = 3
+BORDER_WIDTH = 1
+LOGO_POINTS = 90                  # Excel'deki 120 px
+
+HEADER_FILL = (0x2F / 255, 0x4F / 255, 0x4F / 255)
+GREY_FILL = (0xEC / 255, 0xF0 / 255, 0xF1 / 255)
+
+MATERIAL_HEADERS = ('NO', 'AÇIKLAMA', 'BİRİM', 'MİKTAR', 'BİRİM FİYATI', 'TOPLAM FİYATI')
+PAYMENT_HEADERS = ('NO', 'TARİH', 'TOPLAM', 'ALINACAK TUTAR', 'KALACAK TUTAR', 'AÇIKLAMALAR')
+
+_fonts = None
+_logo_readers = {}
+
+
+def register_fonts():
+    """TTF fontu bir kez kaydet; (normal, kalın) font adlarını döner"""
+    global _fonts
+    if _fonts is None:
+        _fonts = ('Helvetica', 'Helvetica-Bold')  # Türkçe harfler eksik çıkar
+        for regular, bold in FONT_CANDIDATES:
+            if os.path.exists(regular) and os.path.exists(bold):
+                pdfmetrics.registerFont(TTFont('TeklifSans', regular))
+                pdfmetrics.registerFont(TTFont('TeklifSans-Bold', bold))
+                _fonts = ('TeklifSans', 'TeklifSans-Bold')
+                break
+    return _fonts
+
+
+def logo_reader(logo_path):
+    """Önbellekteki logo PNG'si için ImageReader (aynı bayt nesnesi için tekrar kullanılır)"""
+    data = logo_png(logo_path)
+    if data is None:
+        return None
+    reader = _logo_readers.get(id(data))
+    if reader is None or reader[0] is not data:
+        _logo_readers.clear()
+        reader = _logo_readers[id(data)] = (data, ImageReader(BytesIO(data)))
+    return reader[1]
+
+
+def wrap_text(text, font, size, width):
+    """Metni width'e sığan satırlara böl (teklif_yerlesim.line_count gibi boşluktan, gerekirse harften)"""
+    text = str(text or '')
+    string_width = pdfmetrics.stringWidth
+    if '\n' not in text and string_width(text, font, size) <= width:
+        return [text]
+    space = string_width(' ', font, size)
+    lines = []
+    for paragraph in text.split('\n'):
+        line, used = '', 0.0
+        for word in paragraph.split(' '):
+            w = string_width(word, font, size)
+            if line and used + space + w <= width:
+                line, used = f"{line} {word}", used + space + w
+                continue
+            if line:
+                lines.append(line)
+            if w <= width:
+                line, used = word, w
+                continue
+            # Sütundan uzun kelime harf harf bölünür
+            line, used = '', 0.0
+            for ch in word:
+                cw = string_width(ch, font, size)
+                if line and used + cw > width:
+                    lines.append(line)
+                    line, used = '', 0.0
+                line += ch
+                used += cw
+        lines.append(line)
+    return lines
+
+
+def format_tl(kurus):
+    """Kuruşu Türkçe biçimde yaz: 1.234,56"""
+    sign = '-' if kurus < 0 else ''
+    kurus = abs(kurus)
+    return f"{sign}{kurus // 100:,}".replace(',', '.') + f",{kurus % 100:02d}"
+
+
+def format_amount(qty):
+    return f"{qty:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+class _PdfWriter:
+    """Sayfa konumunu (y) ve sayfa geçişlerini yöneten küçük yardımcı"""
+
+    def __init__(self, output_path):
+        self.font, self.bold = register_fonts()
+        self.c = canvas.Canvas(output_path, pagesize=A4, pageCompression=1)
+        self.c.setLineWidth(BORDER_WIDTH)
+        self.page = 1
+        self.y = PAGE_HEIGHT - MARGIN
+        self.repeat = None  # sayfa başında tekrarlanacak başlık satırı
+
+    def new_page(self):
+        self.footer()
+        self.c.showPage()
+        self.c.setLineWidth(BORDER_WIDTH)  # showPage grafik durumunu sıfırlar
+        self.page += 1
+        self.y = PAGE_HEIGHT - MARGIN
+        if self.repeat:
+            self.header_row(self.repeat)
+
+    def ensure(self, height):
+        """height kadar yer yoksa yeni sayfaya geç"""
+        if self.y - height < MARGIN + FOOTER:
+            self.new_page()
+
+    def footer(self):
+        self.c.setFont(self.font, 8)
+        self.c.drawCentredString(PAGE_WIDTH / 2, MARGIN, f"Sayfa {self.page}")
+
+    def finish(self):
+        self.footer()
+        self.c.save()
+
+    # ------------- hücreler -------------
+    def text(self, col, text, font=None, size=FONT_SIZE, align='left', height=ROW_HEIGHT, last_col=None):
+        """Kenarlıksız metin (A..F sütun aralığında)"""
+        x0, x1 = COL_X[col], COL_X[(last_col if last_col is not None else col) + 1]
+        self.c.setFont(font or self.font, size)
+        y = self.y - height / 2 - size * 0.35
+        if align == 'center':
+            self.c.drawCentredString((x0 + x1) / 2, y, text)
+        elif align == 'right':
+            self.c.drawRightString(x1 - PAD, y, text)
+        else:
+            self.c.drawString(x0 + PAD, y, text)
+
+    def cell(self, col, text, height=ROW_HEIGHT, align='left', font=None, fill=None,
+             color=None, last_col=None, border=True, lines=None):
+        x0, x1 = COL_X[col], COL_X[(last_col if last_col is not None else col) + 1]
+        c = self.c
+        if fill:
+            c.setFillColorRGB(*fill)
+            c.rect(x0, self.y - height, x1 - x0, height, stroke=0, fill=1)
+        if border:
+            c.setFillColorRGB(0, 0, 0)
+            c.rect(x0, self.y - height, x1 - x0, height, stroke=1, fill=0)
+        c.setFillColorRGB(*(color or (0, 0, 0)))
+        if lines is not None:
+            # Alt satıra geçen metin (üstten hizalı)
+            c.setFont(font or self.font, FONT_SIZE)
+            y = self.y - PAD - FONT_SIZE
+            for line in lines:
+                c.drawString(x0 + PAD, y, line)
+                y -= LEADING
+        elif text:
+            c.setFont(font or self.font, FONT_SIZE)
+            y = self.y - height / 2 - FONT_SIZE * 0.35
+            if align == 'center':
+                c.drawCentredString((x0 + x1) / 2, y, text)
+            elif align == 'right':
+                c.drawRightString(x1 - PAD, y, text)
+            else:
+                c.drawString(x0 + PAD, y, text)
+        c.setFillColorRGB(0, 0, 0)
+
+    def header_row(self, headers):
+        self.ensure(ROW_HEIGHT)
+        for col, h in enumerate(headers):
+            self.cell(col, h, align='center', font=self.bold, fill=HEADER_FILL, color=(1, 1, 1))
+        self.y -= ROW_HEIGHT
+
+    def wrap(self, text, col, last_col=None):
+        width = COL_X[(last_col if last_col is not None else col) + 1] - COL_X[col] - 2 * PAD
+        return wrap_text(text, self.font, FONT_SIZE, width)
+
+    def row_height(self, lines):
+        return max(ROW_HEIGHT, len(lines) * LEADING + 2 * PAD)
+
+
+def write_quote_pdf(quote, output_path, logo_path=None, company=None, progress=None):
+    """Teklifi output_path'e PDF olarak kaydet.
+    progress: isteğe bağlı progress(yapılan, toplam) (bkz. teklif_firma.PROGRESS_EVERY)"""
+    with phase('pdf_draw'):
+        w = _draw_quote(quote, output_path, logo_path, company, progress)
+    with phase('pdf_save'):
+        w.finish()
+    return output_path
+
+
+def _draw_quote(quote, output_path, logo_path, company, progress=None):
+    w = _PdfWriter(output_path)
+    c = w.c
+    c.setTitle("Fiyat Teklifi")
+
+    # Başlık ve firma bilgileri (Excel'deki 1-6. satırlar)
+    reader = logo_reader(logo_path)
+    if reader is not None:
+        c.drawImage(reader, COL_X[-1] - LOGO_POINTS, PAGE_HEIGHT - MARGIN - LOGO_POINTS,
+                    LOGO_POINTS, LOGO_POINTS, mask='auto')
+    # Font boyutu ve satır yüksekliği Excel'deki üst bölümle aynı (teklif_yerlesim.HEADER_SIZES)
+    row_no = 1
+    for row, text, kind in header_lines(company or load_company()):
+        w.y -= DEFAULT_HEIGHT * (row - row_no)     # aradaki boş satırlar
+        row_no = row + 1
+        size = HEADER_SIZES[kind]
+        height = LINE_HEIGHTS[size]
+        if kind == 'info':
+            w.text(0, text, size=size, height=height, last_col=5)
+        else:
+            w.text(0, text, font=w.bold, size=size, align='center', height=height, last_col=5)
+        w.y -= height
+    w.y -= 6
+
+    # Müşteri kutusu
+    box_rows = (("MÜŞTERİ ADI :", quote.customer_name), ("T.C. :", quote.customer_tc),
+                ("TEL :", quote.customer_phone), ("ADRES :", quote.customer_address),
+                ("TARİH :", quote_date(quote)))
+    for label, value in box_rows:
+        lines = w.wrap(value, 2, last_col=5)
+        height = w.row_height(lines)
+        w.text(1, label, font=w.bold, height=ROW_HEIGHT)
+        w.cell(2, None, height=height, fill=GREY_FILL, last_col=5, border=False, lines=lines)
+        w.y -= height
+    w.y -= ROW_HEIGHT
+
+    # Malzeme tablosu; başlık en az bir satırla aynı sayfada kalır, sayfa taşarsa yeni sayfada tekrarlanır
+    materials = quote.materials
+    first = w.row_height(w.wrap(materials[0].name, 1)) if materials else ROW_HEIGHT
+    w.ensure(ROW_HEIGHT + first)
+    w.header_row(MATERIAL_HEADERS)
+    w.repeat = MATERIAL_HEADERS
+    if not materials:
+        for _ in range(3):
+            w.ensure(ROW_HEIGHT)
+            for col in range(6):
+                w.cell(col, '')
+            w.y -= ROW_HEIGHT
+    for idx, line in enumerate(materials, start=1):
+        lines = w.wrap(line.name, 1)
+        height = w.row_height(lines)
+        w.ensure(height)
+        w.cell(0, str(idx), height, align='center')
+        w.cell(1, None, height, lines=lines)
+        w.cell(2, line.unit, height, align='center')
+        w.cell(3, format_amount(line.qty), height, align='center')
+        w.cell(4, format_tl(line.unit_price), height, align='right')
+        w.cell(5, format_tl(line.total), height, align='right')
+        w.y -= height
+        if progress is not None and idx % PROGRESS_EVERY == 0:
+            progress(idx, len(materials))
+    if progress is not None:
+        progress(len(materials), len(materials))
+    w.repeat = None
+
+    # Toplamlar (bölünmeden aynı sayfada)
+    m_sub, m_without, m_vat, m_with = quote.totals()
+    totals = (("GENEL Toplam:", m_sub), ("KDV'siz Toplam:", m_without),
+              ("KDV (%20) Tutarı:", m_vat), ("KDV'li Toplam:", m_with))
+    w.ensure(ROW_HEIGHT * len(totals))
+    for label, value in totals:
+        w.cell(4, label, font=w.bold, fill=GREY_FILL)
+        w.cell(5, format_tl(value), align='right')
+        w.y -= ROW_HEIGHT
+    w.y -= ROW_HEIGHT
+
+    # Ödeme planı
+    w.ensure(ROW_HEIGHT * 3)
+    w.text(0, "ÖDEME PLANI", font=w.bold, last_col=2)
+    w.y -= ROW_HEIGHT
+    w.header_row(PAYMENT_HEADERS)
+    w.repeat = PAYMENT_HEADERS
+    if not quote.payments:
+        for _ in range(3):
+            w.ensure(ROW_HEIGHT)
+            for col in range(5):
+                w.cell(col, '')
+            w.y -= ROW_HEIGHT
+    for idx, line in enumerate(quote.payments, start=1):
+        w.ensure(ROW_HEIGHT)
+        w.cell(0, str(idx), align='center')
+        w.cell(1, line.date, align='center')
+        w.cell(2, format_tl(line.total), align='right')
+        w.cell(3, format_tl(line.received), align='right')
+        w.cell(4, format_tl(line.remaining), align='right')
+        w.y -= ROW_HEIGHT
+    w.repeat = None
+
+    # İmza alanı (Excel'deki satır aralıklarıyla)
+    if quote.payments:
+        w.ensure(ROW_HEIGHT * 9)
+        w.y -= ROW_HEIGHT * 2
+        w.text(0, "MÜŞTERİ", font=w.bold, last_col=1)
+        w.text(4, "FİRMA YETKİLİSİ", font=w.bold, last_col=5)
+        w.y -= ROW_HEIGHT * 2
+        w.text(0, "TARİH : ________", last_col=1)
+        w.text(4, "TARİH : ________", last_col=5)
+        w.y -= ROW_HEIGHT * 3
+    else:
+        w.ensure(ROW_HEIGHT * 6)
+        w.y -= ROW_HEIGHT * 5
+    w.text(0, "İMZA : ________", last_col=1)
+    w.text(4, "İMZA : ________", last_col=5)
+    return w
+
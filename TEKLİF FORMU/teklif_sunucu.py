@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_sunucu.py
+Ofis içi teklif sunucusu (isteğe bağlı): JSON teklif alır, XLSX / PDF'i merkezi klasöre üretir
+
+    python teklif_app.py serve --out "\\\\SUNUCU\\Teklifler" [--host 0.0.0.0 --token GİZLİ] [--port 8765] [--workers 2]
+
+Uç noktalar:
+    POST /teklif?format=xlsx|pdf   gövde: teklif JSON'u (bkz. teklif_model.Quote.from_dict)
+                                   -> {"id", "path", "download", "queue_ms", "render_ms", "total_ms"}
+                                   (arşive yazılamadıysa id null, "archive_error" hata metni)
+    GET  /dosya/<yol>              bu sunucunun ürettiği dosyayı indir (--out'taki diğer dosyalar 404)
+    GET  /metrics                  istek sayıları, kuyruk durumu, gecikme yüzdelikleri
+    GET  /saglik                   {"status": "ok"}
+
+    python teklif_app.py serve --self-test    yerel portta sunucuyu açıp örnek xlsx / pdf üretir, denetler
+
+- Dosyalar teklif_excel / teklif_pdf ile (arayüzdeki çıktının aynısı) süreç havuzunda üretilir
+- Aynı anda en fazla --workers çıktı üretilir; bekleyen istek sayısı --queue'yu aşarsa 503 döner
+- Teklifler merkezi arşive (teklif_arsiv) de yazılır; arşiv hataları stderr'e yazılır ve sayılır
+- --token verilirse /saglik dışındaki istekler "X-Token: <token>" başlığı veya ?token= ister;
+  yerel makine dışındaki adreslerde (--host 0.0.0.0) token zorunludur
+- Klasör oluşturma, dosya okuma ve arşiv (SQLite) yazımı olay döngüsünü bekletmemek için thread'de çalışır
+- Sadece standart kütüphane (asyncio) kullanılır; --port 0 boş bir port seçer (yerel deneme için)
+"""
+import argparse
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import hmac
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs, quote as url_quote, unquote, urlsplit
+
+from teklif_model import Quote, quote_date, safe_name
+from teklif_firma import find_logo_path
+
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 20 << 20
+READ_TIMEOUT = 30
+LATENCY_WINDOW = 1000   # yüzdelikler son bu kadar istekten hesaplanır
+
+_STATUS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+_LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+_CONTENT_TYPES = {
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.pdf': 'application/pdf',
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def render_file(quote_def, fmt, path, logo_path, engine):
+    """Süreç havuzunda çalışır: teklifi path'e üret, süreyi (s) döndür"""
+    start = time.perf_counter()
+    quote = Quote.from_dict(quote_def)
+    part = path + '.part'
+    try:
+        if fmt == 'pdf':
+            import teklif_pdf
+            teklif_pdf.write_quote_pdf(quote, part, logo_path)
+        else:
+            import teklif_excel
+            teklif_excel.create_excel(quote, part, logo_path, engine)
+        os.replace(part, path)
+    except BaseException:
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        raise
+    return time.perf_counter() - start
+
+
+def warm_up_worker():
+    """Süreç havuzundaki çalışanı ilk istekten önce hazırla (openpyxl / reportlab yüklemesi)"""
+    try:
+        import teklif_excel
+        teklif_excel.named_style_specs()
+        import teklif_pdf
+        teklif_pdf.register_fonts()
+    except Exception:
+        pass    # hata ilk istekte ayrıntısıyla döner
+
+
+class LatencyStats:
+    """Son LATENCY_WINDOW ölçümün yüzdelikleri (ms)"""
+
+    def __init__(self):
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+
+    def summary(self):
+        if not self.samples:
+            return {'count': 0}
+        values = sorted(self.samples)
+        pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 2)
+        return {'count': len(values), 'p50': pick(0.50), 'p95': pick(0.95),
+                'p99': pick(0.99), 'max': round(values[-1], 2)}
+
+
+class QuoteServer:
+    def __init__(self, out_dir, workers=2, queue_size=32, logo_path=None, engine=None,
+                 archive_path=None, token=None):
+        self.out_dir = Path(out_dir).resolve()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.logo_path = logo_path
+        self.engine = engine
+        self.archive_path = archive_path
+        self.token = token
+        self.archive = None
+        self.pool = None
+        self.archive_thread = None  # SQLite bağlantısı tek thread'de açılıp kullanılır
+        self.server = None
+        self._slots = None
+        self._seq = 0
+        self.generated = {}     # indirilebilir dosyalar: out_dir'e göre yol -> tam yol
+        self.waiting = 0        # üretim sırası bekleyen istekler
+        self.running = 0        # şu an üretilen çıktılar
+        self.counters = {'requests': 0, 'rendered': 0, 'rejected': 0, 'errors': 0,
+                         'archive_errors': 0}
+        self.latency = {'queue': LatencyStats(), 'render': LatencyStats(), 'total': LatencyStats()}
+
+    # ------------- yaşam döngüsü -------------
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Dinlemeye başla; bağlanılan portu döndür (port=0 ise sistemin seçtiği)"""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        # spawn: fork edilen çalışan o an açık istek soketlerini devralır, yanıt bitse de bağlantı
+        # kapanmaz (Windows'ta zaten spawn kullanılır). Çalışanlar dinlemeden önce başlatılır.
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warm_up_worker)
+                               for _ in range(self.workers)))
+        self._slots = asyncio.Semaphore(self.workers)
+        if self.archive_path is not None:
+            from teklif_arsiv import QuoteArchive
+            self.archive_thread = ThreadPoolExecutor(max_workers=1)
+            self.archive = await loop.run_in_executor(self.archive_thread, QuoteArchive,
+                                                      self.archive_path)
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+        if self.archive is not None:
+            await asyncio.get_running_loop().run_in_executor(self.archive_thread, self.archive.close)
+            self.archive = None
+        if self.archive_thread is not None:
+            self.archive_thread.shutdown(wait=True)
+
+    # ------------- HTTP -------------
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, target, headers, body = await asyncio.wait_for(
+                    self.read_request(reader), READ_TIMEOUT)
+                status, payload, content_type = await self.route(method, target, headers, body)
+            except HttpError as e:
+                status, payload, content_type = e.status, {'error': str(e)}, None
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    ConnectionError):
+                return
+            except Exception as e:
+                status, payload, content_type = 500, {'error': f"{type(e).__name__}: {e}"}, None
+            await self.respond(writer, status, payload, content_type)
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "Geçersiz istek satırı")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "Geçersiz Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "İstek gövdesi çok büyük")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def respond(self, writer, status, payload, content_type=None):
+        if content_type is None:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            body = payload
+        head = (f"HTTP/1.1 {status} {_STATUS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                + ("Retry-After: 5\r\n" if status == 503 else "")
+                + "Connection: close\r\n\r\n")
+        try:
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def check_token(self, headers, query):
+        if self.token is None:
+            return
+        given = headers.get('x-token') or query.get('token', [''])[0]
+        if not hmac.compare_digest(given.encode('utf-8'), self.token.encode('utf-8')):
+            raise HttpError(401, "Geçersiz veya eksik token")
+
+    async def route(self, method, target, headers, body):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        query = parse_qs(url.query)
+        if path == '/saglik':
+            if method != 'GET':
+                raise HttpError(405, "GET bekleniyor")
+            return 200, {'status': 'ok'}, None
+        self.check_token(headers, query)
+        if path == '/teklif':
+            if method != 'POST':
+                raise HttpError(405, "POST bekleniyor")
+            fmt = query.get('format', ['xlsx'])[0].lower()
+            return 200, await self.create_quote(body, fmt), None
+        if method != 'GET':
+            raise HttpError(405, "GET bekleniyor")
+        if path == '/metrics':
+            return 200, self.metrics(), None
+        if path.startswith('/dosya/'):
+            data, content_type = await asyncio.get_running_loop().run_in_executor(
+                None, self.read_output, path[len('/dosya/'):])
+            return 200, data, content_type
+        raise HttpError(404, "Bulunamadı")
+
+    # ------------- işler -------------
+    async def create_quote(self, body, fmt):
+        start = time.perf_counter()
+        self.counters['requests'] += 1
+        if fmt not in ('xlsx', 'pdf'):
+            raise HttpError(400, "format xlsx veya pdf olmalı")
+        try:
+            quote_def = json.loads(body.decode('utf-8'))
+            quote = Quote.from_dict(quote_def)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise HttpError(400, f"Geçersiz teklif: {e}")
+        # Dosyadaki ve arşivdeki tarih aynı olsun (çağıranın sözlüğü değiştirilmez)
+        quote.date = quote_date(quote)
+        quote_def = dict(quote_def, date=quote.date)
+
+        if self.waiting >= self.queue_size:
+            self.counters['rejected'] += 1
+            raise HttpError(503, "Kuyruk dolu, biraz sonra tekrar deneyin")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        queued = time.perf_counter() - start
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            path = self.output_path(quote, fmt)
+            await loop.run_in_executor(None, lambda: path.parent.mkdir(exist_ok=True))
+            render = await loop.run_in_executor(
+                self.pool, render_file, quote_def, fmt, str(path), self.logo_path, self.engine)
+        except Exception as e:
+            self.counters['errors'] += 1
+            raise HttpError(500, f"Çıktı üretilemedi: {type(e).__name__}: {e}")
+        finally:
+            self.running -= 1
+            self._slots.release()
+        relative = path.relative_to(self.out_dir).as_posix()
+        self.generated[relative] = path
+        quote_id = archive_error = None
+        if self.archive is not None:
+            try:
+                quote_id = await loop.run_in_executor(self.archive_thread, self.archive.save,
+                                                      quote, str(path))
+            except Exception as e:
+                # Dosya üretildi; istek başarılı sayılır ama arşiv hatası görünür kalır
+                self.counters['archive_errors'] += 1
+                archive_error = f"{type(e).__name__}: {e}"
+                print(f"{datetime.now():%Y-%m-%d %H:%M:%S} arşive yazılamadı ({path}): {archive_error}",
+                      file=sys.stderr, flush=True)
+        total = time.perf_counter() - start
+        self.counters['rendered'] += 1
+        self.latency['queue'].add(queued)
+        self.latency['render'].add(render)
+        self.latency['total'].add(total)
+        result = {'id': quote_id, 'path': str(path), 'download': "/dosya/" + url_quote(relative),
+                  'queue_ms': round(queued * 1000, 2), 'render_ms': round(render * 1000, 2),
+                  'total_ms': round(total * 1000, 2)}
+        if archive_error is not None:
+            result['archive_error'] = archive_error
+        return result
+
+    def output_path(self, quote, fmt):
+        """Müşteri klasöründe benzersiz dosya adı (klasörü çağıran oluşturur)"""
+        self._seq += 1
+        folder = self.out_dir / (safe_name(quote.customer_name) or 'musteri')
+        return folder / f"Teklif_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._seq:04d}.{fmt}"
+
+    def read_output(self, relative):
+        """Sadece bu sunucunun ürettiği dosyalar verilir; yol --out'taki başka dosyaya çözülemez"""
+        path = self.generated.get(relative)
+        if path is None or not path.is_file():
+            raise HttpError(404, "Dosya bulunamadı")
+        with open(path, 'rb') as f:
+            data = f.read()
+        return data, _CONTENT_TYPES.get(path.suffix.lower(), 'application/octet-stream')
+
+    def metrics(self):
+        return dict(self.counters, waiting=self.waiting, running=self.running,
+                    workers=self.workers, queue_size=self.queue_size,
+                    latency_ms={name: stats.summary() for name, stats in self.latency.items()})
+
+
+async def serve(args):
+    archive_path = None
+    if not args.no_archive:
+        from teklif_arsiv import ARCHIVE_FILE
+        archive_path = args.archive or ARCHIVE_FILE
+    server = QuoteServer(args.out, args.workers, args.queue,
+                         None if args.no_logo else find_logo_path(), args.engine, archive_path,
+                         args.token or None)
+    port = await server.start(args.host, args.port)
+    print(f"Teklif sunucusu: http://{args.host}:{port}  (çıktılar: {server.out_dir})", flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+# ------------- yerel deneme -------------
+async def _request(port, method, target, body=b'', token=None):
+    """127.0.0.1:port'a tek HTTP isteği; (durum, gövde) döndürür"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = (f"{method} {target} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                + (f"X-Token: {token}\r\n" if token else "")
+                + f"Content-Length: {len(body)}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), READ_TIMEOUT)
+    finally:
+        writer.close()
+    head, _, data = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), data
+
+
+async def self_test(engine='auto', stream=sys.stdout):
+    """Geçici klasörde sunucuyu boş portta aç, örnek teklifi xlsx ve pdf olarak üret, yanıtları denetle"""
+    from teklif_bench import synthetic_quote
+    quote_def = synthetic_quote(25).to_dict()
+    quote_def.pop('date', None)
+    body = json.dumps(quote_def, ensure_ascii=False).encode('utf-8')
+    failures = []
+
+    def check(name, ok):
+        print(f"  {'OK ' if ok else 'HATA'} {name}", file=stream)
+        if not ok:
+            failures.append(name)
+
+    token = 'deneme'
+    with tempfile.TemporaryDirectory() as out_dir:
+        server = QuoteServer(out_dir, workers=1, engine=engine,
+                             archive_path=os.path.join(out_dir, 'arsiv.db'), token=token)
+        port = await server.start('127.0.0.1', 0)
+        print(f"Teklif sunucusu denemesi: http://127.0.0.1:{port}", file=stream)
+        try:
+            status, data = await _request(port, 'GET', '/saglik')
+            check("GET /saglik", status == 200 and json.loads(data) == {'status': 'ok'})
+            status, _ = await _request(port, 'POST', '/teklif?format=xlsx', body)
+            check("token yok -> 401", status == 401)
+            status, _ = await _request(port, 'GET', '/metrics', token='yanlis')
+            check("yanlış token -> 401", status == 401)
+            for fmt, magic in (('xlsx', b'PK'), ('pdf', b'%PDF')):
+                status, data = await _request(port, 'POST', f'/teklif?format={fmt}', body, token)
+                result = json.loads(data)
+                check(f"POST /teklif?format={fmt}", status == 200 and result.get('id') is not None)
+                if status != 200:
+                    print(f"       {result.get('error')}", file=stream)
+                    continue
+                status, data = await _request(port, 'GET', result['download'], token=token)
+                check(f"GET {result['download']}", status == 200 and data.startswith(magic))
+            status, data = await _request(port, 'GET', f"{result['download']}?token={token}")
+            check("?token= ile indirme", status == 200)
+            status, _ = await _request(port, 'POST', '/teklif?format=xlsx', b'[1]', token)
+            check("geçersiz teklif -> 400", status == 400)
+            with open(os.path.join(out_dir, 'baska.xlsx'), 'wb') as f:
+                f.write(b'PK')
+            status, _ = await _request(port, 'GET', '/dosya/baska.xlsx', token=token)
+            check("sunucunun üretmediği dosya -> 404", status == 404)
+            status, _ = await _request(port, 'GET', '/dosya/../arsiv.db', token=token)
+            check("klasör dışı dosya -> 404", status == 404)
+            status, data = await _request(port, 'GET', '/metrics', token=token)
+            metrics = json.loads(data)
+            check("GET /metrics", status == 200 and metrics['rendered'] == 2 and metrics['errors'] == 0
+                  and metrics['archive_errors'] == 0)
+        finally:
+            await server.close()
+    print("Sonuç: " + (f"{len(failures)} hata" if failures else "başarılı"), file=stream)
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    import teklif_excel
+    parser = argparse.ArgumentParser(prog="teklif_app.py serve",
+                                     description="Ofis içi teklif üretim sunucusu (HTTP)")
+    parser.add_argument('--out', help="merkezi çıktı klasörü")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="dinlenecek adres (ağ için 0.0.0.0; --token gerekir)")
+    parser.add_argument('--token', default=os.environ.get('TEKLIF_TOKEN', ''),
+                        help="istemcilerin X-Token başlığı ya da ?token= ile göndereceği anahtar "
+                             "(varsayılan: TEKLIF_TOKEN ortam değişkeni)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port (0: boş port seç)")
+    parser.add_argument('--workers', type=int, default=2, help="aynı anda üretilen çıktı sayısı")
+    parser.add_argument('--queue', type=int, default=32, help="bekleyebilecek en fazla istek")
+    parser.add_argument('--engine', default='auto', choices=['auto'] + sorted(teklif_excel.ENGINES),
+                        help="Excel motoru (bkz. teklif_excel.ENGINES)")
+    parser.add_argument('--archive', default='', help="arşiv veritabanı (varsayılan: setup/teklif_arsivi.db)")
+    parser.add_argument('--no-archive', action='store_true', help="teklifleri arşive yazma")
+    parser.add_argument('--no-logo', action='store_true', help="logo ekleme")
+    parser.add_argument('--self-test', action='store_true',
+                        help="geçici klasörde yerel portta örnek teklif üretip yanıtları denetle")
+    args = parser.parse_args(argv)
+    if args.self_test:
+        return asyncio.run(self_test(args.engine))
+    if not args.out:
+        parser.error("--out gerekli")
+    if args.host not in _LOCAL_HOSTS and not args.token:
+        parser.error("yerel makine dışına açılan sunucu için --token (veya TEKLIF_TOKEN) gerekli")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_tablo.py
+Sanal (virtualized) tablo: Treeview'da sadece görünen satırlar kadar öğe tutulur
+- Satır verisi modeldeki listedir (Quote.materials / Quote.payments); tablo sadece bir pencere gösterir
+- Kaydırma (scrollbar, tekerlek, ok/sayfa tuşları) öğeleri silip eklemez, mevcut öğelerin değerlerini değiştirir
+- Seçim satır nesneleri üzerinden tutulur; görünmeyen seçili satırlar kaydırınca kaybolmaz
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTable:
+    def __init__(self, parent, columns, lines, height=12):
+        self.lines = lines
+        self.top = 0            # görünen ilk satırın sırası
+        self.slots = []         # görünen Treeview öğeleri (yukarıdan aşağı)
+        self.selected = set()   # seçili satır nesneleri
+        self.on_scroll = None   # kaydırmadan önce çağrılır (ör. açık düzenlemeyi bitirmek için)
+        self._row_height = None
+        self._header_height = 0
+        self._rows = height
+
+        self.scrollbar = tk.Scrollbar(parent, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings', height=height)
+        self.tree.bind('<Configure>', self.on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(1, 'units'))
+        self.tree.bind('<Up>', lambda e: self.move_focus(-1))
+        self.tree.bind('<Down>', lambda e: self.move_focus(1))
+        self.tree.bind('<Prior>', lambda e: self.move_focus(-self._rows))
+        self.tree.bind('<Next>', lambda e: self.move_focus(self._rows))
+
+    # ------------- satır <-> öğe -------------
+    def line_at(self, item):
+        """Treeview öğesinin gösterdiği satır (görünmüyorsa None)"""
+        try:
+            i = self.top + self.slots.index(item)
+        except ValueError:
+            return None
+        return self.lines[i] if i < len(self.lines) else None
+
+    def item_of(self, line):
+        """Satırın şu an görünen öğesi (görünmüyorsa None)"""
+        window = self.lines[self.top:self.top + len(self.slots)]
+        for item, shown in zip(self.slots, window):
+            if shown is line:
+                return item
+        return None
+
+    def selected_lines(self):
+        """Seçili satırlar tablo sırasıyla"""
+        if not self.selected:
+            return []
+        return [line for line in self.lines if line in self.selected]
+
+    def clear_selection(self):
+        self.selected.clear()
+        self.tree.selection_set(())
+
+    # ------------- çizim -------------
+    def set_lines(self, lines):
+        self.lines = lines
+        self.top = 0
+        self.selected.clear()
+        self.refresh()
+
+    def refresh(self):
+        """Görünen pencereyi modelden yeniden doldur (satır sayısından bağımsız maliyet)"""
+        rows = self._rows
+        total = len(self.lines)
+        self.top = max(0, min(self.top, total - rows))
+        window = self.lines[self.top:self.top + rows]
+        tree = self.tree
+        while len(self.slots) < len(window):
+            self.slots.append(tree.insert('', 'end'))
+        while len(self.slots) > len(window):
+            tree.delete(self.slots.pop())
+        for item, line in zip(self.slots, window):
+            tree.item(item, values=line.values())
+        tree.selection_set([item for item, line in zip(self.slots, window) if line in self.selected])
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self._row_height is None and self.slots:
+            # Satır yüksekliği ilk öğe çizildikten sonra ölçülebilir
+            tree.after_idle(self.on_configure)
+
+    def refresh_line(self, line):
+        item = self.item_of(line)
+        if item is not None:
+            self.tree.item(item, values=line.values())
+
+    def on_configure(self, event=None):
+        # Görünür satır sayısını piksel yüksekliğinden hesapla
+        if self._row_height is None:
+            bbox = self.tree.bbox(self.slots[0]) if self.slots else None
+            if not bbox:
+                return
+            self._header_height, self._row_height = bbox[1], bbox[3]
+        rows = max(1, (self.tree.winfo_height() - self._header_height) // self._row_height)
+        if rows != self._rows:
+            self._rows = rows
+            self.refresh()
+
+    def on_select(self, event=None):
+        """Görünen öğelerdeki seçimi satır nesnelerine aktar"""
+        chosen = set(self.tree.selection())
+        window = self.lines[self.top:self.top + len(self.slots)]
+        for item, line in zip(self.slots, window):
+            if item in chosen:
+                self.selected.add(line)
+            else:
+                self.selected.discard(line)
+
+    # ------------- kaydırma -------------
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.lines) - self._rows))
+        if top == self.top:
+            return
+        if self.on_scroll:
+            self.on_scroll()
+        self.top = top
+        self.refresh()
+
+    def scroll(self, count, what='units'):
+        self.scroll_to(self.top + (count * self._rows if what == 'pages' else count))
+        return 'break'
+
+    def yview(self, *args):
+        """Scrollbar komutu: ('moveto', oran) veya ('scroll', n, 'units'/'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(round(float(args[1]) * len(self.lines)))
+        elif args[0] == 'scroll':
+            self.scroll(int(args[1]), args[2])
+
+    def see(self, index):
+        """index'teki satır görünecek şekilde kaydır"""
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self._rows:
+            self.scroll_to(index - self._rows + 1)
+        else:
+            self.refresh()
+
+    def move_focus(self, step):
+        """Ok / sayfa tuşları: odağı satırlar arasında taşı, pencere kenarında kaydır"""
+        if not self.lines:
+            return 'break'
+        focus = self.tree.focus()
+        index = self.top + self.slots.index(focus) if focus in self.slots else self.top
+        index = max(0, min(len(self.lines) - 1, index + step))
+        self.see(index)
+        item = self.slots[index - self.top]
+        self.selected = {self.lines[index]}
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        return 'break'
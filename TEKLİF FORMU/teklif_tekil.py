@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_tekil.py
+Tek örnek (single-instance) çalışma
+- İlk açılan süreç 127.0.0.1'de boş bir portu dinler; port ve rastgele anahtar kullanıcıya özel
+  geçici klasördeki PORT_FILE'a yazılır
+- Sonraki açılışlar Tk / openpyxl yüklenmeden bu porta "new" komutu gönderip hemen çıkar;
+  çalışan süreç yeni teklif penceresi açar (ya da boş pencereyi öne getirir)
+- Komutlar dinleyici thread'de kuyruğa konur, Tk tarafı attach() ile root.after üzerinden okur
+- Bu modül sadece standart kütüphaneyi kullanır (ikinci açılışın hızlı olması için)
+"""
+import getpass
+import json
+import os
+from pathlib import Path
+import queue
+import secrets
+import socket
+import tempfile
+import threading
+
+CONNECT_TIMEOUT = 1.0
+POLL_MS = 250
+
+
+def _user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "kullanici"
+
+
+PORT_FILE = Path(tempfile.gettempdir()) / f"teklif_tekil_{_user()}.json"
+
+
+def forward(command='new', timeout=CONNECT_TIMEOUT):
+    """Çalışan sürece komut gönder; kabul edildiyse True (yoksa bu süreç açılmaya devam eder)"""
+    try:
+        with open(PORT_FILE, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        with socket.create_connection(('127.0.0.1', info['port']), timeout) as sock:
+            sock.settimeout(timeout)
+            message = json.dumps({'token': info['token'], 'cmd': command}) + '\n'
+            sock.sendall(message.encode('utf-8'))
+            return sock.makefile('r', encoding='utf-8').readline().strip() == 'ok'
+    except (OSError, ValueError, KeyError, TypeError):
+        # Dosya yok / eski süreçten kalmış / port başka programda
+        return False
+
+
+class InstanceServer:
+    def __init__(self):
+        self.commands = queue.Queue()
+        self.token = secrets.token_hex(16)
+        self.sock = None
+
+    def start(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(5)
+        self.sock = sock
+        tmp = PORT_FILE.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'port': sock.getsockname()[1], 'token': self.token, 'pid': os.getpid()}, f)
+        os.replace(tmp, PORT_FILE)
+        threading.Thread(target=self._serve, name="teklif-tekil", daemon=True).start()
+        return self
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # close() çağrıldı
+            with conn:
+                try:
+                    conn.settimeout(CONNECT_TIMEOUT)
+                    message = json.loads(conn.makefile('r', encoding='utf-8').readline())
+                    if message.get('token') != self.token:
+                        continue
+                    self.commands.put(message.get('cmd', 'new'))
+                    conn.sendall(b'ok\n')
+                except (OSError, ValueError, AttributeError):
+                    pass
+
+    def attach(self, root, handler, interval=POLL_MS):
+        """Gelen komutları Tk thread'inde handler(komut) ile işle"""
+        def poll():
+            while True:
+                try:
+                    command = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                handler(command)
+            root.after(interval, poll)
+        root.after(interval, poll)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        # Dosya bu sürece aitse sil (sonradan açılmış başka bir sürecinkine dokunma)
+        try:
+            with open(PORT_FILE, 'r', encoding='utf-8') as f:
+                mine = json.load(f).get('token') == self.token
+            if mine:
+                os.remove(PORT_FILE)
+        except (OSError, ValueError, AttributeError):
+            pass
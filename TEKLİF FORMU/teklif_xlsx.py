@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_xlsx.py
+openpyxl kullanmadan, teklif düzenini SpreadsheetML parçaları olarak doğrudan
+zip dosyasına yazan hafif Excel motoru (teklif_excel.create_excel(engine='direct')).
+
+- Düzen sabittir: 6 sütun, birleşik üst satırlar, küçük bir stil tablosu, isteğe bağlı logo
+- Satırlar sırayla akıtılır, bellek kullanımı satır sayısından bağımsızdır
+- Satır yükseklikleri, sayfa sonları ve tekrarlanan başlık teklif_yerlesim'den gelir
+- Çıktı bayt düzeyinde kararlıdır: aynı teklif her seferinde aynı dosyayı üretir
+  (sabit zip tarihleri, sabit parça sırası, tarih/saat içeren docProps yok)
+"""
+import zipfile
+from xml.sax.saxutils import escape
+
+from teklif_model import kurus_to_float, quote_date
+from teklif_firma import LOGO_SIZE, PROGRESS_EVERY, load_company, header_lines, logo_png
+from teklif_olcum import phase
+from teklif_yerlesim import COLUMN_WIDTHS, HEADER_SIZES, MARGINS, layout_sheet
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+_EMU_PER_PX = 9525
+
+COLUMN_LETTERS = "ABCDEF"
+
+# ---------------- Stil tablosu ----------------
+# cellXfs sırası; hücreler s="indeks" ile bu tabloya başvurur
+S_DEFAULT, S_TITLE, S_INFO, S_QUOTE_TITLE, S_BOLD, S_BOX_VALUE, S_BOX_WHITE, \
+    S_HEADER, S_TEXT, S_CENTER, S_NUMBER, S_MONEY, S_PAY_MONEY, S_TOTAL_LABEL, \
+    S_TOTAL_VALUE, S_EMPTY = range(16)
+
+_HEADER_KINDS = {'title': S_TITLE, 'info': S_INFO, 'quote_title': S_QUOTE_TITLE}
+
+_FONT = '<font>{}<sz val="{}"/><name val="Calibri"/><family val="2"/></font>'
+_FONTS = (
+    _FONT.format('', 11),                                   # 0 varsayılan
+    _FONT.format('<b/>', 11),                               # 1 kalın
+    _FONT.format('<b/>', HEADER_SIZES['title']),            # 2 başlık
+    _FONT.format('', HEADER_SIZES['info']),                 # 3 firma bilgisi
+    _FONT.format('<b/>', HEADER_SIZES['quote_title']),      # 4 teklif başlığı
+    _FONT.format('<b/><color rgb="FFFFFFFF"/>', 11),        # 5 tablo başlığı
+)
+_FILLS = (
+    '<fill><patternFill patternType="none"/></fill>',
+    '<fill><patternFill patternType="gray125"/></fill>',
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF2F4F4F"/></patternFill></fill>',  # 2
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFECF0F1"/></patternFill></fill>',  # 3
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFFFFFFF"/></patternFill></fill>',  # 4
+)
+_MEDIUM = '<{0} style="medium"><color rgb="FF000000"/></{0}>'
+_BORDERS = (
+    '<border><left/><right/><top/><bottom/><diagonal/></border>',
+    '<border>' + ''.join(_MEDIUM.format(e) for e in ('left', 'right', 'top', 'bottom')) + '<diagonal/></border>',
+)
+_CENTER = '<alignment horizontal="center" vertical="center"/>'
+_LEFT = '<alignment horizontal="left" vertical="center"/>'
+_RIGHT = '<alignment horizontal="right" vertical="center"/>'
+_TOP_WRAP = '<alignment horizontal="left" vertical="top" wrapText="1"/>'
+# (numFmtId, fontId, fillId, borderId, hizalama) - 2: '0.00', 4: '#,##0.00' (yerleşik)
+_XFS = (
+    (0, 0, 0, 0, None),         # S_DEFAULT
+    (0, 2, 0, 0, _CENTER),      # S_TITLE
+    (0, 3, 0, 0, _LEFT),        # S_INFO
+    (0, 4, 0, 0, _CENTER),      # S_QUOTE_TITLE
+    (0, 1, 0, 0, None),         # S_BOLD
+    (0, 0, 3, 0, _TOP_WRAP),    # S_BOX_VALUE
+    (0, 0, 4, 0, None),         # S_BOX_WHITE
+    (0, 5, 2, 1, _CENTER),      # S_HEADER
+    (0, 0, 0, 1, _TOP_WRAP),    # S_TEXT
+    (0, 0, 0, 1, _CENTER),      # S_CENTER
+    (2, 0, 0, 1, _CENTER),      # S_NUMBER
+    (4, 0, 0, 1, _RIGHT),       # S_MONEY
+    (4, 0, 0, 1, None),         # S_PAY_MONEY
+    (0, 1, 3, 1, None),         # S_TOTAL_LABEL
+    (4, 0, 4, 1, _RIGHT),       # S_TOTAL_VALUE
+    (0, 0, 0, 1, None),         # S_EMPTY
+)
+
+
+def _styles_xml():
+    xfs = []
+    for num_fmt, font, fill, border, alignment in _XFS:
+        attrs = (f'numFmtId="{num_fmt}" fontId="{font}" fillId="{fill}" borderId="{border}" xfId="0"'
+                 + (' applyNumberFormat="1"' if num_fmt else '')
+                 + (' applyFont="1"' if font else '')
+                 + (' applyFill="1"' if fill else '')
+                 + (' applyBorder="1"' if border else ''))
+        if alignment:
+            xfs.append(f'<xf {attrs} applyAlignment="1">{alignment}</xf>')
+        else:
+            xfs.append(f'<xf {attrs}/>')
+    return (_XML_HEADER + f'<styleSheet xmlns="{_MAIN_NS}">'
+            + f'<fonts count="{len(_FONTS)}">' + ''.join(_FONTS) + '</fonts>'
+            + f'<fills count="{len(_FILLS)}">' + ''.join(_FILLS) + '</fills>'
+            + f'<borders count="{len(_BORDERS)}">' + ''.join(_BORDERS) + '</borders>'
+            + '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            + f'<cellXfs count="{len(xfs)}">' + ''.join(xfs) + '</cellXfs>'
+            + '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            + '</styleSheet>')
+
+
+_STYLES_XML = _styles_xml()
+
+# ---------------- Sabit parçalar ----------------
+_CONTENT_TYPES = (
+    _XML_HEADER
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    + '<Default Extension="xml" ContentType="application/xml"/>'
+    + '<Default Extension="png" ContentType="image/png"/>'
+    + '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    + '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    + '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    + '{drawing}</Types>'
+)
+_DRAWING_CONTENT_TYPE = ('<Override PartName="/xl/drawings/drawing1.xml" '
+                         'ContentType="application/vnd.openxmlformats-officedocument.drawing+xml"/>')
+_ROOT_RELS = (
+    _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    + '</Relationships>'
+)
+_WORKBOOK = (
+    _XML_HEADER + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+    + '<bookViews><workbookView/></bookViews>'
+    + '<sheets><sheet name="Teklif" sheetId="1" r:id="rId1"/></sheets>'
+    + '</workbook>'
+)
+_WORKBOOK_RELS = (
+    _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    + f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+    + '</Relationships>'
+)
+_SHEET_RELS = (
+    _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_REL_NS}/drawing" Target="../drawings/drawing1.xml"/>'
+    + '</Relationships>'
+)
+_DRAWING_RELS = (
+    _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_REL_NS}/image" Target="../media/image1.png"/>'
+    + '</Relationships>'
+)
+_DRAWING = (
+    _XML_HEADER
+    + '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+    + f'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:r="{_REL_NS}">'
+    + '<xdr:oneCellAnchor><xdr:from><xdr:col>5</xdr:col><xdr:colOff>0</xdr:colOff>'
+    + '<xdr:row>0</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>'
+    + '<xdr:ext cx="{cx}" cy="{cy}"/>'
+    + '<xdr:pic><xdr:nvPicPr><xdr:cNvPr id="1" name="Logo"/><xdr:cNvPicPr/></xdr:nvPicPr>'
+    + '<xdr:blipFill><a:blip r:embed="rId1"/><a:stretch><a:fillRect/></a:stretch></xdr:blipFill>'
+    + '<xdr:spPr><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr></xdr:pic>'
+    + '<xdr:clientData/></xdr:oneCellAnchor></xdr:wsDr>'
+)
+
+# XML 1.0'da izin verilmeyen kontrol karakterleri
+_INVALID_XML_CHARS = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _cell(col, row, value, style):
+    ref = f"{COLUMN_LETTERS[col - 1]}{row}"
+    if value is None or value == '':
+        return f'<c r="{ref}" s="{style}"/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}" s="{style}"><v>{value!r}</v></c>'
+    text = escape(str(value).translate(_INVALID_XML_CHARS))
+    space = ' xml:space="preserve"' if text != text.strip() or '\n' in text else ''
+    return f'<c r="{ref}" s="{style}" t="inlineStr"><is><t{space}>{text}</t></is></c>'
+
+
+class _SheetWriter:
+    """Satırları sırayla sheet1.xml akışına yazar"""
+
+    def __init__(self, stream, heights):
+        self.stream = stream
+        self.heights = heights
+        self.row = 0  # son yazılan satır
+        self.merges = []
+        self._buf = []
+        self._size = 0
+
+    def write(self, text):
+        self._buf.append(text)
+        self._size += len(text)
+        if self._size > 65536:
+            self.flush()
+
+    def flush(self):
+        if self._buf:
+            self.stream.write(''.join(self._buf).encode('utf-8'))
+            self._buf = []
+            self._size = 0
+
+    def emit(self, row, cells=()):
+        """row numaralı satırı yaz; cells: (sütun, değer, stil) dizisi"""
+        self.row = row
+        height = self.heights.get(row)
+        attrs = f' ht="{height}" customHeight="1"' if height else ''
+        self.write(f'<row r="{row}"{attrs}>'
+                   + ''.join(_cell(col, row, value, style) for col, value, style in cells)
+                   + '</row>')
+
+    def merge(self, row, first, last):
+        self.merges.append(f"{COLUMN_LETTERS[first - 1]}{row}:{COLUMN_LETTERS[last - 1]}{row}")
+
+
+def _write_sheet(stream, quote, company, has_logo, layout, progress=None):
+    w = _SheetWriter(stream, layout.heights)
+    w.write(_XML_HEADER + f'<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            + '<sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+            + '<sheetFormatPr defaultRowHeight="15"/><cols>'
+            + ''.join(f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                      for i, width in enumerate(COLUMN_WIDTHS, start=1))
+            + '</cols><sheetData>')
+
+    # Başlık, firma bilgileri ve teklif başlığı
+    for row, text, kind in header_lines(company):
+        w.emit(row, [(1, text, _HEADER_KINDS[kind])])
+        w.merge(row, 1, 6)
+
+    # Müşteri kutusu
+    box_rows = [
+        ("MÜŞTERİ ADI :", quote.customer_name),
+        ("T.C. :", quote.customer_tc),
+        ("TEL :", quote.customer_phone),
+        ("ADRES :", quote.customer_address),
+        ("TARİH :", quote_date(quote))
+    ]
+    for label, val in box_rows:
+        w.emit(w.row + 1, [(2, label, S_BOLD), (3, val, S_BOX_VALUE), (4, None, S_BOX_WHITE)])
+        w.merge(w.row, 3, 6)
+
+    # Malzeme tablosu
+    headers = ['NO', 'AÇIKLAMA', 'BİRİM', 'MİKTAR', 'BİRİM FİYATI', 'TOPLAM FİYATI']
+    header_cells = [(c, h, S_HEADER) for c, h in enumerate(headers, start=1)]
+    w.emit(w.row + 2, header_cells)
+    # Sayfa başlarında (layout.repeat_rows) başlık tekrar yazılır
+    repeat = iter(layout.repeat_rows)
+    next_repeat = next(repeat, None)
+    if not quote.materials:
+        for i in range(3):
+            w.emit(w.row + 1, [(c, None, S_EMPTY) for c in range(1, 7)])
+    else:
+        for idx, line in enumerate(quote.materials, start=1):
+            if w.row + 1 == next_repeat:
+                w.emit(w.row + 1, header_cells)
+                next_repeat = next(repeat, None)
+            w.emit(w.row + 1, (
+                (1, idx, S_CENTER),
+                (2, line.name, S_TEXT),
+                (3, line.unit, S_CENTER),
+                (4, line.qty, S_NUMBER),
+                (5, kurus_to_float(line.unit_price), S_MONEY),
+                (6, kurus_to_float(line.total), S_MONEY),
+            ))
+            if progress is not None and idx % PROGRESS_EVERY == 0:
+                progress(idx, len(quote.materials))
+    if progress is not None:
+        progress(len(quote.materials), len(quote.materials))
+
+    # Malzeme toplamları
+    m_sub, m_without, m_vat, m_with = quote.totals()
+    totals = [("GENEL Toplam:", m_sub), ("KDV'siz Toplam:", m_without),
+              ("KDV (%20) Tutarı:", m_vat), ("KDV'li Toplam:", m_with)]
+    for label, val in totals:
+        w.emit(w.row + 1, [(5, label, S_TOTAL_LABEL), (6, kurus_to_float(val), S_TOTAL_VALUE)])
+
+    # Ödeme planı
+    w.emit(w.row + 2, [(1, "ÖDEME PLANI", S_BOLD)])
+    pay_headers = ['NO', 'TARİH', 'TOPLAM', 'ALINACAK TUTAR', 'KALACAK TUTAR', 'AÇIKLAMALAR']
+    w.emit(w.row + 1, [(c, h, S_HEADER) for c, h in enumerate(pay_headers, start=1)])
+    if not quote.payments:
+        for i in range(3):
+            w.emit(w.row + 1, [(c, None, S_EMPTY) for c in range(1, 6)])
+        # İmza satırı
+        w.emit(w.row + 6, [(1, "İMZA : ________", S_DEFAULT), (5, "İMZA : ________", S_DEFAULT)])
+    else:
+        for idx, line in enumerate(quote.payments, start=1):
+            w.emit(w.row + 1, (
+                (1, idx, S_CENTER),
+                (2, line.date, S_CENTER),
+                (3, kurus_to_float(line.total), S_PAY_MONEY),
+                (4, kurus_to_float(line.received), S_PAY_MONEY),
+                (5, kurus_to_float(line.remaining), S_PAY_MONEY),
+            ))
+        last = w.row
+        # Başlıklar, tarih ve imza satırları
+        w.emit(last + 3, [(1, "MÜŞTERİ", S_BOLD), (5, "FİRMA YETKİLİSİ", S_BOLD)])
+        w.emit(last + 5, [(1, "TARİH : ________", S_DEFAULT), (5, "TARİH : ________", S_DEFAULT)])
+        w.emit(last + 8, [(1, "İMZA : ________", S_DEFAULT), (5, "İMZA : ________", S_DEFAULT)])
+
+    w.write('</sheetData>'
+            + f'<mergeCells count="{len(w.merges)}">'
+            + ''.join(f'<mergeCell ref="{m}"/>' for m in w.merges) + '</mergeCells>'
+            + '<pageMargins ' + ' '.join(f'{k}="{v}"' for k, v in MARGINS.items()) + '/>'
+            + f'<pageSetup paperSize="9" scale="{layout.scale}" orientation="portrait"/>'
+            + (f'<rowBreaks count="{len(layout.breaks)}" manualBreakCount="{len(layout.breaks)}">'
+               + ''.join(f'<brk id="{row}" max="16383" man="1"/>' for row in layout.breaks)
+               + '</rowBreaks>' if layout.breaks else '')
+            + ('<drawing r:id="rId1"/>' if has_logo else '')
+            + '</worksheet>')
+    w.flush()
+
+
+def _zip_info(name):
+    info = zipfile.ZipInfo(name, date_time=_ZIP_DATE)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 0  # işletim sisteminden bağımsız aynı baytlar
+    info.external_attr = 0o600 << 16
+    return info
+
+
+def write_quote_xlsx(quote, output_path, logo_path=None, company=None, progress=None):
+    """Teklifi doğrudan SpreadsheetML olarak output_path'e (dosya yolu veya yazılabilir dosya) yaz.
+    progress: isteğe bağlı progress(yapılan, toplam) (bkz. teklif_firma.PROGRESS_EVERY)"""
+    company = company or load_company()
+    logo = logo_png(logo_path)
+    with phase('layout'):
+        layout = layout_sheet(quote, header_lines(company))
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        def put(name, text):
+            zf.writestr(_zip_info(name), text.encode('utf-8') if isinstance(text, str) else text)
+
+        put('[Content_Types].xml', _CONTENT_TYPES.format(
+            drawing=_DRAWING_CONTENT_TYPE if logo else ''))
+        put('_rels/.rels', _ROOT_RELS)
+        put('xl/workbook.xml', _WORKBOOK)
+        put('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        put('xl/styles.xml', _STYLES_XML)
+        with zf.open(_zip_info('xl/worksheets/sheet1.xml'), 'w') as stream:
+            _write_sheet(stream, quote, company, logo is not None, layout, progress)
+        if logo:
+            put('xl/worksheets/_rels/sheet1.xml.rels', _SHEET_RELS)
+            put('xl/drawings/drawing1.xml', _DRAWING.format(
+                cx=LOGO_SIZE[0] * _EMU_PER_PX, cy=LOGO_SIZE[1] * _EMU_PER_PX))
+            put('xl/drawings/_rels/drawing1.xml.rels', _DRAWING_RELS)
+            put('xl/media/image1.png', logo)
+    return output_path
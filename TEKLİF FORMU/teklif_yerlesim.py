@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+teklif_yerlesim.py
+Excel çıktısının sayfa yerleşimi (standard / stream / direct motorlarında ortak, openpyxl'e bağımlı değildir)
+- Alt satıra geçen metin (açıklama, müşteri adresi) Calibri glif genişlik tablosuyla ölçülür;
+  Excel birleşik hücrelerde satır yüksekliğini kendisi ayarlamadığı için yükseklikler burada hesaplanır
+- A4 sayfa sonları aynı geçişte, sadece tablo satırları arasına konur; üst bölüm, toplamlar,
+  ödeme planı başlığı ve imza alanı bölünmez
+- Malzeme tablosu birden çok sayfaya yayılırsa tablo içindeki her sayfa sonundan sonra başlık satırı
+  gerçek bir satır olarak tekrar yazılır (repeat_rows). Excel'in yazdırma başlığı kullanılmaz: o tüm
+  sayfalara, ödeme planı ve imza sayfalarına da konurdu
+- Toplamlar, ödeme planı ve imza alanı sığıyorsa son malzeme satırıyla aynı sayfada tutulur
+- Maliyet satır sayısı ve metin uzunluğuyla doğrusaldır; glif tabloları font başına bir kez kurulur
+
+Satır numaraları teklif_excel / teklif_xlsx'teki sırayla aynıdır:
+    1-6 başlık, 7-11 müşteri kutusu, 13 malzeme başlığı, malzemeler (araya repeat_rows satırlarında
+    tekrarlanan başlıklar), 4 toplam satırı, boş satır, "ÖDEME PLANI", ödeme başlığı, ödemeler, imza alanı
+"""
+from itertools import islice
+import unicodedata
+
+from teklif_model import quote_date
+
+COLUMN_WIDTHS = (6, 30, 10, 15, 15, 15)     # A..F, Excel karakter birimi
+
+# Sayfa: A4 dikey, kenar boşlukları inç cinsinden
+PAPER_WIDTH, PAPER_HEIGHT = 595.28, 841.89  # pt
+MARGINS = dict(left=0.75, right=0.75, top=1.0, bottom=1.0, header=0.5, footer=0.5)
+
+DEFAULT_HEIGHT = 15.0                       # Calibri 11 satır yüksekliği (pt)
+LINE_HEIGHTS = {11: 15.0, 12: 15.75, 14: 18.75}
+MAX_ROW_HEIGHT = 409.5                      # Excel sınırı
+CELL_PADDING_PX = 6                         # hücre iç boşluğu + kılavuz çizgisi
+
+BOX_FIRST_ROW = 7
+MATERIAL_HEADER_ROW = 13
+HEADER_SIZES = {'title': 14, 'info': 14, 'quote_title': 12}   # üst bölüm font boyutları (tüm çıktılar)
+
+# ---------------- Glif genişlikleri ----------------
+# Calibri ilerleme genişlikleri (1/2048 em); Türkçe harfler NFD ile temel harfe indirgenir
+_CALIBRI = {
+    ' ': 463, '!': 544, '"': 821, '#': 1038, '$': 1038, '%': 1463, '&': 1397, "'": 452,
+    '(': 621, ')': 621, '*': 1038, '+': 1038, ',': 511, '-': 627, '.': 517, '/': 792,
+    ':': 548, ';': 548, '<': 1038, '=': 1038, '>': 1038, '?': 941, '@': 1823,
+    '[': 628, '\\': 792, ']': 628, '_': 1021, '|': 943, '€': 1038, '₺': 1038, 'ı': 470,
+    'A': 1185, 'B': 1114, 'C': 1092, 'D': 1260, 'E': 1000, 'F': 941, 'G': 1292, 'H': 1276,
+    'I': 516, 'J': 653, 'K': 1064, 'L': 861, 'M': 1751, 'N': 1322, 'O': 1356, 'P': 1058,
+    'Q': 1378, 'R': 1112, 'S': 941, 'T': 998, 'U': 1314, 'V': 1162, 'W': 1822, 'X': 1063,
+    'Y': 998, 'Z': 959,
+    'a': 981, 'b': 1076, 'c': 866, 'd': 1076, 'e': 1019, 'f': 625, 'g': 964, 'h': 1076,
+    'i': 470, 'j': 490, 'k': 931, 'l': 470, 'm': 1636, 'n': 1076, 'o': 1080, 'p': 1076,
+    'q': 1076, 'r': 714, 's': 801, 't': 686, 'u': 1076, 'v': 925, 'w': 1464, 'x': 887,
+    'y': 927, 'z': 809,
+}
+_CALIBRI.update(dict.fromkeys('0123456789', 1038))
+_DEFAULT_GLYPH = 1038
+_WIDE_GLYPH = 2048
+BOLD_FACTOR = 1.04
+
+
+class GlyphTable(dict):
+    """karakter -> piksel genişliği (96 dpi); ilk kez görülen karakter bir kez hesaplanıp saklanır"""
+
+    def __init__(self, size=11, bold=False):
+        super().__init__()
+        self.scale = size * 96 / 72 / 2048 * (BOLD_FACTOR if bold else 1)
+
+    def __missing__(self, ch):
+        units = _CALIBRI.get(ch)
+        if units is None:
+            if unicodedata.combining(ch) or ch in '\r\t':
+                units = 0
+            elif unicodedata.east_asian_width(ch) in 'WF':
+                units = _WIDE_GLYPH
+            else:
+                units = _CALIBRI.get(unicodedata.normalize('NFD', ch)[0], _DEFAULT_GLYPH)
+        # Ekranda olduğu gibi tam piksele yuvarlanır (Calibri 11'de '0' = 7 px)
+        width = self[ch] = round(units * self.scale)
+        return width
+
+
+_glyph_tables = {}
+
+
+def glyph_table(size=11, bold=False):
+    """Font (boyut, kalın) başına tek glif tablosu"""
+    table = _glyph_tables.get((size, bold))
+    if table is None:
+        table = _glyph_tables[(size, bold)] = GlyphTable(size, bold)
+    return table
+
+
+def column_pixels(width):
+    """Excel sütun genişliğinin (karakter) piksel karşılığı"""
+    return int(width * 7)
+
+
+def text_width(text, table=None):
+    table = table or glyph_table()
+    return sum(map(table.__getitem__, text))
+
+
+def line_count(text, width_px, table=None):
+    """Metnin width_px genişliğindeki hücrede kaç satıra bölüneceği (Excel gibi boşluktan, gerekirse harften)"""
+    if not text:
+        return 1
+    table = table or glyph_table()
+    glyph = table.__getitem__
+    text = str(text)
+    if '\n' not in text and sum(map(glyph, text)) <= width_px:
+        return 1    # çoğu satır: tek toplama yeter
+    space = glyph(' ')
+    count = 0
+    for paragraph in text.split('\n'):
+        count += 1
+        used = 0
+        line_start = True
+        for word in paragraph.split(' '):
+            width = sum(map(glyph, word))
+            if not line_start:
+                if used + space + width <= width_px:
+                    used += space + width
+                    continue
+                count += 1
+            line_start = False
+            if width <= width_px:
+                used = width
+                continue
+            # Sütundan uzun kelime harf harf bölünür
+            used = 0
+            for ch in word:
+                w = glyph(ch)
+                if used and used + w > width_px:
+                    count += 1
+                    used = 0
+                used += w
+    return count
+
+
+def wrapped_height(text, width_px, table=None):
+    lines = line_count(text, width_px, table)
+    return min(MAX_ROW_HEIGHT, lines * DEFAULT_HEIGHT)
+
+
+# ---------------- Sayfa düzeni ----------------
+def page_scale(widths=COLUMN_WIDTHS):
+    """Tablo genişliği sayfaya sığmıyorsa yazdırma ölçeği (%); fitToWidth yerine sabit ölçek"""
+    content = sum(column_pixels(w) for w in widths) * 0.75  # px -> pt
+    printable = PAPER_WIDTH - (MARGINS['left'] + MARGINS['right']) * 72
+    return max(10, min(100, int(printable / content * 100)))
+
+
+class SheetLayout:
+    """Satır yükseklikleri (sadece varsayılandan farklı olanlar), sayfa sonları ve tekrarlanan başlıklar"""
+    __slots__ = ('heights', 'breaks', 'repeat_rows', 'scale')
+
+    def __init__(self, scale):
+        self.heights = {}       # satır -> pt
+        self.breaks = []        # bu satırlardan sonra yeni sayfa (artan)
+        self.repeat_rows = []   # malzeme başlığının tekrar yazıldığı satırlar (artan, sayfa başları)
+        self.scale = scale
+
+
+class _Pager:
+    """Satırları sırayla yerleştirir; bölünmeyen grup sayfaya sığmazsa önüne sayfa sonu koyar"""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.page_height = (PAPER_HEIGHT - (MARGINS['top'] + MARGINS['bottom']) * 72) * 100 / layout.scale
+        self.row = 0
+        self.used = 0.0
+
+    def block(self, heights, repeat_header=False):
+        """heights: ardışık satırların yükseklikleri; repeat_header: önüne sayfa sonu gelirse yeni sayfa
+        tekrarlanan malzeme başlığıyla başlar (malzeme satırları)"""
+        total = sum(heights)
+        if self.used + total > self.page_height and self.used > 0:
+            layout = self.layout
+            layout.breaks.append(self.row)
+            self.used = 0.0
+            if repeat_header:
+                self.row += 1
+                layout.repeat_rows.append(self.row)
+                self.used = DEFAULT_HEIGHT
+        self.used += total
+        if self.used > self.page_height:
+            # Sayfadan uzun grup: Excel kendisi böler, kalan kısım yeni sayfada devam eder
+            self.used %= self.page_height
+        heights_map = self.layout.heights
+        for h in heights:
+            self.row += 1
+            if h != DEFAULT_HEIGHT:
+                heights_map[self.row] = h
+
+
+def layout_sheet(quote, header_rows):
+    """
+    Teklifin tek geçişte yerleşimi.
+    header_rows: teklif_firma.header_lines çıktısı (satır, metin, tür)
+    """
+    layout = SheetLayout(page_scale())
+    pager = _Pager(layout)
+    table = glyph_table()
+    widths = [column_pixels(w) - CELL_PADDING_PX for w in COLUMN_WIDTHS]
+    box_width = sum(column_pixels(w) for w in COLUMN_WIDTHS[2:]) - CELL_PADDING_PX
+
+    # Üst bölüm + müşteri kutusu + malzeme başlığı + ilk satır birlikte kalır
+    top = [DEFAULT_HEIGHT] * (BOX_FIRST_ROW - 1)
+    for row, _, kind in header_rows:
+        top[row - 1] = LINE_HEIGHTS[HEADER_SIZES[kind]]
+    for value in (quote.customer_name, quote.customer_tc, quote.customer_phone,
+                  quote.customer_address, quote_date(quote)):
+        top.append(wrapped_height(value, box_width, table))
+    top += [DEFAULT_HEIGHT, DEFAULT_HEIGHT]     # boş satır, malzeme başlığı
+
+    # Toplamlar; ödeme planı (boş satır, başlık ve ilk satır birlikte), kalan ödemeler; imza alanı
+    payments = quote.payments
+    totals = [DEFAULT_HEIGHT] * 4
+    plan = [DEFAULT_HEIGHT] * (3 + (1 if payments else 3))
+    signature = [DEFAULT_HEIGHT] * (8 if payments else 6)
+
+    materials = quote.materials
+    if not materials:
+        pager.block(top + [DEFAULT_HEIGHT] * 3)
+    else:
+        name_width = widths[1]
+        top.append(wrapped_height(materials[0].name, name_width, table))
+        pager.block(top)
+        for line in islice(materials, 1, len(materials) - 1):
+            pager.block([wrapped_height(line.name, name_width, table)], True)
+        if len(materials) > 1:
+            last = [wrapped_height(materials[-1].name, name_width, table)]
+            # Son satır + alt bölüm bir sayfaya sığıyorsa birlikte kalır: her sayfada malzeme satırı olur
+            tail = last + totals + plan + [DEFAULT_HEIGHT] * (len(payments) - 1) + signature
+            if sum(tail) <= pager.page_height - DEFAULT_HEIGHT:
+                pager.block(tail, True)
+                return layout
+            pager.block(last, True)
+
+    # Sığmadı: toplamlar ve ödeme planı kendi sayfalarına geçebilir (malzeme başlığı tekrarlanmaz)
+    pager.block(totals)
+    pager.block(plan)
+    for _ in range(len(payments) - 1):
+        pager.block([DEFAULT_HEIGHT])
+    pager.block(signature)
+    return layout
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# Testler uygulama klasöründeki teklif_* modüllerini doğrudan içe aktarır
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""teklif_arsiv: kayıt, arama ve arka plan yazıcısı"""
+import sqlite3
+
+import pytest
+
+from teklif_arsiv import ArchiveWriter, QuoteArchive
+from teklif_model import MaterialLine, PaymentLine, Quote
+
+
+def make_quote(name='Ali Işık'):
+    return Quote(name, '12345678901', '0555 111 22 33', 'Adres', '05.03.2026',
+                 [MaterialLine('Kablo', 'm', 2.5, 1000)], [PaymentLine('05.03.2026', 3000, 3000, 0)])
+
+
+def test_save_search_load(tmp_path):
+    archive = QuoteArchive(tmp_path / 'arsiv.db')
+    quote_id = archive.save(make_quote(), 'a.xlsx')
+    assert [row[0] for row in archive.search('ALİ I')] == [quote_id]
+    assert [row[0] for row in archive.search('0555 111')] == [quote_id]
+    loaded = archive.load(quote_id)
+    assert loaded.to_dict() == make_quote().to_dict()
+    archive.close()
+
+
+def test_writer_saves_in_background_thread(tmp_path):
+    path = tmp_path / 'arsiv.db'
+    reader = QuoteArchive(path)
+    writer = ArchiveWriter(path)
+    ids = [writer.save(make_quote(f'Müşteri {i}'), f'{i}.xlsx') for i in range(3)]
+    assert [f.result(timeout=10) for f in ids] == [1, 2, 3]
+    assert len(reader.search('müşteri')) == 3
+    writer.close()
+    reader.close()
+
+
+def test_writer_reports_errors_through_future(tmp_path):
+    writer = ArchiveWriter(tmp_path)     # klasör veritabanı olarak açılamaz
+    with pytest.raises(sqlite3.Error):
+        writer.save(make_quote()).result(timeout=10)
+    writer.close()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""teklif_batch: çıktı adları ve komut satırı doğrulaması"""
+import pytest
+
+from teklif_batch import main, output_name, output_names
+
+
+def test_output_name_strips_folders():
+    assert output_name(1, {'output': '../../gizli'}) == 'gizli.xlsx'
+    assert output_name(1, {'output': 'C:\\Teklifler\\a.xlsx'}) == 'a.xlsx'
+    assert output_name(7, {'customer': {'name': 'Ali Veli'}}) == 'Teklif_0007_Ali_Veli.xlsx'
+    assert output_name(2, {'output': '..'}) == 'Teklif_0002_musteri.xlsx'
+
+
+def test_duplicate_output_names_are_rejected():
+    defs = [{'output': 'a.xlsx'}, {'customer': {'name': 'Ali'}}, {'output': 'x/A'}]
+    with pytest.raises(ValueError, match='teklif 1 ve 3'):
+        output_names(defs)
+    assert output_names(defs[:2]) == ['a.xlsx', 'Teklif_0002_Ali.xlsx']
+
+
+def test_duplicates_fail_before_writing(tmp_path):
+    quotes = tmp_path / 'q.jsonl'
+    quotes.write_text('{"output": "a"}\n{"output": "a.xlsx"}\n', encoding='utf-8')
+    assert main([str(quotes), '--out', str(tmp_path / 'out'), '--workers', '1']) == 2
+    assert not (tmp_path / 'out').exists()
+
+
+@pytest.mark.parametrize('workers', ['0', '-2', 'iki'])
+def test_workers_must_be_positive(tmp_path, workers):
+    with pytest.raises(SystemExit):
+        main(['q.jsonl', '--out', str(tmp_path), '--workers', workers])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""teklif_excel: standard, stream ve direct motorları aynı sayfayı üretir"""
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+import teklif_excel  # noqa: E402
+from teklif_excel import ENGINES, create_excel, resolve_engine  # noqa: E402
+from teklif_firma import DEFAULT_COMPANY  # noqa: E402
+from teklif_model import MaterialLine, PaymentLine, Quote  # noqa: E402
+
+
+def make_quote(materials):
+    return Quote('Ali Veli', '12345678901', '0555 555 55 55', 'Uzun bir adres ' * 8, '01.01.2026',
+                 [MaterialLine(f'Malzeme {i} ' + 'açıklama ' * (i % 9), 'Adet', i % 4 + 0.5, 1234 + i)
+                  for i in range(materials)],
+                 [PaymentLine(f'{i + 1:02d}.01.2026', 10000 - i * 100, 100, 9900 - i * 100) for i in range(4)])
+
+
+def sheet_of(path):
+    ws = openpyxl.load_workbook(path).active
+    return {
+        'cells': [row for row in ws.iter_rows(values_only=True)],
+        'merged': sorted(str(r) for r in ws.merged_cells.ranges),
+        'breaks': [b.id for b in ws.row_breaks.brk],
+        'heights': {row: dim.height for row, dim in ws.row_dimensions.items() if dim.height},
+        'scale': ws.page_setup.scale,
+    }
+
+
+@pytest.mark.parametrize('materials', [3, 150])
+def test_engines_give_same_sheet(tmp_path, materials):
+    quote = make_quote(materials)
+    sheets = {}
+    for engine in ENGINES:
+        path = tmp_path / f'{engine}.xlsx'
+        create_excel(quote, str(path), engine=engine, company=DEFAULT_COMPANY)
+        sheets[engine] = sheet_of(path)
+    standard = sheets.pop('standard')
+    for engine, sheet in sheets.items():
+        for key in standard:
+            assert sheet[key] == standard[key], (engine, key)
+    if materials > 100:
+        assert standard['breaks']
+
+
+def test_resolve_engine():
+    assert resolve_engine(make_quote(3), 'auto') == 'standard'
+    assert resolve_engine(make_quote(3), 'direct') == 'direct'
+    with pytest.raises(ValueError):
+        resolve_engine(make_quote(3), 'yok')
+
+
+def test_already_saved_fallback_removes_temp_file(tmp_path, monkeypatch):
+    out = tmp_path / 'out'
+    out.mkdir()
+    temp = tmp_path / 'tmp'
+    temp.mkdir()
+    monkeypatch.setattr(teklif_excel.tempfile, 'tempdir', str(temp))
+
+    def write(quote, path, *args):
+        if path == str(out / 'teklif.xlsx'):
+            raise teklif_excel.WorkbookAlreadySaved("kaydedildi")
+        with open(path, 'wb') as f:
+            f.write(b'PK')
+    monkeypatch.setitem(ENGINES, 'stream', write)
+    create_excel(make_quote(1), str(out / 'teklif.xlsx'), engine='stream')
+    assert (out / 'teklif.xlsx').read_bytes() == b'PK'
+    assert list(temp.iterdir()) == []
+
+
+def test_other_write_errors_are_not_hidden(monkeypatch):
+    def write(*args):
+        raise PermissionError("dosya Excel'de açık")
+    monkeypatch.setitem(ENGINES, 'stream', write)
+    with pytest.raises(PermissionError):
+        create_excel(make_quote(1), 'teklif.xlsx', engine='stream')
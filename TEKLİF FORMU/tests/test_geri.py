@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""teklif_geri: her adımın tersi teklifi ve ara toplamı eski haline getirir"""
+from teklif_geri import History, fields_of
+from teklif_gunluk import Journal, replay
+from teklif_model import MaterialLine, PaymentLine, Quote
+
+
+def state(quote):
+    return ([fields_of(l) for l in quote.materials], [fields_of(p) for p in quote.payments], quote.subtotal)
+
+
+def make_quote():
+    return Quote(materials=[MaterialLine(f's{i}', 'Adet', i + 1, 100 * (i + 1)) for i in range(6)],
+                 payments=[PaymentLine('01.01.2026', 1000, 1000, 0)])
+
+
+def edit(quote, history):
+    """Uygulamadaki işlemlerin modele yaptığı değişiklikler ve kayıtları; ara durumları döndür"""
+    states = [state(quote)]
+
+    new = [MaterialLine('x', 'm', 2, 50), MaterialLine('y', 'm', 3, 70)]
+    quote.materials[2:2] = new
+    quote.subtotal += sum(l.total for l in new)
+    history.record('ins', 'material', range(2, 4), new)
+    states.append(state(quote))
+
+    line = quote.materials[0]
+    old = fields_of(line)
+    quote.edit_material(line, 2, '7,5')
+    history.record('set', 'material', 0, old, fields_of(line))
+    states.append(state(quote))
+
+    indices = [1, 4, 7]
+    removed = [quote.materials[i] for i in indices]
+    quote.remove_materials(removed)
+    history.record('del', 'material', indices, removed)
+    states.append(state(quote))
+
+    with history.group():
+        old_plan = list(quote.payments)
+        quote.payments[:] = [PaymentLine('01.02.2026', 500, 200, 300), PaymentLine('01.03.2026', 300, 300, 0)]
+        history.record('rep', 'payment', old_plan, list(quote.payments))
+        added = [MaterialLine('z', 'Adet', 1, 1)]
+        quote.add_material(added[0])
+        history.record('ins', 'material', range(len(quote.materials) - 1, len(quote.materials)), added)
+    states.append(state(quote))
+    return states
+
+
+def test_undo_redo_inverses():
+    quote = make_quote()
+    history = History()
+    states = edit(quote, history)
+    assert len(history.undo_steps) == 4     # grup tek adım
+
+    for expected in reversed(states[:-1]):
+        history.undo(quote)
+        assert state(quote) == expected
+    assert not history.can_undo and history.undo(quote) == []
+
+    for expected in states[1:]:
+        history.redo(quote)
+        assert state(quote) == expected
+    assert not history.can_redo
+
+
+def test_new_record_clears_redo():
+    quote = make_quote()
+    history = History()
+    edit(quote, history)
+    history.undo(quote)
+    assert history.can_redo
+    history.record('set', 'material', 0, fields_of(quote.materials[0]), fields_of(quote.materials[0]))
+    assert not history.can_redo
+
+
+def test_undo_log_keeps_journal_in_sync(tmp_path):
+    quote = make_quote()
+    history = History()
+    edit(quote, history)
+    journal = Journal(tmp_path)
+    journal.compact(quote)
+
+    def log(name, *args):
+        getattr(journal, name)(*args)
+
+    history.undo(quote, log)
+    history.undo(quote, log)
+    history.redo(quote, log)
+    journal.flush()
+    recovered = replay(journal.path)
+    assert state(recovered) == state(quote)
+    journal.close()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""teklif_gunluk: günlükten yeniden kurma ve sıkıştırma"""
+from teklif_gunluk import Journal, discard_journal, orphaned_journals, replay
+from teklif_model import MaterialLine, PaymentLine
+
+
+def rows_of(quote):
+    return ([(l.name, l.unit, l.qty, l.unit_price) for l in quote.materials],
+            [(p.date, p.total, p.received, p.remaining) for p in quote.payments])
+
+
+def fill(journal):
+    journal.set_customer(['Ali', '123', '555', 'Adres'])
+    journal.insert('material', 0, [MaterialLine('a', 'Adet', 1, 100), MaterialLine('b', 'm', 2.5, 250)])
+    journal.insert('material', 1, [MaterialLine('c', 'Adet', 3, 300)])
+    journal.update('material', 0, MaterialLine('a2', 'Adet', 4, 100))
+    journal.delete('material', [2])
+    journal.replace('payment', [PaymentLine('01.01.2026', 1000, 400, 600),
+                                PaymentLine('01.02.2026', 600, 600, 0)])
+
+
+EXPECTED = ([('a2', 'Adet', 4, 100), ('c', 'Adet', 3, 300)],
+            [('01.01.2026', 1000, 400, 600), ('01.02.2026', 600, 600, 0)])
+
+
+def test_replay(tmp_path):
+    journal = Journal(tmp_path)
+    fill(journal)
+    journal.flush()
+    quote = replay(journal.path)
+    assert rows_of(quote) == EXPECTED
+    assert quote.customer_name == 'Ali' and quote.customer_address == 'Adres'
+    assert quote.subtotal == 400 + 900
+    journal.close()
+    assert not journal.path.exists()
+
+
+def test_unflushed_records_are_not_on_disk(tmp_path):
+    journal = Journal(tmp_path)
+    fill(journal)
+    assert rows_of(replay(journal.path)) == ([], [])
+    journal.close()
+
+
+def test_customer_recorded_only_when_changed(tmp_path):
+    journal = Journal(tmp_path)
+    journal.set_customer(['Ali', '', '', ''])
+    journal.set_customer(['Ali', '', '', ''])
+    assert len(journal.pending) == 1
+    journal.close()
+
+
+def test_half_written_last_line_is_ignored(tmp_path):
+    journal = Journal(tmp_path)
+    fill(journal)
+    journal.flush()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"op":"ins","t":"material","i":0,"rows":[["yar')
+    assert rows_of(replay(journal.path)) == EXPECTED
+    journal.close()
+
+
+def test_compact_then_continue(tmp_path):
+    journal = Journal(tmp_path)
+    fill(journal)
+    journal.flush()
+    quote = replay(journal.path)
+    journal.compact(quote)
+    assert journal.records == 1
+    assert len(journal.path.read_text(encoding='utf-8').splitlines()) == 1
+    assert rows_of(replay(journal.path)) == EXPECTED
+
+    journal.insert('material', 2, [MaterialLine('d', 'Adet', 1, 5)])
+    journal.set_customer(['Veli', '', '', ''])
+    journal.flush()
+    quote = replay(journal.path)
+    assert rows_of(quote)[0] == EXPECTED[0] + [('d', 'Adet', 1, 5)]
+    assert quote.customer_name == 'Veli'
+    journal.close()
+
+
+def test_orphaned_journals(tmp_path):
+    journal = Journal(tmp_path)
+    journal.insert('material', 0, [MaterialLine('a', 'Adet', 1, 100)])
+    journal.flush()
+    # Sahibi açıkken kurtarılacak günlük sayılmaz
+    assert orphaned_journals(tmp_path) == []
+    journal.close(discard=False)
+    assert orphaned_journals(tmp_path) == [journal.path]
+    discard_journal(journal.path)
+    assert list(tmp_path.iterdir()) == []
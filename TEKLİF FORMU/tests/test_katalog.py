@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""teklif_katalog: önek araması ve katalog dosyası"""
+from teklif_katalog import Catalog, CatalogItem
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+def make_catalog():
+    return Catalog([CatalogItem(n) for n in (
+        'Kablo NYM 3x2,5', 'Kablo NYA 1,5', 'Bakır kablo', 'Priz', 'PVC Boru 20',
+        'İnşaat demiri', 'Isı yalıtımı', 'Sigorta (Otomatik)', 'Kombi-kablo seti')])
+
+
+def test_name_prefix_matches_come_first():
+    assert names(make_catalog().complete('kab')) == [
+        'Kablo NYA 1,5', 'Kablo NYM 3x2,5', 'Bakır kablo', 'Kombi-kablo seti']
+
+
+def test_word_start_matches():
+    catalog = make_catalog()
+    assert names(catalog.complete('boru')) == ['PVC Boru 20']
+    assert names(catalog.complete('otom')) == ['Sigorta (Otomatik)']
+    assert catalog.complete('ablo') == []
+
+
+def test_turkish_case_folding():
+    catalog = make_catalog()
+    assert names(catalog.complete('inş')) == ['İnşaat demiri']
+    assert names(catalog.complete('ISI')) == ['Isı yalıtımı']
+    assert names(catalog.complete('ısı')) == ['Isı yalıtımı']
+
+
+def test_limit_and_empty_prefix():
+    catalog = make_catalog()
+    assert len(catalog.complete('k', limit=2)) == 2
+    assert catalog.complete('   ') == []
+
+
+def test_add_updates_same_name():
+    catalog = make_catalog()
+    catalog.add(CatalogItem('PRİZ', 'Adet', 4500))
+    assert len(catalog) == 9
+    assert catalog.get('priz').unit_price == 4500
+    catalog.add(CatalogItem('Anahtar', 'Adet', 3000))
+    assert names(catalog.complete('anah')) == ['Anahtar']
+
+
+def test_load_csv(tmp_path):
+    path = tmp_path / 'katalog.csv'
+    path.write_text('Ad;Birim;Fiyat\nKablo;m;1.234,50\nPriz;;45\n;;\nBozuk;Adet;1.250\n', encoding='utf-8')
+    catalog = Catalog.load_csv(path)
+    assert [(i.name, i.unit, i.unit_price) for i in catalog.items] == [
+        ('Kablo', 'm', 123450), ('Priz', 'Adet', 4500)]
+    assert len(Catalog.load_csv(tmp_path / 'yok.csv')) == 0
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""teklif_model: sayı okuma/yazma, satır toplamları, artımlı ara toplam"""
+import pytest
+
+from teklif_model import (AUTO, MaterialLine, Quote, format_kurus, format_qty,
+                          materials_from_rows, parse_kurus, parse_qty, vat_of)
+
+
+@pytest.mark.parametrize('text, kurus', [
+    ('', 0),
+    ('12', 1200),
+    ('12,5', 1250),
+    ('12.5', 1250),
+    ('1.500', 150),         # hücrede tek ayırıcı her zaman ondalıktır
+    ('2,500', 250),
+    ('0,005', 1),           # yarım kuruş yukarı
+    ('-3,335', -334),
+    ('1234,56 ₺', 123456),
+    (7, 700),
+    (1.1, 110),
+])
+def test_parse_kurus_cell(text, kurus):
+    assert parse_kurus(text) == kurus
+
+
+@pytest.mark.parametrize('text', ['abc', '1.234,56', '1,234.56', '1.250.000', 'nan', 'inf'])
+def test_parse_kurus_cell_rejects(text):
+    with pytest.raises(ValueError):
+        parse_kurus(text)
+
+
+@pytest.mark.parametrize('text, kurus', [
+    ('1.234,56', 123456),
+    ('1,234.56', 123456),
+    ('1.250.000', 125000000),
+    ('12,5', 1250),
+])
+def test_parse_kurus_auto(text, kurus):
+    assert parse_kurus(text, AUTO) == kurus
+
+
+@pytest.mark.parametrize('text', ['1.250', '1,250', '12.34.5'])
+def test_parse_kurus_auto_rejects_ambiguous(text):
+    with pytest.raises(ValueError):
+        parse_kurus(text, AUTO)
+
+
+def test_parse_kurus_explicit_separator():
+    assert parse_kurus('1.234,56', ',') == 123456
+    assert parse_kurus('1,234.56', '.') == 123456
+    with pytest.raises(ValueError):
+        parse_kurus('12.34,5', ',')
+
+
+@pytest.mark.parametrize('text, qty', [('', 0.0), ('3', 3.0), ('1.5', 1.5), ('1,125', 1.125), (2, 2.0)])
+def test_parse_qty(text, qty):
+    assert parse_qty(text) == qty
+
+
+@pytest.mark.parametrize('text', ['x', 'nan', 'inf', '1e400', '1.000,5'])
+def test_parse_qty_rejects(text):
+    with pytest.raises(ValueError):
+        parse_qty(text)
+
+
+@pytest.mark.parametrize('kurus', [0, 1, 99, 100, 123456, -5, -123456])
+def test_format_kurus_round_trips(kurus):
+    assert parse_kurus(format_kurus(kurus)) == kurus
+
+
+@pytest.mark.parametrize('qty, text', [(1.0, '1'), (2.5, '2.5'), (1.125, '1.125'), (1000.0, '1000'), (0.0, '0')])
+def test_format_qty_round_trips(qty, text):
+    assert format_qty(qty) == text
+    assert parse_qty(text) == qty
+
+
+def test_line_total_rounds_half_up():
+    assert MaterialLine('a', 'Adet', 3, 3333).total == 9999
+    assert MaterialLine('a', 'Adet', 0.5, 101).total == 51
+    assert MaterialLine('a', 'Adet', -0.5, 101).total == -51
+
+
+def test_totals():
+    quote = Quote(materials=[MaterialLine('a', 'Adet', 2, 10000), MaterialLine('b', 'm', 1.5, 333)])
+    subtotal = 20000 + 500
+    assert quote.totals() == (subtotal, subtotal, vat_of(subtotal), subtotal + vat_of(subtotal))
+    assert Quote().totals() == (0, 0, 0, 0)
+
+
+def test_incremental_subtotal_matches_recompute():
+    quote = Quote()
+    lines = [MaterialLine(f's{i}', 'Adet', i % 7 + 0.25, 1000 + i) for i in range(50)]
+    quote.add_material(MaterialLine('ilk', 'Adet', 1, 12345))
+    quote.extend_materials(lines)
+    quote.edit_material(lines[3], 2, '4,5')
+    quote.edit_material(lines[4], 3, '99,99')
+    quote.edit_material(lines[5], 0, 'yeni ad')
+    quote.remove_materials(lines[10:20])
+    incremental = quote.subtotal
+    quote.recompute_totals()
+    assert incremental == quote.subtotal
+    assert len(quote.materials) == 41
+
+
+def test_edit_material_failure_leaves_line_unchanged():
+    line = MaterialLine('a', 'Adet', 2, 500)
+    quote = Quote(materials=[line])
+    with pytest.raises(ValueError):
+        quote.edit_material(line, 2, 'iki')
+    with pytest.raises(ValueError):
+        quote.edit_material(line, 2, '1e308')     # toplam taşar
+    assert (line.qty, line.unit_price, quote.subtotal) == (2, 500, 1000)
+
+
+def test_snapshot_is_independent():
+    quote = Quote('Ali', materials=[MaterialLine('a', 'Adet', 1, 100)])
+    copy = quote.snapshot()
+    quote.edit_material(quote.materials[0], 3, '5')
+    assert copy.materials[0].unit_price == 100 and copy.subtotal == 100
+
+
+def test_dict_round_trip():
+    quote = Quote('Ali', '1', '555', 'Adres', '01.02.2026',
+                  [MaterialLine('a', 'Adet', 1.5, 12345)])
+    again = Quote.from_dict(quote.to_dict())
+    assert again.to_dict() == quote.to_dict()
+    assert again.subtotal == quote.subtotal
+
+
+def test_materials_from_rows_skips_header_and_reports_errors():
+    rows = [
+        ['Malzeme', 'Birim', 'Miktar', 'Birim Fiyat'],
+        ['Kablo', 'm', '2,5', '1.234,50'],
+        ['Boru', '', 3, 12.5],
+        [],
+        ['Vida', 'Adet', '1.250', '1'],    # belirsiz miktar
+        ['Somun', 'Adet', '', '2'],
+    ]
+    lines, errors = materials_from_rows(rows)
+    assert [(l.name, l.unit, l.qty, l.unit_price) for l in lines] == [
+        ('Kablo', 'm', 2.5, 123450), ('Boru', 'Adet', 3.0, 1250), ('Somun', 'Adet', 1.0, 200)]
+    assert [row for row, _ in errors] == [5]
+
+
+def test_materials_from_rows_bad_first_row_is_an_error():
+    lines, errors = materials_from_rows([['Kablo', 'm', 'iki', '10']])
+    assert lines == [] and errors[0][0] == 1
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""teklif_onizleme: önbellek anahtarı ve eski klasörlerin temizlenmesi"""
+import os
+import time
+
+from teklif_firma import DEFAULT_COMPANY
+from teklif_model import MaterialLine, Quote
+from teklif_onizleme import STALE_SECONDS, PreviewCache, quote_digest
+
+
+def make_quote():
+    return Quote('Ali', date='01.01.2026', materials=[MaterialLine('a', 'Adet', 1, 100)])
+
+
+def test_digest_covers_company_and_engine():
+    quote = make_quote()
+    key = quote_digest(quote, 'xlsx', None, 'standard', DEFAULT_COMPANY)
+    assert key == quote_digest(make_quote(), 'xlsx', None, 'standard', dict(DEFAULT_COMPANY))
+    assert key != quote_digest(quote, 'xlsx', None, 'direct', DEFAULT_COMPANY)
+    assert key != quote_digest(quote, 'xlsx', None, 'standard', dict(DEFAULT_COMPANY, phone='0'))
+    assert key != quote_digest(quote, 'pdf', None, 'standard', DEFAULT_COMPANY)
+    quote.materials[0].qty = 2
+    assert key != quote_digest(quote, 'xlsx', None, 'standard', DEFAULT_COMPANY)
+
+
+def age(path):
+    old = time.time() - STALE_SECONDS - 60
+    os.utime(path, (old, old))
+
+
+def test_prune_keeps_directories_in_use(tmp_path):
+    live = PreviewCache(tmp_path)
+    age(live.dir)
+    dead = tmp_path / '999_eski'
+    dead.mkdir()
+    (dead / 'Teklif_Onizleme_x.xlsx').write_bytes(b'PK')
+    age(dead)
+    recent = tmp_path / '998_yeni'
+    recent.mkdir()
+
+    other = PreviewCache(tmp_path)
+    assert live.dir.exists() and recent.exists()
+    assert not dead.exists()
+    other.clear()
+    live.clear()
+    assert not live.dir.exists()
+
+
+def test_put_get_and_evict(tmp_path):
+    cache = PreviewCache(tmp_path / 'onbellek', max_entries=2)
+    paths = []
+    for i in range(3):
+        src = tmp_path / f'{i}.xlsx'
+        src.write_bytes(b'x' * (i + 1))
+        paths.append(cache.put(f'anahtar{i}', str(src), 'xlsx'))
+    assert cache.get('anahtar0') is None and not os.path.exists(paths[0])
+    assert cache.get('anahtar2') == paths[2]
+    with open(paths[2], 'ab') as f:
+        f.write(b'degisti')
+    assert cache.get('anahtar2') is None
+    cache.clear()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""teklif_model.installment_plan"""
+from datetime import date
+
+import pytest
+
+from teklif_model import installment_plan
+
+
+def test_equal_installments_with_remainder_last():
+    rows = installment_plan(100000, 3, date(2026, 1, 31))
+    assert [r.received for r in rows] == [33333, 33333, 33334]
+    assert [r.date for r in rows] == ['31.01.2026', '28.02.2026', '31.03.2026']
+    assert rows[0].total == 100000 and rows[-1].remaining == 0
+
+
+def test_down_payment_and_rounding():
+    rows = installment_plan(100000, 4, date(2026, 1, 1), down_payment=10000, rounding=1000)
+    assert [r.received for r in rows] == [10000, 22000, 22000, 22000, 24000]
+    assert rows[1].date == '01.02.2026'
+    assert all(r.total - r.received == r.remaining for r in rows)
+
+
+def test_remainder_first():
+    rows = installment_plan(1000, 3, date(2026, 1, 1), remainder_last=False)
+    assert [r.received for r in rows] == [334, 333, 333]
+
+
+def test_rounding_larger_than_installment_is_rejected():
+    # 1000 ₺ / 12 = 83,33 ₺ < 100 ₺ yuvarlama: 11 taksit 0 olurdu
+    with pytest.raises(ValueError, match="Yuvarlama"):
+        installment_plan(100000, 12, date(2026, 1, 1), rounding=10000)
+
+
+@pytest.mark.parametrize('kwargs', [dict(count=0), dict(interval_months=0), dict(down_payment=-1),
+                                    dict(down_payment=200000), dict(rounding=0)])
+def test_invalid_arguments(kwargs):
+    args = dict(total=100000, count=3, start_date=date(2026, 1, 1))
+    args.update(kwargs)
+    with pytest.raises(ValueError):
+        installment_plan(**args)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""teklif_yerlesim: satır yükseklikleri, A4 sayfa sonları ve tekrarlanan malzeme başlığı"""
+import pytest
+
+from teklif_firma import DEFAULT_COMPANY, header_lines
+from teklif_model import MaterialLine, PaymentLine, Quote
+from teklif_yerlesim import (DEFAULT_HEIGHT, MATERIAL_HEADER_ROW, _Pager, SheetLayout,
+                             glyph_table, layout_sheet, line_count, page_scale)
+
+
+def make_quote(materials, payments=0, name='Malzeme'):
+    return Quote('Ali', date='01.01.2026',
+                 materials=[MaterialLine(f'{name} {i}', 'Adet', 1, 100) for i in range(materials)],
+                 payments=[PaymentLine('01.01.2026', 100, 100, 0) for _ in range(payments)])
+
+
+def layout_of(quote):
+    return layout_sheet(quote, header_lines(DEFAULT_COMPANY))
+
+
+def page_height():
+    return _Pager(SheetLayout(page_scale())).page_height
+
+
+def test_line_count():
+    table = glyph_table()
+    assert line_count('', 100, table) == 1
+    assert line_count('kısa', 200, table) == 1
+    assert line_count('bir\niki', 200, table) == 2
+    assert line_count('kelime ' * 40, 200, table) > 1
+    assert line_count('a' * 300, 200, table) > 1     # boşluksuz uzun metin harften bölünür
+
+
+def test_small_quote_fits_one_page():
+    layout = layout_of(make_quote(5, 2))
+    assert layout.breaks == [] and layout.repeat_rows == []
+
+
+def test_long_name_gets_taller_row():
+    quote = make_quote(3)
+    quote.materials[1].name = 'uzun açıklama ' * 20
+    layout = layout_of(quote)
+    assert layout.heights[MATERIAL_HEADER_ROW + 2] > DEFAULT_HEIGHT
+
+
+@pytest.mark.parametrize('materials, payments', [(40, 0), (120, 3), (200, 60)])
+def test_header_repeated_after_material_breaks_only(materials, payments):
+    layout = layout_of(make_quote(materials, payments))
+    assert layout.breaks and layout.breaks == sorted(set(layout.breaks))
+    last_material_row = MATERIAL_HEADER_ROW + materials + len(layout.repeat_rows)
+    material_breaks = [b for b in layout.breaks if b < last_material_row]
+    # Malzeme tablosundaki her sayfa sonundan sonra başlık tekrarlanır, sonraki sayfalarda tekrarlanmaz
+    assert layout.repeat_rows == [b + 1 for b in material_breaks]
+
+
+def test_pages_fit_a4():
+    layout = layout_of(make_quote(200, 60))
+    limit = page_height()
+    starts = [0] + layout.breaks
+    for start, end in zip(starts, layout.breaks):
+        used = sum(layout.heights.get(row, DEFAULT_HEIGHT) for row in range(start + 1, end + 1))
+        assert used <= limit
+
+
+def test_last_material_row_stays_with_totals():
+    # Alt bölüm sığıyorsa son malzeme satırından sonra sayfa sonu olmaz
+    layout = layout_of(make_quote(120, 3))
+    last_material_row = MATERIAL_HEADER_ROW + 120 + len(layout.repeat_rows)
+    assert all(b < last_material_row - 1 for b in layout.breaks)